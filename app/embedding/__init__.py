@@ -2,4 +2,5 @@
 코드 임베딩 모듈
 """
 
-from app.embedding.embedder import CodeEmbedder
\ No newline at end of file
+from app.embedding.embedder import CodeEmbedder
+from app.embedding.semantic_encoder import SemanticEncoder
\ No newline at end of file
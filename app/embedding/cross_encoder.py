@@ -8,7 +8,8 @@ import pickle
 from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
 from tqdm import tqdm
-from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from app.embedding.inference_client import connect_inference_daemon
 
 class CrossEncoder:
     """
@@ -17,13 +18,15 @@ class CrossEncoder:
     def __init__(self, model_name: str = 'SeoJHeasdw/ktds-vue-code-search-reranker-ko',
                  device: str = 'cpu',
                  cache_dir: Optional[str] = None,
-                 max_seq_length: int = 512):
+                 max_seq_length: int = 512,
+                 inference_socket: Optional[str] = None):
         """
         Args:
             model_name: Hugging Face 모델 이름
             device: 'cpu' 또는 'cuda'
             cache_dir: 캐싱 디렉토리
             max_seq_length: 최대 시퀀스 길이
+            inference_socket: 추론 데몬 소켓 경로 (None이면 INFERENCE_SOCKET 환경 변수, 빈 문자열이면 직접 로드)
         """
         self.model_name = model_name
         self.device = device
@@ -34,13 +37,25 @@ class CrossEncoder:
         if cache_dir:
             os.makedirs(cache_dir, exist_ok=True)
         
-        # 모델 및 토크나이저 로드
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
-        self.model.to(device)
+        # 추론 데몬이 있으면 데몬이 모델을 로드하고 점수 계산 (다른 프로세스의 요청과 함께 배치 처리)
+        self.inference_client = connect_inference_daemon(inference_socket)
+        if self.inference_client is not None:
+            self.inference_client.call('load_cross', model_name, max_seq_length)
+            self.tokenizer = None
+            self.model = None
+            print(f"추론 데몬 Cross-Encoder 사용: {model_name} ({self.inference_client.address})")
+        else:
+            # 모델 및 토크나이저 로드
+            from transformers import AutoModelForSequenceClassification, AutoTokenizer
+            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+            self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+            self.model.to(device)
+            
+            # 평가 모드 설정
+            self.model.eval()
         
-        # 평가 모드 설정
-        self.model.eval()
+        # 요청 간 동적 배치 서비스 (set_batcher로 설정, None이면 호출 스레드에서 바로 계산)
+        self.batcher = None
         
     def score(self, query: str, passage: str) -> float:
         """
@@ -53,41 +68,95 @@ class CrossEncoder:
         Returns:
             float: 관련성 점수 (높을수록 관련성 높음)
         """
-        # 캐시 확인
-        cache_key = self._create_cache_key(query, passage)
-        cached_score = self._get_from_cache(cache_key)
-        if cached_score is not None:
-            return cached_score
-        
-        # 입력 인코딩
-        features = self.tokenizer(
-            query, 
-            passage, 
-            padding=True, 
-            truncation='longest_first',
-            max_length=self.max_seq_length, 
-            return_tensors='pt'
-        )
-        
-        # 모델에 입력 전달
-        features = {key: val.to(self.device) for key, val in features.items()}
-        
-        # 모델 추론 (no_grad로 메모리 효율성 높이기)
-        import torch
-        with torch.no_grad():
-            outputs = self.model(**features)
-            scores = outputs.logits.detach().cpu().numpy()
+        return self.score_pairs([(query, passage)])[0]
+    
+    def set_batcher(self, batcher):
+        """
+        요청 간 동적 배치 서비스 설정 (RerankBatcher, None이면 해제)
+        
+        설정 후 score_pairs / rerank / rerank_batch는 다른 요청의 쌍과 함께 배치로 계산된다.
+        batcher는 compute_scores로 실제 계산을 수행해야 한다.
+        """
+        self.batcher = batcher
+    
+    def score_pairs(self, pairs: List[Tuple[str, str]], batch_size: int = 32) -> List[float]:
+        """
+        여러 (질문, 파편) 쌍의 관련성 점수 계산 (동적 배치 서비스가 있으면 그쪽으로 위임)
+        
+        Args:
+            pairs: (질문, 파편 내용) 목록
+            batch_size: 한 번의 모델 추론에 넣을 쌍의 수 (배치 서비스 사용 시 무시)
+            
+        Returns:
+            List[float]: 쌍별 관련성 점수 (입력 순서)
+        """
+        if self.batcher is not None:
+            return self.batcher.score(pairs)
+        return self.compute_scores(pairs, batch_size)
+    
+    def compute_scores(self, pairs: List[Tuple[str, str]], batch_size: int = 32) -> List[float]:
+        """
+        여러 (질문, 파편) 쌍의 관련성 점수를 미니배치로 계산
+        
+        캐시에 없는 쌍만 모아 batch_size 단위로 한 번에 토큰화/추론한다.
+        
+        Args:
+            pairs: (질문, 파편 내용) 목록
+            batch_size: 한 번의 모델 추론에 넣을 쌍의 수
             
-            # 이진 분류 모델인 경우 첫 번째 레이블의 로짓 사용
-            if len(scores[0]) == 2:
-                score = float(scores[0][1])  # 긍정 클래스 로짓
+        Returns:
+            List[float]: 쌍별 관련성 점수 (입력 순서)
+        """
+        scores: List[Optional[float]] = [None] * len(pairs)
+        
+        # 캐시 확인
+        pending = []
+        for i, (query, passage) in enumerate(pairs):
+            cache_key = self._create_cache_key(query, passage)
+            cached_score = self._get_from_cache(cache_key)
+            if cached_score is not None:
+                scores[i] = cached_score
             else:
-                score = float(scores[0][0])  # 단일 점수
+                pending.append((i, cache_key))
+        
+        # 추론 데몬 사용 시 캐시에 없는 쌍만 데몬에 전달
+        if self.inference_client is not None:
+            if pending:
+                remote_scores = self.inference_client.call('score', self.model_name, [pairs[i] for i, _ in pending])
+                for (i, cache_key), score in zip(pending, remote_scores):
+                    scores[i] = float(score)
+                    self._save_to_cache(cache_key, scores[i])
+            return scores
         
-        # 캐시에 저장
-        self._save_to_cache(cache_key, score)
+        import torch
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            
+            # 입력 인코딩 (배치 내 최대 길이로 패딩)
+            features = self.tokenizer(
+                [pairs[i][0] for i, _ in batch],
+                [pairs[i][1] for i, _ in batch],
+                padding=True,
+                truncation='longest_first',
+                max_length=self.max_seq_length,
+                return_tensors='pt'
+            )
+            
+            # 모델에 입력 전달
+            features = {key: val.to(self.device) for key, val in features.items()}
+            
+            # 모델 추론 (no_grad로 메모리 효율성 높이기)
+            with torch.no_grad():
+                logits = self.model(**features).logits.detach().cpu().numpy()
+            
+            # 이진 분류 모델인 경우 긍정 클래스 로짓, 아니면 단일 점수 사용
+            column = 1 if logits.shape[1] == 2 else 0
+            for (i, cache_key), logit in zip(batch, logits[:, column]):
+                scores[i] = float(logit)
+                # 캐시에 저장
+                self._save_to_cache(cache_key, scores[i])
         
-        return score
+        return scores
     
     def rerank(self, query: str, passages: List[Dict[str, Any]], top_k: int = 3) -> List[Dict[str, Any]]:
         """
@@ -101,28 +170,49 @@ class CrossEncoder:
         Returns:
             List[Dict]: 재랭킹된 결과 목록
         """
-        if not passages:
-            return []
-            
-        scores = []
+        return self.rerank_batch([query], [passages], top_k=top_k)[0]
+    
+    def rerank_batch(self, queries: List[str], passages_list: List[List[Dict[str, Any]]],
+                     top_k: int = 3, batch_size: int = 32) -> List[List[Dict[str, Any]]]:
+        """
+        여러 질문의 후보 파편들을 한 번에 재랭킹
         
-        # 각 파편에 대한 점수 계산
-        for passage in passages:
-            content = passage.get('content_preview', '')
-            score = self.score(query, content)
-            scores.append((score, passage))
+        모든 (질문, 파편) 쌍을 평탄화하여 공유 미니배치로 점수를 계산한다.
         
-        # 점수 기준 내림차순 정렬
-        ranked_results = sorted(scores, key=lambda x: x[0], reverse=True)
+        Args:
+            queries: 사용자 질문 목록
+            passages_list: 질문별 후보 파편 목록 (1차 검색 결과)
+            top_k: 질문별 반환할 상위 결과 수
+            batch_size: 한 번의 모델 추론에 넣을 쌍의 수
+            
+        Returns:
+            List[List[Dict]]: 질문별 재랭킹된 결과 목록
+        """
+        pairs = [
+            (query, passage.get('content_preview', ''))
+            for query, passages in zip(queries, passages_list)
+            for passage in passages
+        ]
+        scores = self.score_pairs(pairs, batch_size=batch_size)
         
-        # 스코어를 각 결과에 추가하고 상위 k개 반환
-        results = []
-        for score, passage in ranked_results[:top_k]:
-            result = passage.copy()
-            result['cross_score'] = float(score)  # Cross-Encoder 점수 추가
-            results.append(result)
+        results_list = []
+        offset = 0
+        for passages in passages_list:
+            passage_scores = scores[offset:offset + len(passages)]
+            offset += len(passages)
+            
+            # 점수 기준 내림차순 정렬
+            ranked_results = sorted(zip(passage_scores, passages), key=lambda x: x[0], reverse=True)
+            
+            # 스코어를 각 결과에 추가하고 상위 k개 반환
+            results = []
+            for score, passage in ranked_results[:top_k]:
+                result = passage.copy()
+                result['cross_score'] = float(score)  # Cross-Encoder 점수 추가
+                results.append(result)
+            results_list.append(results)
         
-        return results
+        return results_list
     
     def train_from_examples(self, examples_file: str, epochs: int = 3, batch_size: int = 16):
         """
@@ -7,7 +7,8 @@ import pickle
 import numpy as np
 from typing import Dict, List, Any, Optional
 from tqdm import tqdm
-from sentence_transformers import SentenceTransformer
+
+from app.embedding.inference_client import connect_inference_daemon, RemoteSentenceModel
 
 class CodeEmbedder:
     """
@@ -16,17 +17,25 @@ class CodeEmbedder:
     
     def __init__(self, model_name: str = 'dragonkue/BGE-m3-ko', 
                 normalize_embeddings: bool = True, 
-                cache_dir: Optional[str] = None):        
+                cache_dir: Optional[str] = None,
+                inference_socket: Optional[str] = None):        
         """
         Args:
             model_name: SentenceTransformer 모델 이름
             cache_dir: 임베딩 캐싱 디렉토리
+            inference_socket: 추론 데몬 소켓 경로 (None이면 INFERENCE_SOCKET 환경 변수, 빈 문자열이면 직접 로드)
         """
         self._model_name = model_name
         self._normalize_embeddings = normalize_embeddings
         
-        # 모델 초기화
-        self.model = SentenceTransformer(model_name, trust_remote_code=True)
+        # 모델 초기화 (추론 데몬이 있으면 데몬의 모델 사용)
+        client = connect_inference_daemon(inference_socket)
+        if client is not None:
+            self.model = RemoteSentenceModel(client, model_name, trust_remote_code=True)
+            print(f"추론 데몬 임베딩 모델 사용: {model_name} ({client.address})")
+        else:
+            from sentence_transformers import SentenceTransformer
+            self.model = SentenceTransformer(model_name, trust_remote_code=True)
         self._vector_dim = self.model.get_sentence_embedding_dimension()
         
         # 캐시 디렉토리 설정
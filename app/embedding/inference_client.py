@@ -0,0 +1,249 @@
+"""
+로컬 추론 데몬 클라이언트 모듈
+
+INFERENCE_SOCKET 환경 변수(유닉스 소켓 경로)가 설정되어 있고 데몬이 응답하면
+CodeEmbedder / SemanticEncoder / CrossEncoder가 모델을 직접 로드하지 않고 이 클라이언트로
+데몬의 모델을 사용한다. 데몬이 없으면 None을 반환하여 기존처럼 프로세스 안에서 로드한다.
+
+연결은 pickle로 주고받으므로 소켓은 소유자만 접근할 수 있는 디렉토리(0700)에 두고 항상 인증 키를 사용한다.
+인증 키는 INFERENCE_AUTHKEY 환경 변수, 없으면 데몬이 소켓 옆에 만든 키 파일(0600)에서 읽는다.
+
+데몬 실행:
+    python -m app.server.inference_daemon --preload
+    INFERENCE_SOCKET=$XDG_RUNTIME_DIR/fragmentor/inference.sock python search_ui.py ...
+"""
+
+import os
+import stat
+import queue
+import secrets
+import itertools
+import numpy as np
+from multiprocessing.connection import Client
+from typing import Any, List, Optional, Union
+
+# 인증 키 파일 이름 (소켓과 같은 디렉토리)
+AUTHKEY_FILE = 'inference.key'
+
+# 데몬이 처리하는 요청
+INFERENCE_METHODS = ('ping', 'load_sentence', 'encode', 'load_cross', 'score', 'stats')
+
+
+def default_socket_path() -> str:
+    """
+    데몬 기본 소켓 경로 (python -m app.server.inference_daemon 기본값)
+
+    $XDG_RUNTIME_DIR/fragmentor/inference.sock, XDG_RUNTIME_DIR가 없으면 ./data/run/inference.sock
+    """
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    socket_dir = os.path.join(runtime_dir, 'fragmentor') if runtime_dir else os.path.join('data', 'run')
+    return os.path.abspath(os.path.join(socket_dir, 'inference.sock'))
+
+
+def authkey_path(socket_path: str) -> str:
+    """소켓 옆 인증 키 파일 경로"""
+    return os.path.join(os.path.dirname(os.path.abspath(socket_path)), AUTHKEY_FILE)
+
+
+def check_private(path: str, directory: bool):
+    """
+    현재 사용자 소유이고 그룹/다른 사용자 권한이 없는지 확인
+
+    Args:
+        path: 확인할 경로
+        directory: True면 디렉토리, False면 일반 파일이어야 함
+
+    Raises:
+        PermissionError: 다른 사용자 소유이거나 그룹/다른 사용자가 접근 가능
+    """
+    info = os.lstat(path)
+    expected = stat.S_ISDIR(info.st_mode) if directory else stat.S_ISREG(info.st_mode)
+    if not expected or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"소유자 전용 권한이 아닙니다: {path} (mode {oct(info.st_mode & 0o777)})")
+
+
+def prepare_private_dir(directory: str):
+    """소켓 디렉토리를 소유자 전용(0700)으로 준비 (다른 사용자 소유면 오류)"""
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if stat.S_ISDIR(info.st_mode) and info.st_uid == os.getuid() and info.st_mode & 0o077:
+        os.chmod(directory, stat.S_IRWXU)
+    check_private(directory, directory=True)
+
+
+def read_key_file(key_path: str) -> bytes:
+    """
+    인증 키 파일 읽기
+
+    Raises:
+        FileNotFoundError: 키 파일이 없음
+        PermissionError: 키 파일이 소유자 전용(0600)이 아님
+    """
+    check_private(key_path, directory=False)
+    with open(key_path, 'r', encoding='utf-8') as f:
+        return f.read().strip().encode('utf-8')
+
+
+def load_or_create_key_file(key_path: str) -> bytes:
+    """인증 키 파일 읽기 (없으면 임의 키로 0600 생성)"""
+    try:
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, stat.S_IRUSR | stat.S_IWUSR)
+    except FileExistsError:
+        return read_key_file(key_path)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(secrets.token_hex(32))
+    print(f"인증 키 생성: {key_path}")
+    return read_key_file(key_path)
+
+
+def load_authkey(socket_path: str) -> bytes:
+    """
+    데몬 인증 키 (INFERENCE_AUTHKEY 환경 변수, 없으면 소켓 옆 키 파일)
+
+    Raises:
+        FileNotFoundError: 환경 변수와 키 파일이 모두 없음
+        PermissionError: 키 파일이 소유자 전용(0600)이 아님
+    """
+    authkey = os.environ.get('INFERENCE_AUTHKEY')
+    if authkey:
+        return authkey.encode('utf-8')
+    return read_key_file(authkey_path(socket_path))
+
+
+class InferenceClient:
+    """
+    추론 데몬 연결 풀
+
+    Connection은 스레드 간에 공유할 수 없으므로 호출마다 풀에서 연결 하나를 빌려 쓰고,
+    비어 있으면 새로 연다 (API 서버의 요청 스레드가 동시에 호출 가능).
+    """
+
+    def __init__(self, address: str, authkey: bytes):
+        """
+        Args:
+            address: 데몬 유닉스 소켓 경로
+            authkey: 연결 인증 키 (데몬과 같아야 함, 서로 인증한 뒤에만 메시지를 주고받음)
+        """
+        self.address = address
+        self.authkey = authkey
+        self._pool: 'queue.LifoQueue' = queue.LifoQueue()
+        self._request_ids = itertools.count(1)
+
+    def _connect(self):
+        """새 연결 생성 (데몬의 준비 완료 메시지 확인)"""
+        conn = Client(self.address, family='AF_UNIX', authkey=self.authkey)
+        _, ok, payload = conn.recv()
+        if not ok:
+            conn.close()
+            raise RuntimeError(f"추론 데몬 준비 실패: {payload}")
+        return conn
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        """
+        데몬 메서드 호출
+
+        메시지 형식은 샤드 노드와 같다: 요청 (request_id, method, args, kwargs) -> 응답 (request_id, 성공 여부, 결과)
+
+        Args:
+            method: 메서드 이름 (INFERENCE_METHODS)
+            *args, **kwargs: 메서드 인자
+
+        Returns:
+            Any: 결과 (데몬 오류는 RuntimeError)
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+
+        request_id = next(self._request_ids)
+        try:
+            conn.send((request_id, method, args, kwargs))
+            reply_id, ok, payload = conn.recv()
+        except Exception:
+            # 끊긴 연결은 풀에 돌려놓지 않음
+            conn.close()
+            raise
+        if reply_id != request_id:
+            conn.close()
+            raise RuntimeError(f"추론 데몬 응답 순서 오류: {reply_id} != {request_id}")
+        self._pool.put(conn)
+
+        if not ok:
+            raise RuntimeError(f"추론 데몬 오류 ({method}): {payload}")
+        return payload
+
+    def close(self):
+        """풀의 연결 모두 종료"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def connect_inference_daemon(address: Optional[str] = None) -> Optional[InferenceClient]:
+    """
+    추론 데몬 클라이언트 생성 (설정이 없거나 데몬이 응답하지 않으면 None)
+
+    소켓 디렉토리가 현재 사용자 전용(0700)이 아니거나 인증 키가 없으면 연결하지 않는다
+    (다른 사용자가 미리 만든 소켓으로 pickle을 받지 않도록).
+
+    Args:
+        address: 소켓 경로 (None이면 INFERENCE_SOCKET 환경 변수, 빈 문자열이면 데몬 사용 안 함)
+
+    Returns:
+        Optional[InferenceClient]: 연결된 클라이언트
+    """
+    if address is None:
+        address = os.environ.get('INFERENCE_SOCKET')
+    if not address:
+        return None
+
+    try:
+        check_private(os.path.dirname(os.path.abspath(address)), directory=True)
+        client = InferenceClient(address, load_authkey(address))
+        client.call('ping')
+    except Exception as e:
+        print(f"추론 데몬 연결 실패 ({address}), 모델을 직접 로드합니다: {str(e)}")
+        return None
+    return client
+
+
+class RemoteSentenceModel:
+    """
+    데몬의 SentenceTransformer를 사용하는 대리 모델
+
+    SentenceTransformer.encode / get_sentence_embedding_dimension과 같은 형태로 동작하므로
+    embedder.model.encode(...)를 호출하는 기존 코드를 그대로 쓸 수 있다.
+    """
+
+    def __init__(self, client: InferenceClient, model_name: str, trust_remote_code: bool = False):
+        """
+        Args:
+            client: 추론 데몬 클라이언트
+            model_name: 모델 이름 (데몬이 처음 요청될 때 로드)
+            trust_remote_code: SentenceTransformer trust_remote_code 옵션
+        """
+        self.client = client
+        self.model_name = model_name
+        self._dimension = client.call('load_sentence', model_name, trust_remote_code)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dimension
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32,
+               normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        """
+        텍스트 임베딩 (문자열 하나면 1차원, 목록이면 2차원 배열)
+
+        Args:
+            sentences: 텍스트 또는 텍스트 목록
+            batch_size: 데몬의 모델 배치 크기
+            normalize_embeddings: L2 정규화 여부
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        embeddings = self.client.call('encode', self.model_name, texts, batch_size, normalize_embeddings)
+        return embeddings[0] if single else embeddings
+
@@ -0,0 +1,57 @@
+"""
+의미 기반 검색용 문장 임베딩 모듈
+"""
+
+import numpy as np
+from typing import List, Optional, Union
+
+from app.embedding.inference_client import connect_inference_daemon, RemoteSentenceModel
+
+
+class SemanticEncoder:
+    """
+    한국어 문장 의미 임베딩 생성기 (키워드/코드 임베딩 보완용)
+    """
+
+    def __init__(self, model_name: str = 'jhgan/ko-sroberta-multitask',
+                 inference_socket: Optional[str] = None):
+        """
+        Args:
+            model_name: SentenceTransformer 모델 이름
+            inference_socket: 추론 데몬 소켓 경로 (None이면 INFERENCE_SOCKET 환경 변수, 빈 문자열이면 직접 로드)
+        """
+        self._model_name = model_name
+        client = connect_inference_daemon(inference_socket)
+        if client is not None:
+            self.model = RemoteSentenceModel(client, model_name)
+        else:
+            from sentence_transformers import SentenceTransformer
+            self.model = SentenceTransformer(model_name)
+        self._vector_dim = self.model.get_sentence_embedding_dimension()
+
+    @property
+    def vector_dim(self) -> int:
+        """임베딩 벡터의 차원 수"""
+        return self._vector_dim
+
+    @property
+    def model_name(self) -> str:
+        """모델 이름"""
+        return self._model_name
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32) -> np.ndarray:
+        """
+        텍스트를 정규화된 임베딩 행렬로 변환
+
+        Args:
+            texts: 임베딩할 텍스트 또는 텍스트 목록
+            batch_size: 배치 크기
+
+        Returns:
+            np.ndarray: (텍스트 수, 차원) float32 배열 (L2 정규화됨)
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+
+        embeddings = self.model.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+        return np.asarray(embeddings, dtype='float32').reshape(len(texts), -1)
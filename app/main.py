@@ -8,10 +8,13 @@ import os
 import sys
 import time
 import json
-import httpx
+import asyncio
+import numpy as np
 from typing import Dict, List, Any, Optional, Union 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, Field
 
 # 상대 경로 import를 위한 경로 추가
@@ -21,7 +24,18 @@ from app.parser.vue_parser import parse_vue_project
 from app.fragmenter.fragmenter import VueFragmenter
 from app.embedding.embedder import CodeEmbedder
 from app.embedding.cross_encoder import CrossEncoder
+from app.embedding.semantic_encoder import SemanticEncoder
 from app.storage.faiss_store import FaissVectorStore
+from app.storage.search_executor import SearchExecutor
+from app.storage.store_registry import StoreRegistry, ProjectHandle
+from app.storage.deadline import Deadline
+from app.server.request_executor import RequestExecutor
+from app.server.forwarder import ResultForwarder
+from app.server.result_cache import ResultCache, request_digest
+from app.server.semantic_cache import SemanticQueryCache
+from app.server.single_flight import SingleFlight
+from app.server.rerank_batcher import RerankBatcher
+from app.server.admission import AdmissionController, AdmissionTicket, Overloaded
 
 # FastAPI 앱 생성
 app = FastAPI(
@@ -40,23 +54,55 @@ app.add_middleware(
 )
 
 # 전역 변수로 서비스 인스턴스 관리
-vector_store = None
+# 프로젝트 저장소는 스냅샷 교체/메모리 제거 시 참조만 바뀌므로 요청 처리 중에는 핸들을 한 번만 얻는다
+store_registry = None
 embedder = None
 cross_encoder = None
+semantic_encoder = None
+search_executor = None
+request_executor = None
+result_forwarder = None
+result_cache = None
+semantic_cache = None
+# 동시에 들어온 같은 /search 요청 합치기 (이벤트 루프 안에서만 사용)
+single_flight = SingleFlight()
+rerank_batcher = None
+admission = None
 
-# 두 번째 백엔드 URL 환경 변수에서 로드
-SECOND_BACKEND_URL = "http://codecooking-backend.20.214.196.128.nip.io/workflow/fragment/save-result"
+# 두 번째 백엔드 URL 환경 변수에서 로드 (빈 값이면 전송 안 함)
+SECOND_BACKEND_URL = os.getenv(
+    "SECOND_BACKEND_URL",
+    "http://codecooking-backend.20.214.196.128.nip.io/workflow/fragment/save-result"
+)
 
 # Pydantic 모델 정의
 class SearchRequest(BaseModel):
     query: str = Field(..., description="검색 쿼리")
+    project: Optional[str] = Field(None, description="검색할 프로젝트 (기본값: DEFAULT_PROJECT)")
     k: int = Field(5, description="반환할 결과 수", ge=1, le=20)
     rerank: bool = Field(True, description="Cross-Encoder 재랭킹 여부")
     filters: Optional[Dict[str, Any]] = Field(None, description="검색 필터")
     ensemble_weight: float = Field(0.5, description="앙상블 가중치", ge=0.0, le=1.0)
+    fusion: Optional[str] = Field(None, description="결과 결합 방식 (max, minmax, zscore, rrf)")
+    graph_expand: int = Field(0, description="상위 결과별로 후보에 추가할 kNN 이웃 수 (0이면 사용 안 함)", ge=0, le=16)
+    dependency_expand: Optional[str] = Field(None, description="상위 결과 파일의 부모/자식 컴포넌트 파편 추가 (parents, children, both)")
+    semantic: bool = Field(True, description="의미 기반 검색기 사용 여부")
+    timeout_ms: Optional[int] = Field(None, description="지연 시간 예산(ms), 넘을 것 같은 단계는 줄이거나 건너뜀 (없으면 무제한)", ge=1, le=60000)
     # requirementId를 Optional[Union[int, str]]로 수정하여 정수 또는 문자열 모두 허용
     requirementId: Optional[Union[int, str]] = Field(None, description="요구사항 ID")
 
+class BatchSearchRequest(BaseModel):
+    queries: List[str] = Field(..., description="검색 쿼리 목록", min_length=1, max_length=256)
+    project: Optional[str] = Field(None, description="검색할 프로젝트 (기본값: DEFAULT_PROJECT)")
+    k: int = Field(5, description="쿼리별 반환할 결과 수", ge=1, le=20)
+    rerank: bool = Field(True, description="Cross-Encoder 재랭킹 여부")
+    filters: Optional[Dict[str, Any]] = Field(None, description="검색 필터 (모든 쿼리 공통)")
+    ensemble_weight: float = Field(0.5, description="앙상블 가중치", ge=0.0, le=1.0)
+    fusion: Optional[str] = Field(None, description="결과 결합 방식 (max, minmax, zscore, rrf)")
+    graph_expand: int = Field(0, description="상위 결과별로 후보에 추가할 kNN 이웃 수 (0이면 사용 안 함)", ge=0, le=16)
+    dependency_expand: Optional[str] = Field(None, description="상위 결과 파일의 부모/자식 컴포넌트 파편 추가 (parents, children, both)")
+    semantic: bool = Field(True, description="의미 기반 검색기 사용 여부")
+
 class FragmentResult(BaseModel):
     id: str
     score: float
@@ -76,6 +122,18 @@ class SearchResponse(BaseModel):
     reranked: bool
     requirementId: Optional[int] = None
     results: List[FragmentResult]
+    degraded: List[str] = []  # 지연 시간 예산 또는 과부하 때문에 줄이거나 건너뛴 단계 (semantic, keyword, rerank 등)
+
+class SearchStreamEvent(SearchResponse):
+    stage: str  # first_stage (결합 점수 순 1차 결과), reranked (재랭킹 결과), cached (캐시 결과)
+    final: bool  # 마지막 이벤트 여부
+
+class BatchSearchResponse(BaseModel):
+    total_queries: int
+    elapsed_time: float
+    reranked: bool
+    responses: List[SearchResponse]
+    degraded: List[str] = []  # 과부하 축소 모드에서 끈 단계
 
 # 두 번째 백엔드를 위한 모델
 class SecondBackendFragmentResult(BaseModel):
@@ -138,103 +196,277 @@ def remove_unnecessary_fragments(results: List[Dict[str, Any]]) -> List[Dict[str
     
     return final_results
 
-async def send_to_second_backend(query: str, results: List[Dict[str, Any]], elapsed_time: float, reranked: bool, requirement_id: Optional[Union[int, str]] = None):
+def build_fragment_results(handle: ProjectHandle, results: List[Dict[str, Any]]) -> List[FragmentResult]:
     """
-    두 번째 백엔드로 검색 결과 전송
+    검색 결과를 API 응답 형식으로 변환 (불필요한 파편 제거 + 전체 내용 로드)
     
     Args:
+        handle: 검색에 사용한 프로젝트 핸들
+        results: 벡터 저장소 검색 결과 리스트
+        
+    Returns:
+        List[FragmentResult]: 응답용 결과 리스트
+    """
+    # 불필요한 파편 제거 (component 우선)
+    filtered_results = remove_unnecessary_fragments(results)
+    
+    # 최종 결과의 메타데이터와 전체 컨텐츠만 한 번에 로드
+    store = handle.store
+    result_ids = [r['id'] for r in filtered_results]
+    metadata_map = store.fragment_metadata.get_many(result_ids)
+    full_contents = store.get_fragment_contents(result_ids)
+    
+    # 결과 가공
+    fragment_results = []
+    for result in filtered_results:
+        # 상대 경로 추가 (프로젝트 소스 루트 기준)
+        relative_path = handle.relative_path(result['file_path'])
+        
+        # 메타데이터와 전체 컨텐츠 가져오기
+        metadata = metadata_map.get(result['id'], {})
+        full_content = full_contents.get(result['id'], '')
+        
+        # content_preview 필드 확인 및 수정
+        content_preview = result.get('content_preview', '')
+        if not content_preview or isinstance(content_preview, int):
+            # 메타데이터에서 content_preview를 다시 가져오거나 생성
+            content_preview = metadata.get('content_preview', '')
+            if not content_preview:
+                # 전체 내용이 있으면 처음 150자를 미리보기로 사용
+                content_preview = (full_content[:150] + "...") if len(full_content) > 150 else full_content
+        
+        # 컴포넌트 이름 추가
+        component_name = metadata.get('component_name', '')
+        
+        # 최종 결과 생성
+        fragment_results.append(FragmentResult(
+            id=result['id'],
+            score=result['score'],
+            cross_score=result.get('cross_score'),
+            type=result['type'],
+            name=result['name'],
+            relative_path=relative_path,
+            file_name=result['file_name'],
+            content=full_content,
+            content_preview=content_preview,
+            component_name=component_name
+        ))
+    
+    return fragment_results
+
+def build_forward_payload(handle: ProjectHandle, query: str, results: List[Dict[str, Any]], elapsed_time: float, reranked: bool, requirement_id: Optional[Union[int, str]] = None) -> Dict[str, Any]:
+    """
+    두 번째 백엔드로 보낼 검색 결과 본문 생성
+    
+    Args:
+        handle: 검색에 사용한 프로젝트 핸들
         query: 검색 쿼리
         results: 원본 검색 결과 (필터링되지 않은)
         elapsed_time: 검색 소요 시간
         reranked: 재랭킹 적용 여부
         requirement_id: 요구사항 ID (정수 또는 문자열)
+        
+    Returns:
+        Dict: SecondBackendSearchResponse 형식의 JSON 본문
     """
-    try:
-        # 결과 가공
-        fragment_results = []
-        for idx, result in enumerate(results):
-            # 상대 경로 추가
-            full_path = result['file_path']
-            try:
-                todo_web_index = full_path.index('todo-web')
-                relative_path = full_path[todo_web_index:]
-            except ValueError:
-                relative_path = full_path
-            
-            # 메타데이터에서 정보 가져오기
-            metadata = vector_store.fragment_metadata.get(result['id'], {})
-            
-            # content_preview 처리
-            content_preview = result.get('content_preview', '')
-            if not content_preview or isinstance(content_preview, int):
-                content_preview = metadata.get('content_preview', '')
-                if not content_preview:
-                    full_content = metadata.get('full_content', '')
-                    content_preview = (full_content[:150] + "...") if len(full_content) > 150 else full_content
-            
-            # 결과 항목 생성
-            fragment_result = {
-                'id': result['id'],
-                'score': result['score'],
-                'cross_score': result.get('cross_score'),
-                'type': result['type'],
-                'name': result['name'],
-                'relative_path': relative_path,
-                'file_name': result['file_name'],
-                'content_preview': content_preview,
-                'component_name': metadata.get('component_name', '')
-            }
-            
-            # 첫 번째 결과 항목에 대한 상세 로그 (디버깅용)
-            if idx == 0:
-                print(f"첫 번째 결과 항목 상세: {json.dumps(fragment_result, ensure_ascii=False)}")
-            
-            fragment_results.append(fragment_result)
+    store = handle.store
+    
+    # 메타데이터는 한 번에 로드
+    metadata_map = store.fragment_metadata.get_many([result['id'] for result in results])
+    
+    # 결과 가공
+    fragment_results = []
+    for result in results:
+        # 상대 경로 추가 (프로젝트 소스 루트 기준)
+        relative_path = handle.relative_path(result['file_path'])
         
-        # 두 번째 백엔드에 전송할 응답 구성
-        response_data = {
-            'query': query,
-            'total_results': len(fragment_results),
-            'elapsed_time': elapsed_time,
-            'reranked': reranked,
-            'requirementId': requirement_id,  # null 또는 실제 값 그대로 전달
-            'results': fragment_results
-        }
+        # 메타데이터에서 정보 가져오기
+        metadata = metadata_map.get(result['id'], {})
         
-        # 디버깅을 위한 JSON 로그 (결과 배열은 length만 표시)
-        log_data = response_data.copy()
-        log_data['results'] = f"[{len(fragment_results)} items]"
-        print(f"두 번째 백엔드 전송 데이터 (results 필드 포함): {json.dumps(response_data, ensure_ascii=False)}")
-                
-        # 첫 번째 결과 항목의 content_preview 길이 확인 (디버깅용)
-        if fragment_results:
-            preview = fragment_results[0].get('content_preview', '')
-            print(f"첫 번째 결과의 content_preview 길이: {len(preview)}, 타입: {type(preview)}")
+        # content_preview 처리
+        content_preview = result.get('content_preview', '')
+        if not content_preview or isinstance(content_preview, int):
+            content_preview = metadata.get('content_preview', '')
+            if not content_preview:
+                full_content = store.get_fragment_content(result['id'])
+                content_preview = (full_content[:150] + "...") if len(full_content) > 150 else full_content
         
-        # 비동기 HTTP 클라이언트로 두 번째 백엔드에 전송
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                SECOND_BACKEND_URL,
-                json=response_data,
-                timeout=5.0  # 타임아웃 5초로 설정
-            )
-            print(f"두 번째 백엔드 응답 코드: {response.status_code}")
-            print(f"두 번째 백엔드 응답 헤더: {response.headers}")
-            
-            # 응답 내용이 있는 경우 로깅
-            if response.text:
-                # 너무 길지 않게 처음 200자만 로깅
-                print(f"두 번째 백엔드 응답 내용: {response.text[:200]}...")
-            
+        fragment_results.append({
+            'id': result['id'],
+            'score': result['score'],
+            'cross_score': result.get('cross_score'),
+            'type': result['type'],
+            'name': result['name'],
+            'relative_path': relative_path,
+            'file_name': result['file_name'],
+            'content_preview': content_preview,
+            'component_name': metadata.get('component_name', '')
+        })
+    
+    return {
+        'query': query,
+        'total_results': len(fragment_results),
+        'elapsed_time': elapsed_time,
+        'reranked': reranked,
+        'requirementId': requirement_id,  # null 또는 실제 값 그대로 전달
+        'results': fragment_results
+    }
+
+async def send_to_second_backend(handle: ProjectHandle, query: str, results: List[Dict[str, Any]], elapsed_time: float, reranked: bool, requirement_id: Optional[Union[int, str]] = None):
+    """
+    두 번째 백엔드 전송 예약 (응답 전송 후 백그라운드 작업으로 실행)
+    
+    본문을 만든 뒤 전송기 큐에 넣기만 하므로 검색 응답 시간은 두 번째 백엔드와 무관하다.
+    실제 전송(연결 재사용, 재시도, 장애 시 디스크 저장)은 ResultForwarder가 담당한다.
+    
+    Args:
+        handle: 검색에 사용한 프로젝트 핸들
+        query: 검색 쿼리
+        results: 원본 검색 결과 (필터링되지 않은)
+        elapsed_time: 검색 소요 시간
+        reranked: 재랭킹 적용 여부
+        requirement_id: 요구사항 ID (정수 또는 문자열)
+    """
+    try:
+        payload = await request_executor.run(
+            build_forward_payload, handle, query, results, elapsed_time, reranked, requirement_id
+        )
+        queued = result_forwarder.submit(payload)
+        print(f"두 번째 백엔드 전송 예약 (결과 {payload['total_results']}개, 요구사항 ID: {requirement_id}, "
+              f"{'메모리 큐' if queued else '디스크 큐'})")
     except Exception as e:
-        print(f"두 번째 백엔드 전송 오류 (무시됨): {str(e)}")
-        import traceback
-        print(traceback.format_exc())
+        print(f"두 번째 백엔드 전송 준비 오류 (무시됨): {str(e)}")
+
+def load_retriever_timeouts() -> Dict[str, float]:
+    """
+    환경 변수에서 검색기별 제한 시간(초) 로드
+    (VECTOR_TIMEOUT, KEYWORD_TIMEOUT, SEMANTIC_TIMEOUT)
+    """
+    timeouts = {}
+    for name in ('vector', 'keyword', 'semantic'):
+        value = os.getenv(f"{name.upper()}_TIMEOUT")
+        if value:
+            timeouts[name] = float(value)
+    return timeouts
+
+def open_vector_store(data_dir: str, index_name: str, read_only: bool) -> FaissVectorStore:
+    """
+    공유 모델/실행기로 벡터 저장소 열기 (모든 프로젝트가 같은 모델 인스턴스 사용)
+    
+    Args:
+        data_dir: 저장소 데이터 디렉토리 또는 스냅샷 디렉토리
+        index_name: 인덱스 이름
+        read_only: 불변 스냅샷으로 열지 여부
+    """
+    return FaissVectorStore(
+        dimension=embedder.vector_dim,
+        index_type='Cosine',
+        data_dir=data_dir,
+        index_name=index_name,
+        cross_encoder=cross_encoder,
+        semantic_encoder=semantic_encoder,
+        fusion_method=os.getenv("FUSION_METHOD", "max"),
+        search_executor=search_executor,
+        retriever_timeouts=load_retriever_timeouts(),
+        # 검색 서버는 읽기 전용이므로 인덱스를 메모리 맵으로 로드 (워커 간 페이지 공유)
+        use_mmap=os.getenv("INDEX_MMAP", "1") != "0",
+        read_only=read_only
+    )
+
+async def get_project(project: Optional[str]) -> ProjectHandle:
+    """
+    요청한 프로젝트의 핸들을 참조를 잡아 반환 (메모리에 없으면 백그라운드 스레드에서 로드)
+    
+    요청이 끝나면 handle.release()로 반납해야 하며, 그 전에 프로젝트가 제거/교체되어도
+    저장소는 반납 시점까지 닫히지 않는다.
+    
+    Args:
+        project: 프로젝트 이름 (None이면 기본 프로젝트)
+        
+    Returns:
+        ProjectHandle: 참조를 잡은 프로젝트 핸들
+    """
+    if not store_registry or not embedder:
+        raise HTTPException(status_code=503, detail="서비스 초기화되지 않음")
+    
+    handle = store_registry.peek(project)
+    if handle is not None and handle.acquire():
+        return handle
+    
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, store_registry.acquire, project)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+async def admit_request() -> Optional[AdmissionTicket]:
+    """
+    검색 요청 수락 (수락 제어가 없으면 None)
+    
+    Returns:
+        Optional[AdmissionTicket]: 수락 표 (처리 후 release_request로 반납)
+        
+    Raises:
+        HTTPException: 대기열이 가득 차면 429, 대기 시간을 넘기면 503 (Retry-After 헤더 포함)
+    """
+    if admission is None:
+        return None
+    try:
+        return await admission.acquire()
+    except Overloaded as e:
+        raise HTTPException(status_code=e.status_code, detail=e.reason,
+                            headers={"Retry-After": str(e.retry_after)})
+
+def release_request(ticket: Optional[AdmissionTicket]):
+    """수락 표 반납 (여러 번 호출해도 안전)"""
+    if ticket is not None:
+        admission.release(ticket)
+
+def degrade_request(request, ticket: Optional[AdmissionTicket]):
+    """
+    축소 모드에서 끌 단계를 요청에 반영 (SearchRequest / BatchSearchRequest)
+    
+    Args:
+        request: 검색 요청
+        ticket: 수락 표
+        
+    Returns:
+        Tuple: (반영된 요청, 실제로 끈 단계 목록)
+    """
+    if ticket is None or not ticket.degrade:
+        return request, []
+    update = {}
+    if 'rerank' in ticket.degrade and request.rerank and cross_encoder is not None:
+        update['rerank'] = False
+    if 'semantic' in ticket.degrade and request.semantic:
+        update['semantic'] = False
+    if not update:
+        return request, []
+    return request.copy(update=update), list(update)
+
+async def watch_snapshots(interval: float):
+    """메모리에 있는 프로젝트의 LATEST 스냅샷을 주기적으로 확인하여 바뀌면 교체"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        for info in store_registry.resident():
+            try:
+                latest = store_registry.snapshot_manager(info['project']).latest()
+                if latest and latest != info['index_version']:
+                    await loop.run_in_executor(None, store_registry.reload, info['project'], latest)
+                    if result_cache:
+                        result_cache.invalidate(info['project'])
+                    if semantic_cache:
+                        semantic_cache.invalidate(info['project'])
+            except Exception as e:
+                print(f"스냅샷 확인 오류 (프로젝트: {info['project']}, 무시됨): {str(e)}")
 
 @app.on_event("startup")
 async def startup_event():
     """서버 시작 시 자원 초기화"""
-    global vector_store, embedder, cross_encoder
+    global store_registry, embedder, cross_encoder, semantic_encoder, search_executor, request_executor, result_forwarder, result_cache, semantic_cache, rerank_batcher, admission
     
     data_dir = os.getenv("DATA_DIR", "./data")
     
@@ -246,161 +478,648 @@ async def startup_event():
     try:
         cross_encoder = CrossEncoder(model_name=cross_encoder_model)
         print(f"Cross-Encoder 모델 로드 성공: {cross_encoder_model}")
+        
+        # 동시 요청의 재랭킹 쌍을 RERANK_MAX_WAIT_MS 동안 모아 한 번에 추론 (0이면 요청별 추론)
+        # 추론 데몬을 사용하면 데몬이 모든 프로세스의 요청을 모아 배치 처리하므로 생략
+        rerank_max_wait = float(os.getenv("RERANK_MAX_WAIT_MS", "5"))
+        if rerank_max_wait > 0 and cross_encoder.inference_client is None:
+            rerank_batcher = RerankBatcher(
+                cross_encoder.compute_scores,
+                max_batch=int(os.getenv("RERANK_MAX_BATCH", "64")),
+                max_wait_ms=rerank_max_wait
+            )
+            cross_encoder.set_batcher(rerank_batcher)
     except Exception as e:
         print(f"Cross-Encoder 모델 로드 실패: {str(e)}")
         cross_encoder = None
     
-    # Faiss 벡터 저장소 초기화
-    vector_store = FaissVectorStore(
-        dimension=embedder.vector_dim,
-        index_type='Cosine',
-        data_dir=data_dir,
-        index_name='vue_todo_fragments',
-        cross_encoder=cross_encoder
+    # 의미 기반 검색 인코더 초기화 (첫 요청에서 모델을 로드하지 않도록 미리 준비)
+    semantic_encoder = SemanticEncoder()
+    
+    # 프로젝트/스냅샷이 바뀌어도 유지되는 1차 검색기 실행기
+    search_executor = SearchExecutor(max_workers=8)
+    
+    # 요청 단위 임베딩/검색/재랭킹 실행기 (SEARCH_CONCURRENCY개까지 동시 실행, 나머지는 대기)
+    search_concurrency = int(os.getenv("SEARCH_CONCURRENCY", "4"))
+    request_executor = RequestExecutor(max_concurrency=search_concurrency)
+    
+    # 검색 요청 수락 제어 (ADMISSION_CONCURRENCY개 동시 처리, ADMISSION_QUEUE개까지 대기, 넘으면 429/503)
+    # 대기열이 DEGRADE_QUEUE_DEPTH 이상이거나 최근 p95가 DEGRADE_P95_MS 이상이면 재랭킹부터 끔 (0이면 사용 안 함)
+    admission = AdmissionController(
+        max_concurrency=int(os.getenv("ADMISSION_CONCURRENCY", str(search_concurrency * 2))),
+        max_queue=int(os.getenv("ADMISSION_QUEUE", "32")),
+        queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5")),
+        degrade_queue_depth=int(os.getenv("DEGRADE_QUEUE_DEPTH", "8")),
+        degrade_p95_ms=float(os.getenv("DEGRADE_P95_MS", "0"))
+    )
+    
+    # /search 결과 캐시 (RESULT_CACHE_MB가 0이면 사용 안 함, 인덱스 버전이 바뀌면 자동 무효화)
+    cache_bytes = int(float(os.getenv("RESULT_CACHE_MB", "64")) * (1 << 20))
+    if cache_bytes > 0:
+        result_cache = ResultCache(
+            max_bytes=cache_bytes,
+            ttl=float(os.getenv("RESULT_CACHE_TTL", "300")),
+            max_entries=int(os.getenv("RESULT_CACHE_ENTRIES", "10000"))
+        )
+    
+    # 의미 기반 쿼리 캐시 (SEMANTIC_CACHE_THRESHOLD 이상 유사한 최근 쿼리의 결과 재사용, 미설정 시 사용 안 함)
+    semantic_threshold = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0") or 0)
+    if semantic_threshold > 0:
+        semantic_cache = SemanticQueryCache(
+            threshold=semantic_threshold,
+            max_entries=int(os.getenv("SEMANTIC_CACHE_ENTRIES", "2000")),
+            ttl=float(os.getenv("SEMANTIC_CACHE_TTL", "600"))
+        )
+    
+    # 두 번째 백엔드 전송기 (전송 실패분은 {DATA_DIR}/forward_queue에 저장 후 재전송)
+    if SECOND_BACKEND_URL:
+        result_forwarder = ResultForwarder(
+            url=SECOND_BACKEND_URL,
+            spill_dir=os.getenv("FORWARD_SPILL_DIR", os.path.join(data_dir, 'forward_queue')),
+            queue_size=int(os.getenv("FORWARD_QUEUE_SIZE", "1000")),
+            batch_size=int(os.getenv("FORWARD_BATCH_SIZE", "16")),
+            retry_interval=float(os.getenv("FORWARD_RETRY_INTERVAL", "30"))
+        )
+        await result_forwarder.start()
+    
+    # 프로젝트별 저장소 레지스트리 ({PROJECTS_DIR}/{프로젝트}, 기본 프로젝트는 DATA_DIR도 허용)
+    # STORE_MEMORY_BUDGET_MB를 넘으면 가장 오래 사용하지 않은 프로젝트부터 메모리에서 내림 (0이면 무제한)
+    store_registry = StoreRegistry(
+        projects_dir=os.getenv("PROJECTS_DIR", os.path.join(data_dir, 'projects')),
+        opener=open_vector_store,
+        memory_budget=int(float(os.getenv("STORE_MEMORY_BUDGET_MB", "0")) * (1 << 20)),
+        default_project=os.getenv("DEFAULT_PROJECT", "default"),
+        default_data_dir=data_dir
     )
     
-    print(f"서버 초기화 완료 - 벡터 수: {vector_store.index.ntotal}")
+    # 기본 프로젝트는 첫 요청이 기다리지 않도록 미리 로드
+    try:
+        store_registry.get()
+    except FileNotFoundError as e:
+        print(f"기본 프로젝트 미리 로드 생략: {str(e)}")
+    
+    # 스냅샷 자동 교체 (SNAPSHOT_POLL_INTERVAL초마다 LATEST 확인, 0이면 /admin/reload로만 교체)
+    poll_interval = float(os.getenv("SNAPSHOT_POLL_INTERVAL", "0"))
+    if poll_interval > 0:
+        asyncio.create_task(watch_snapshots(poll_interval))
+    
+    print(f"서버 초기화 완료 - 프로젝트: {', '.join(store_registry.projects()) or '없음'}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """서버 종료 시 전송기 / 실행기 정리"""
+    if result_forwarder:
+        await result_forwarder.stop()
+    if request_executor:
+        request_executor.shutdown()
+    if store_registry:
+        store_registry.close()
+    if search_executor:
+        search_executor.shutdown()
+    if rerank_batcher:
+        rerank_batcher.shutdown()
 
 @app.get("/")
 async def root():
     """API 상태 확인"""
+    default = store_registry.peek() if store_registry else None
     return {
         "status": "ok",
         "service": "Code Search API",
         "version": "1.0.0",
-        "vector_count": vector_store.index.ntotal if vector_store else 0,
-        "cross_encoder_enabled": cross_encoder is not None
+        "vector_count": default.store.index.ntotal if default else 0,
+        "index_version": default.version if default else None,
+        "resident_projects": len(store_registry.resident()) if store_registry else 0,
+        "cross_encoder_enabled": cross_encoder is not None,
+        "requests": request_executor.stats() if request_executor else None,
+        "forwarder": result_forwarder.stats() if result_forwarder else None,
+        "result_cache": result_cache.stats() if result_cache else None,
+        "semantic_cache": semantic_cache.stats() if semantic_cache else None,
+        "single_flight": single_flight.stats(),
+        "rerank_batcher": rerank_batcher.stats() if rerank_batcher else None,
+        "admission": admission.stats() if admission else None
+    }
+
+@app.get("/projects")
+async def list_projects():
+    """서비스 가능한 프로젝트와 메모리에 있는 프로젝트 목록"""
+    if not store_registry:
+        raise HTTPException(status_code=503, detail="서비스 초기화되지 않음")
+    
+    return {
+        "default_project": store_registry.default_project,
+        "projects": store_registry.projects(),
+        "resident": store_registry.resident(),
+        "memory_bytes": store_registry.memory_usage(),
+        "memory_budget": store_registry.memory_budget
     }
 
 @app.post("/search", response_model=SearchResponse)
-async def search_code(request: SearchRequest):
+async def search_code(request: SearchRequest, background_tasks: BackgroundTasks):
     """
     코드 검색 API 엔드포인트
+    
+    과부하 시 429/503으로 거절하거나 축소 모드(재랭킹 / 의미 기반 검색기 끔)로 처리한다.
     """
-    if not vector_store or not embedder:
-        raise HTTPException(status_code=503, detail="서비스 초기화되지 않음")
+    handle = await get_project(request.project)
     
     # 디버깅을 위한 로그 추가
     print(f"검색 요청 데이터: {request.dict()}")
     
     start_time = time.time()
+    deadline = Deadline.from_ms(request.timeout_ms)
+    try:
+        ticket = await admit_request()
+        try:
+            # 같은 요청 + 같은 인덱스 버전의 결과가 캐시에 있으면 그대로 사용 (예산 / 축소 모드와 관계없이 전체 결과)
+            digest = search_cache_digest(request)
+            cache_version = handle.cache_version
+            cached = result_cache.get(handle.name, cache_version, digest) if result_cache else None
+            
+            shed = []
+            if cached is None:
+                # 축소 모드면 끈 단계를 반영한 요청으로 다시 캐시 확인 후 실행
+                request, shed = degrade_request(request, ticket)
+                if shed:
+                    digest = search_cache_digest(request)
+                    cached = result_cache.get(handle.name, cache_version, digest) if result_cache else None
+            
+            if cached is not None:
+                results, fragment_results = cached
+                degraded = []
+            else:
+                # 동시에 들어온 같은 요청(같은 예산)은 한 번만 실행하고 결과 공유
+                results, fragment_results, degraded = await single_flight.do(
+                    (handle.name, cache_version, digest, request.timeout_ms),
+                    lambda: compute_search(handle, request, cache_version, digest, deadline)
+                )
+            degraded = shed + [stage for stage in degraded if stage not in shed]
+        finally:
+            release_request(ticket)
+    except BaseException:
+        handle.release()
+        raise
     
-    # 검색 쿼리 임베딩 생성
-    query_embedding = embedder.model.encode(request.query)
+    elapsed_time = time.time() - start_time
+    reranked = search_reranked(request, results)
     
-    # 필터 설정
-    filters = request.filters or {}
-    filters['query_text'] = request.query
-    filters['ensemble_weight'] = request.ensemble_weight
-    filters['rerank'] = request.rerank and cross_encoder is not None
+    # 두 번째 백엔드로 원본 결과 전송 (응답 후 백그라운드에서 큐에 추가)
+    if result_forwarder:
+        background_tasks.add_task(
+            send_to_second_backend,
+            handle=handle,
+            query=request.query,
+            results=results,
+            elapsed_time=elapsed_time,
+            requirement_id=request.requirementId,
+            reranked=reranked
+        )
     
-    # 검색 실행
-    results = vector_store.search(
-        query_vector=query_embedding,
-        k=request.k,
-        filters=filters,
-        rerank=request.rerank and cross_encoder is not None
+    response = SearchResponse(
+        query=request.query,
+        total_results=len(fragment_results),
+        elapsed_time=elapsed_time,
+        reranked=reranked,
+        requirementId=request.requirementId,
+        results=fragment_results,
+        degraded=degraded
     )
+    # 프로젝트 참조는 두 번째 백엔드 전송 준비까지 끝난 뒤 반납
+    background_tasks.add_task(handle.release)
+    return response
+
+@app.post("/search/stream")
+async def search_code_stream(request: SearchRequest, http_request: Request):
+    """
+    스트리밍 코드 검색 API 엔드포인트
     
-    elapsed_time = time.time() - start_time
+    결합 점수 순 1차 결과(first_stage)를 먼저 보내고, 재랭킹이 끝나면 재랭킹 결과(reranked)를 보낸다.
+    이벤트 본문은 SearchStreamEvent이며, Accept: text/event-stream이면 Server-Sent Events,
+    그 외에는 한 줄에 이벤트 하나인 NDJSON으로 응답한다.
+    캐시 또는 유사 쿼리 결과를 재사용하거나 재랭킹을 하지 않으면 이벤트 하나(final)만 보낸다.
+    timeout_ms가 있으면 /search와 같이 예산 안에서 단계를 줄이고 줄인 단계를 degraded로 알린다.
+    과부하 시 /search와 같이 스트림을 시작하기 전에 429/503으로 거절하거나 축소 모드로 처리한다.
+    """
+    handle = await get_project(request.project)
+    deadline = Deadline.from_ms(request.timeout_ms)
+    use_sse = 'text/event-stream' in http_request.headers.get('accept', '')
     
-    # 두 번째 백엔드로 원본 결과 전송 (비동기)
-    if SECOND_BACKEND_URL:
+    print(f"스트리밍 검색 요청 데이터: {request.dict()}")
+    
+    try:
+        ticket = await admit_request()
+    except BaseException:
+        handle.release()
+        raise
+    full_request = request
+    request, shed = degrade_request(request, ticket)
+    
+    def encode_event(event: SearchStreamEvent) -> str:
+        if use_sse:
+            return f"event: {event.stage}\ndata: {event.json()}\n\n"
+        return event.json() + "\n"
+    
+    async def events():
+        start_time = time.time()
+        reranked = request.rerank and cross_encoder is not None
+        
+        def make_event(stage: str, final: bool, is_reranked: bool, fragment_results: List[FragmentResult],
+                       skipped: List[str]) -> str:
+            return encode_event(SearchStreamEvent(
+                query=request.query,
+                total_results=len(fragment_results),
+                elapsed_time=time.time() - start_time,
+                reranked=is_reranked,
+                requirementId=request.requirementId,
+                results=fragment_results,
+                degraded=skipped,
+                stage=stage,
+                final=final
+            ))
+        
         try:
+            # /search와 같은 캐시 사용 (적중 시 최종 결과 하나만 전송, 전체 결과 우선)
+            cache_version = handle.cache_version
+            digest = search_cache_digest(full_request)
+            cached = result_cache.get(handle.name, cache_version, digest) if result_cache else None
+            if cached is not None:
+                yield make_event('cached', True, search_reranked(full_request, cached[0]), cached[1], [])
+                return
+            if shed:
+                digest = search_cache_digest(request)
+                cached = result_cache.get(handle.name, cache_version, digest) if result_cache else None
+                if cached is not None:
+                    yield make_event('cached', True, reranked, cached[1], shed)
+                    return
+            
+            query_embedding = await request_executor.run(embedder.model.encode, request.query)
+            params_digest = search_params_digest(request) if semantic_cache else None
+            similar = semantic_cache.lookup(handle.name, cache_version, params_digest, query_embedding) if params_digest else None
+            if similar is not None:
+                yield make_event('cached', True, reranked, similar[1][1], shed)
+                return
+            
+            # 1단계: 1차 검색 + 결합 (재랭킹 전 상위 k개를 바로 전송)
+            candidates = await request_executor.run(
+                handle.store.search_candidates, query_embedding, request.k, search_filters(request), reranked, deadline
+            )
+            first_results = candidates[:request.k]
+            first_fragment_results = await request_executor.run(build_fragment_results, handle, first_results)
+            yield make_event('first_stage', not reranked, False, first_fragment_results,
+                             shed + degraded_stages(deadline))
+            
+            if reranked:
+                # 2단계: Cross-Encoder 재랭킹
+                results = await request_executor.run(
+                    handle.store.rerank_candidates, request.query, candidates, request.k, deadline
+                )
+                fragment_results = await request_executor.run(build_fragment_results, handle, results)
+                yield make_event('reranked', True, search_reranked(request, results), fragment_results,
+                                 shed + degraded_stages(deadline))
+            else:
+                results, fragment_results = first_results, first_fragment_results
+        finally:
+            release_request(ticket)
+        
+        # 최종 결과는 /search와 같이 캐시에 저장하고 (예산 때문에 줄인 결과 제외) 두 번째 백엔드로 전송
+        degraded = degraded_stages(deadline)
+        if params_digest and not degraded:
+            semantic_cache.put(handle.name, cache_version, params_digest, query_embedding,
+                               request.query, (results, fragment_results))
+        if result_cache and not degraded:
+            result_cache.put(handle.name, cache_version, digest, (results, fragment_results),
+                             estimate_result_bytes(results, fragment_results))
+        if result_forwarder:
             await send_to_second_backend(
+                handle=handle,
                 query=request.query,
                 results=results,
-                elapsed_time=elapsed_time,
+                elapsed_time=time.time() - start_time,
                 requirement_id=request.requirementId,
-                reranked=request.rerank and cross_encoder is not None
+                reranked=search_reranked(request, results)
             )
-        except Exception as e:
-            print(f"두 번째 백엔드 전송 오류 (무시됨): {str(e)}")
-            # 오류가 발생해도 계속 진행
     
-    # 불필요한 파편 제거 (component 우선)
-    filtered_results = remove_unnecessary_fragments(results)
+    def finish_stream():
+        release_request(ticket)
+        handle.release()
     
-    # 결과 가공
-    fragment_results = []
-    for result in filtered_results:
-        # 상대 경로 추가
-        full_path = result['file_path']
-        try:
-            todo_web_index = full_path.index('todo-web')
-            relative_path = full_path[todo_web_index:]
-        except ValueError:
-            relative_path = full_path
+    media_type = 'text/event-stream' if use_sse else 'application/x-ndjson'
+    # 스트림이 시작되지 않고 끝나도 수락 표를 반납하도록 응답 후 작업으로도 반납
+    # (프로젝트 참조는 스트림이 끝난 뒤 여기서만 반납)
+    return StreamingResponse(events(), media_type=media_type, headers={'Cache-Control': 'no-cache'},
+                             background=BackgroundTask(finish_stream))
+
+async def compute_search(handle: ProjectHandle, request: SearchRequest, cache_version: str, digest: str,
+                         deadline: Optional[Deadline] = None):
+    """
+    캐시에 없는 검색 실행 후 캐시에 저장 (같은 요청끼리 single-flight로 공유됨)
+    
+    예산 때문에 단계를 줄인 결과는 캐시에 저장하지 않는다.
+    
+    Args:
+        handle: 검색할 프로젝트 핸들
+        request: 검색 요청 (같은 digest의 요청 중 처음 도착한 것)
+        cache_version: 캐시 키용 인덱스 버전
+        digest: 요청 해시
+        deadline: 요청 지연 시간 예산 (None이면 무제한)
         
-        # 메타데이터에서 전체 컨텐츠 가져오기
-        metadata = vector_store.fragment_metadata.get(result['id'], {})
-        full_content = metadata.get('full_content', '')
+    Returns:
+        Tuple: (저장소 검색 결과, 응답용 결과, 줄이거나 건너뛴 단계 목록)
+    """
+    # 임베딩 / 검색 / 재랭킹은 이벤트 루프 밖에서 실행
+    query_embedding = await request_executor.run(embedder.model.encode, request.query)
+    
+    # 표현만 다른 최근 쿼리가 있으면 그 결과 재사용 (검색기 / Cross-Encoder 생략)
+    params_digest = search_params_digest(request) if semantic_cache else None
+    similar = semantic_cache.lookup(handle.name, cache_version, params_digest, query_embedding) if params_digest else None
+    
+    if similar is not None:
+        similar_query, (results, fragment_results), similarity = similar
+        print(f"유사 쿼리 결과 재사용 (유사도: {similarity:.3f}, 캐시된 쿼리: {similar_query})")
+    else:
+        results = await request_executor.run(run_search, handle, request, query_embedding, deadline)
         
-        # content_preview 필드 확인 및 수정
-        content_preview = result.get('content_preview', '')
-        if not content_preview or isinstance(content_preview, int):
-            # 메타데이터에서 content_preview를 다시 가져오거나 생성
-            content_preview = metadata.get('content_preview', '')
-            if not content_preview:
-                # 전체 내용이 있으면 처음 150자를 미리보기로 사용
-                content_preview = (full_content[:150] + "...") if len(full_content) > 150 else full_content
+        # 결과 가공 (메타데이터 / 전체 내용 로드)
+        fragment_results = await request_executor.run(build_fragment_results, handle, results)
         
-        # 컴포넌트 이름 추가
-        component_name = metadata.get('component_name', '')
+        if params_digest and not degraded_stages(deadline):
+            semantic_cache.put(handle.name, cache_version, params_digest, query_embedding,
+                               request.query, (results, fragment_results))
+    
+    degraded = degraded_stages(deadline)
+    if result_cache and not degraded:
+        result_cache.put(handle.name, cache_version, digest, (results, fragment_results),
+                         estimate_result_bytes(results, fragment_results))
+    return results, fragment_results, degraded
+
+def degraded_stages(deadline: Optional[Deadline]) -> List[str]:
+    """지연 시간 예산 때문에 줄이거나 건너뛴 단계 목록 (예산이 없으면 빈 목록)"""
+    return list(deadline.degraded) if deadline is not None else []
+
+def search_reranked(request: SearchRequest, results: List[Dict[str, Any]]) -> bool:
+    """
+    응답의 reranked 값 (예산 때문에 재랭킹을 전혀 하지 못했으면 False)
+    
+    Args:
+        request: 검색 요청
+        results: 저장소 검색 결과
         
-        # 최종 결과 생성
-        fragment_results.append(FragmentResult(
-            id=result['id'],
-            score=result['score'],
-            cross_score=result.get('cross_score'),
-            type=result['type'],
-            name=result['name'],
-            relative_path=relative_path,
-            file_name=result['file_name'],
-            content=full_content,
-            content_preview=content_preview,
-            component_name=component_name
-        ))
+    Returns:
+        bool: 재랭킹 적용 여부
+    """
+    if not (request.rerank and cross_encoder is not None):
+        return False
+    return request.timeout_ms is None or not results or any('cross_score' in result for result in results)
+
+def search_cache_digest(request: SearchRequest) -> str:
+    """
+    결과 캐시 / single-flight 키용 요청 해시 (결과에 영향을 주지 않는 project / requirementId 제외)
     
-    return SearchResponse(
-        query=request.query,
-        total_results=len(fragment_results),
+    timeout_ms도 제외하므로 예산이 있는 요청도 캐시된 전체 결과를 재사용한다 (줄인 결과는 저장하지 않음).
+    
+    Args:
+        request: 검색 요청
+        
+    Returns:
+        str: 요청 해시
+    """
+    fields = request.dict(exclude={'project', 'requirementId', 'timeout_ms'})
+    fields['rerank'] = request.rerank and cross_encoder is not None
+    return request_digest(fields)
+
+def search_params_digest(request: SearchRequest) -> str:
+    """의미 기반 쿼리 캐시 구역용 해시 (쿼리 문자열을 제외한 결과에 영향을 주는 파라미터)"""
+    fields = request.dict(exclude={'project', 'requirementId', 'query', 'timeout_ms'})
+    fields['rerank'] = request.rerank and cross_encoder is not None
+    return request_digest(fields)
+
+def estimate_result_bytes(results: List[Dict[str, Any]], fragment_results: List[FragmentResult]) -> int:
+    """캐시에 보관할 검색 결과의 메모리 크기 추정치 (바이트)"""
+    total = sum(sys.getsizeof(result.get('content_preview', '')) + 400 for result in results)
+    for fragment in fragment_results:
+        total += sys.getsizeof(fragment.content) + sys.getsizeof(fragment.content_preview) + 400
+    return total
+
+def search_filters(request: SearchRequest) -> Dict[str, Any]:
+    """
+    검색 요청을 저장소 검색의 filters(필터 + 검색 옵션)로 변환
+    
+    Args:
+        request: 검색 요청
+        
+    Returns:
+        Dict: 필터 조건 및 검색 옵션
+    """
+    filters = dict(request.filters or {})
+    filters['query_text'] = request.query
+    filters['ensemble_weight'] = request.ensemble_weight
+    if request.fusion:
+        filters['fusion'] = request.fusion
+    if request.graph_expand:
+        filters['graph_expand'] = request.graph_expand
+    if request.dependency_expand:
+        filters['dependency_expand'] = request.dependency_expand
+    if not request.semantic:
+        filters['semantic'] = False
+    filters['rerank'] = request.rerank and cross_encoder is not None
+    return filters
+
+def run_search(handle: ProjectHandle, request: SearchRequest,
+               query_embedding: Optional[np.ndarray] = None,
+               deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+    """
+    단일 검색 실행 (쿼리 임베딩 + 저장소 검색, 요청 실행기 스레드에서 호출)
+    
+    Args:
+        handle: 검색할 프로젝트 핸들
+        request: 검색 요청
+        query_embedding: 미리 계산한 쿼리 임베딩 (None이면 생성)
+        deadline: 요청 지연 시간 예산 (None이면 무제한)
+        
+    Returns:
+        List[Dict]: 저장소 검색 결과
+    """
+    # 검색 쿼리 임베딩 생성
+    if query_embedding is None:
+        query_embedding = embedder.model.encode(request.query)
+    
+    # 검색 실행
+    return handle.store.search(
+        query_vector=query_embedding,
+        k=request.k,
+        filters=search_filters(request),
+        rerank=request.rerank and cross_encoder is not None,
+        deadline=deadline
+    )
+
+@app.post("/search/batch", response_model=BatchSearchResponse)
+async def search_code_batch(request: BatchSearchRequest):
+    """
+    여러 요구사항을 한 번에 검색하는 배치 API 엔드포인트
+    
+    쿼리 임베딩, Faiss 검색, 의미 기반 검색, 재랭킹을 쿼리별로 반복하지 않고
+    한 번의 배치 호출로 처리한다. 두 번째 백엔드 전송은 수행하지 않는다.
+    배치 하나는 수락 제어에서 요청 하나로 계산한다.
+    """
+    handle = await get_project(request.project)
+    
+    print(f"배치 검색 요청: {len(request.queries)}개 쿼리")
+    
+    start_time = time.time()
+    try:
+        ticket = await admit_request()
+        try:
+            request, shed = degrade_request(request, ticket)
+            reranked = request.rerank and cross_encoder is not None
+            
+            # 임베딩 / 검색 / 재랭킹 / 결과 가공은 이벤트 루프 밖에서 실행
+            responses = await request_executor.run(run_search_batch, handle, request, reranked)
+        finally:
+            release_request(ticket)
+    finally:
+        handle.release()
+    
+    elapsed_time = time.time() - start_time
+    
+    return BatchSearchResponse(
+        total_queries=len(responses),
         elapsed_time=elapsed_time,
-        reranked=request.rerank and cross_encoder is not None,
-        requirementId=request.requirementId,
-        results=fragment_results
+        reranked=reranked,
+        responses=responses,
+        degraded=shed
+    )
+
+def run_search_batch(handle: ProjectHandle, request: BatchSearchRequest, reranked: bool) -> List[SearchResponse]:
+    """
+    배치 검색 실행 (요청 실행기 스레드에서 호출)
+    
+    Args:
+        handle: 검색할 프로젝트 핸들
+        request: 배치 검색 요청
+        reranked: 재랭킹 수행 여부
+        
+    Returns:
+        List[SearchResponse]: 쿼리별 응답 (elapsed_time은 검색 소요 시간)
+    """
+    start_time = time.time()
+    
+    # 모든 쿼리 임베딩을 한 번에 생성
+    query_embeddings = embedder.model.encode(request.queries)
+    
+    # 필터 설정 (query_text는 쿼리별로 전달)
+    filters = dict(request.filters or {})
+    filters['ensemble_weight'] = request.ensemble_weight
+    if request.fusion:
+        filters['fusion'] = request.fusion
+    if request.graph_expand:
+        filters['graph_expand'] = request.graph_expand
+    if request.dependency_expand:
+        filters['dependency_expand'] = request.dependency_expand
+    if not request.semantic:
+        filters['semantic'] = False
+    
+    # 배치 검색 실행
+    results_per_query = handle.store.search_batch(
+        query_vectors=query_embeddings,
+        query_texts=request.queries,
+        k=request.k,
+        filters=filters,
+        rerank=reranked
     )
+    
+    elapsed_time = time.time() - start_time
+    
+    responses = []
+    for query, results in zip(request.queries, results_per_query):
+        fragment_results = build_fragment_results(handle, results)
+        responses.append(SearchResponse(
+            query=query,
+            total_results=len(fragment_results),
+            elapsed_time=elapsed_time,
+            reranked=reranked,
+            results=fragment_results
+        ))
+    
+    return responses
 
 @app.get("/stats")
-async def get_stats():
+async def get_stats(project: Optional[str] = Query(None, description="프로젝트 (기본값: DEFAULT_PROJECT)")):
     """벡터 저장소 통계 정보"""
-    if not vector_store:
-        raise HTTPException(status_code=503, detail="서비스 초기화되지 않음")
-    
-    return vector_store.get_stats()
+    handle = await get_project(project)
+    try:
+        stats = await request_executor.run(handle.store.get_stats)
+    finally:
+        handle.release()
+    stats['project'] = handle.name
+    stats['index_version'] = handle.version
+    return stats
 
 @app.get("/fragment/{fragment_id}")
-async def get_fragment(fragment_id: str):
+async def get_fragment(fragment_id: str, project: Optional[str] = Query(None, description="프로젝트 (기본값: DEFAULT_PROJECT)")):
     """특정 파편 상세 정보 조회"""
-    if not vector_store:
-        raise HTTPException(status_code=503, detail="서비스 초기화되지 않음")
-    
-    metadata = vector_store.fragment_metadata.get(fragment_id)
-    if not metadata:
-        raise HTTPException(status_code=404, detail="파편을 찾을 수 없음")
+    handle = await get_project(project)
+    try:
+        metadata = await request_executor.run(handle.store.fragment_metadata.get, fragment_id)
+        if not metadata:
+            raise HTTPException(status_code=404, detail="파편을 찾을 수 없음")
+        
+        # 전체 내용은 상세 조회 시에만 로드
+        metadata['full_content'] = await request_executor.run(handle.store.get_fragment_content, fragment_id)
+    finally:
+        handle.release()
     
     return {
         "id": fragment_id,
         "metadata": metadata
     }
 
-@app.get("/file-fragments")
-async def get_fragments_by_file(file_path: str):
-    """특정 파일의 모든 파편 조회"""
-    if not vector_store:
+@app.get("/fragment/{fragment_id}/similar")
+async def get_similar_fragments(fragment_id: str,
+                                k: int = Query(5, ge=1, le=50, description="반환할 결과 수"),
+                                project: Optional[str] = Query(None, description="프로젝트 (기본값: DEFAULT_PROJECT)")):
+    """관련 코드 조회 (색인 시점에 계산된 kNN 이웃)"""
+    handle = await get_project(project)
+    try:
+        if await request_executor.run(handle.store.fragment_metadata.get, fragment_id) is None:
+            raise HTTPException(status_code=404, detail="파편을 찾을 수 없음")
+        
+        return {
+            "id": fragment_id,
+            "similar": await request_executor.run(handle.store.get_similar_fragments, fragment_id, k=k)
+        }
+    finally:
+        handle.release()
+
+@app.post("/admin/reload")
+async def reload_index(project: Optional[str] = Query(None, description="프로젝트 (기본값: DEFAULT_PROJECT)"),
+                       version: Optional[str] = Query(None, description="로드할 스냅샷 버전 (기본값: LATEST)")):
+    """게시된 스냅샷으로 프로젝트 인덱스 무중단 교체 (모델은 다시 로드하지 않음)"""
+    if not store_registry or not embedder:
         raise HTTPException(status_code=503, detail="서비스 초기화되지 않음")
     
-    results = vector_store.get_fragments_by_file(file_path)
+    try:
+        loop = asyncio.get_running_loop()
+        reloaded = await loop.run_in_executor(None, store_registry.reload, project, version)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    # 이전 버전 결과는 키가 달라 조회되지 않지만 메모리를 바로 비움
+    if reloaded.get('reloaded') and result_cache:
+        result_cache.invalidate(reloaded['project'])
+    if reloaded.get('reloaded') and semantic_cache:
+        semantic_cache.invalidate(reloaded['project'])
+    return reloaded
+
+@app.get("/file-fragments")
+async def get_fragments_by_file(file_path: str, project: Optional[str] = Query(None, description="프로젝트 (기본값: DEFAULT_PROJECT)")):
+    """특정 파일의 모든 파편 조회"""
+    handle = await get_project(project)
+    try:
+        results = await request_executor.run(handle.store.get_fragments_by_file, file_path)
+    finally:
+        handle.release()
     
     if not results:
         raise HTTPException(status_code=404, detail="파일을 찾을 수 없음")
@@ -412,4 +1131,6 @@ async def get_fragments_by_file(file_path: str):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # 여러 워커는 메모리 맵 인덱스 페이지를 OS 페이지 캐시에서 공유
+    workers = int(os.getenv("WORKERS", "1"))
+    uvicorn.run("app.main:app" if workers > 1 else app, host="0.0.0.0", port=8000, workers=workers)
\ No newline at end of file
@@ -35,6 +35,17 @@ class VueParser:
         
         # 컴포넌트 추출 패턴
         self.components_pattern = re.compile(r'components:\s*{([^}]+)}', re.DOTALL)
+        
+        # import 추출 패턴 (정적 import, 동적 import(), require())
+        self.import_pattern = re.compile(
+            r'import\s+(?:type\s+)?([\w$]+)?\s*,?\s*(?:\{([^}]*)\})?\s*(?:\*\s*as\s+([\w$]+))?\s*from\s*[\'"]([^\'"]+)[\'"]'
+        )
+        self.side_effect_import_pattern = re.compile(r'^\s*import\s*[\'"]([^\'"]+)[\'"]', re.MULTILINE)
+        self.dynamic_import_pattern = re.compile(r'(?:import|require)\(\s*[\'"]([^\'"]+)[\'"]\s*\)')
+        
+        # import 경로 해석 시 시도할 확장자 / 디렉토리 index 파일
+        self.resolve_extensions = ['', '.vue', '.js', '.ts']
+        self.resolve_index_files = ['index.js', 'index.ts', 'index.vue']
     
     def parse_file(self, file_path: str) -> Dict[str, Any]:
         """
@@ -76,6 +87,9 @@ class VueParser:
                 # Components 추출
                 components = self._extract_components(script)
                 
+                # import 추출
+                imports = self._extract_imports(script)
+                
                 # 결과 조합
                 result = {
                     'file_info': file_info,
@@ -85,16 +99,20 @@ class VueParser:
                     'style': style,
                     'props': props,
                     'components': components,
+                    'imports': imports,
                     'raw_content': content
                 }
                 
                 return result
             else:
                 # JS/TS/기타 파일은 전체 내용을 저장
-                return {
+                result = {
                     'file_info': file_info,
                     'raw_content': content  
                 }
+                if file_path.endswith(('.js', '.ts')):
+                    result['imports'] = self._extract_imports(content)
+                return result
             
         except Exception as e:
             return {
@@ -144,15 +162,20 @@ class VueParser:
                         if 'error' not in parsed_file and 'ignored' not in parsed_file:
                             components_count += 1
             
+            # 컴포넌트 / import 의존성 그래프
+            dependency_graph = self.build_dependency_graph(parsed_files, project_path)
+            
             # 요약 정보
             summary = {
                 'total_files': len(parsed_files),
                 'components_count': components_count,
-                'file_extensions': file_extensions
+                'file_extensions': file_extensions,
+                'dependency_edges': len(dependency_graph['edges'])
             }
             
             return {
                 'parsed_files': parsed_files,
+                'dependency_graph': dependency_graph,
                 'summary': summary,
                 'path': project_path
             }
@@ -235,14 +258,129 @@ class VueParser:
         if not script:
             return []
             
+        return list(self._extract_component_bindings(script))
+    
+    def _extract_component_bindings(self, script: Optional[str]) -> Dict[str, str]:
+        """
+        components 옵션의 등록 이름 -> 값 식별자 추출
+        
+        'TodoItem: TodoItemView'와 축약형 'TodoItem'을 모두 처리한다.
+        """
+        if not script:
+            return {}
+            
         components_match = self.components_pattern.search(script)
-        if components_match:
-            components_str = components_match.group(1)
-            # 컴포넌트 이름 추출
-            component_names = re.findall(r'(\w+)\s*:', components_str)
-            return component_names
+        if not components_match:
+            return {}
+        
+        bindings = {}
+        for entry in components_match.group(1).split(','):
+            match = re.match(r'\s*[\'"]?([\w$-]+)[\'"]?\s*(?::\s*([\w$]+))?', entry)
+            if match and match.group(1):
+                bindings[match.group(1)] = match.group(2) or match.group(1)
+        return bindings
+    
+    def _extract_imports(self, script: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        import 목록 추출
+        
+        Returns:
+            List[Dict]: {'source': 모듈 경로, 'names': 가져온 식별자 목록}
+        """
+        if not script:
+            return []
+        
+        imports = []
+        for default_name, named, namespace, source in self.import_pattern.findall(script):
+            names = [default_name] if default_name else []
+            for item in named.split(','):
+                # 'a as b'는 로컬 이름 b 사용
+                parts = item.strip().split()
+                if parts:
+                    names.append(parts[-1])
+            if namespace:
+                names.append(namespace)
+            imports.append({'source': source, 'names': names})
+        
+        for source in self.side_effect_import_pattern.findall(script):
+            imports.append({'source': source, 'names': []})
+        for source in self.dynamic_import_pattern.findall(script):
+            imports.append({'source': source, 'names': []})
+        
+        return imports
+    
+    def _resolve_import(self, source: str, importer_path: str, project_path: str) -> Optional[str]:
+        """
+        import 경로를 프로젝트 안의 파일 경로로 해석 (외부 패키지는 None)
+        
+        상대 경로와 Vue CLI 별칭 '@/'(= src/)를 지원한다.
+        """
+        if source.startswith('.'):
+            base = os.path.normpath(os.path.join(os.path.dirname(importer_path), source))
+        elif source.startswith('@/'):
+            base = os.path.normpath(os.path.join(project_path, 'src', source[2:]))
+        else:
+            return None
+        
+        for extension in self.resolve_extensions:
+            candidate = base + extension
+            if os.path.isfile(candidate):
+                return candidate
+        for index_file in self.resolve_index_files:
+            candidate = os.path.join(base, index_file)
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+    
+    def build_dependency_graph(self, parsed_files: Dict[str, Dict[str, Any]], project_path: str) -> Dict[str, Any]:
+        """
+        파일 단위 의존성 그래프 생성 (노드 = 파일, 간선 = import / 하위 컴포넌트 사용)
+        
+        컴포넌트 간선은 components 옵션에 등록된 식별자를 그 파일의 import로 해석하고,
+        import가 없으면 (전역 등록 등) 프로젝트의 컴포넌트 이름으로 찾는다.
+        
+        Args:
+            parsed_files: 파일 경로 -> 파싱 결과
+            project_path: 프로젝트 경로 ('@/' 별칭 해석용)
             
-        return []
+        Returns:
+            Dict: {'nodes': 파일 경로 목록, 'edges': [부모 노드, 자식 노드, 'import' | 'component'] 목록}
+        """
+        files = [
+            file_path for file_path, parsed_file in parsed_files.items()
+            if 'error' not in parsed_file and not parsed_file.get('ignored')
+        ]
+        node_ids = {file_path: i for i, file_path in enumerate(files)}
+        components_by_name = {
+            parsed_files[file_path]['component_name']: file_path
+            for file_path in files if parsed_files[file_path].get('component_name')
+        }
+        
+        edges = set()
+        for file_path in files:
+            parsed_file = parsed_files[file_path]
+            source_id = node_ids[file_path]
+            
+            # import 간선 (가져온 식별자 -> 파일 매핑은 컴포넌트 간선에도 사용)
+            imported_files = {}
+            for item in parsed_file.get('imports', []):
+                target = self._resolve_import(item['source'], file_path, project_path)
+                if target is None or target not in node_ids or target == file_path:
+                    continue
+                edges.add((source_id, node_ids[target], 'import'))
+                for name in item['names']:
+                    imported_files[name] = target
+            
+            # 하위 컴포넌트 간선
+            for registered, identifier in self._extract_component_bindings(parsed_file.get('script')).items():
+                target = imported_files.get(identifier) or components_by_name.get(registered)
+                if target is not None and target in node_ids and target != file_path:
+                    edges.add((source_id, node_ids[target], 'component'))
+        
+        return {
+            'nodes': files,
+            'edges': [list(edge) for edge in sorted(edges)]
+        }
 
 
 def parse_vue_project(project_path: str) -> Dict[str, Any]:
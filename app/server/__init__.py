@@ -0,0 +1,5 @@
+"""
+API 서버 실행 지원 모듈
+"""
+
+from app.server.request_executor import RequestExecutor
@@ -0,0 +1,188 @@
+"""
+검색 요청 수락 제어 모듈
+
+동시에 처리하는 검색 요청 수를 제한하고, 대기열이 가득 차거나 대기 시간이 길어지면
+요청을 바로 거절(429/503 + Retry-After)하여 폭주 시에도 처리 중인 요청의 지연 시간을 지킨다.
+대기열 길이나 최근 p95 지연 시간이 기준을 넘으면 비싼 단계(재랭킹, 의미 기반 검색기)를 끄는
+축소 모드로 요청을 처리한다.
+"""
+
+import math
+import time
+import asyncio
+import numpy as np
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+# 축소 모드에서 끄는 단계 (앞에서부터 차례로: 1단계는 재랭킹, 2단계는 재랭킹 + 의미 기반 검색기)
+DEGRADE_STAGES = ('rerank', 'semantic')
+
+
+class Overloaded(Exception):
+    """요청 거절 (대기열 가득 참 또는 대기 시간 초과)"""
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        """
+        Args:
+            status_code: 응답 코드 (429: 대기열 가득 참, 503: 대기 시간 초과)
+            reason: 거절 사유
+            retry_after: 재시도까지 권장 대기 시간(초)
+        """
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """수락된 요청 하나 (release로 반납)"""
+
+    __slots__ = ('started', 'degrade', 'released')
+
+    def __init__(self, degrade: Tuple[str, ...]):
+        self.started = time.monotonic()
+        self.degrade = degrade
+        self.released = False
+
+
+class AdmissionController:
+    """
+    동시 처리 수 제한 + 크기 제한 대기열 (이벤트 루프 안에서만 사용)
+
+    - 처리 중 요청이 max_concurrency 미만이면 바로 수락, 아니면 대기열(FIFO)에서 대기
+    - 대기열이 max_queue개면 429, queue_timeout 동안 자리가 나지 않으면 503으로 거절
+    - 반납된 자리는 대기열의 첫 요청에 바로 넘김 (새 요청이 대기 중인 요청을 앞지르지 않음)
+    - 수락 시점의 대기열 길이 / 최근 p95가 기준 이상이면 DEGRADE_STAGES 1단계, 기준의 2배 이상이면 2단계
+    """
+
+    def __init__(self, max_concurrency: int = 8, max_queue: int = 32, queue_timeout: float = 5.0,
+                 degrade_queue_depth: int = 0, degrade_p95_ms: float = 0.0, latency_window: int = 200):
+        """
+        Args:
+            max_concurrency: 동시에 처리할 최대 요청 수
+            max_queue: 대기열 최대 길이 (0이면 자리가 없을 때 바로 거절)
+            queue_timeout: 대기열 최대 대기 시간(초)
+            degrade_queue_depth: 축소 모드 시작 대기열 길이 (0이면 사용 안 함)
+            degrade_p95_ms: 축소 모드 시작 p95 지연 시간(ms) (0이면 사용 안 함)
+            latency_window: p95 계산에 쓰는 최근 요청 수
+        """
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_queue = max(max_queue, 0)
+        self.queue_timeout = queue_timeout
+        self.degrade_queue_depth = degrade_queue_depth
+        self.degrade_p95 = degrade_p95_ms / 1000.0
+
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._latencies: Deque[float] = deque(maxlen=max(latency_window, 1))
+        self._p95: Optional[float] = None
+        self._mean: Optional[float] = None
+
+        # 지표
+        self.admitted = 0
+        self.queued = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self.degraded = {stage: 0 for stage in DEGRADE_STAGES}
+
+    async def acquire(self) -> AdmissionTicket:
+        """
+        요청 수락 (자리가 없으면 대기열에서 대기)
+
+        Returns:
+            AdmissionTicket: 수락 표 (축소 모드면 끌 단계 포함)
+
+        Raises:
+            Overloaded: 대기열이 가득 찼거나 대기 시간을 넘김
+        """
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+        else:
+            if len(self._waiters) >= self.max_queue:
+                self.shed_queue_full += 1
+                raise Overloaded(429, '대기열이 가득 찼습니다', self.retry_after())
+
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            self.queued += 1
+            try:
+                await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._discard(waiter)
+                self.shed_timeout += 1
+                raise Overloaded(503, '대기 시간을 넘겼습니다', self.retry_after())
+            except asyncio.CancelledError:
+                # 자리를 넘겨받은 직후 취소되면 자리를 다시 반납
+                self._discard(waiter)
+                if waiter.done() and not waiter.cancelled():
+                    self._hand_off()
+                raise
+
+        self.admitted += 1
+        degrade = self.degrade_stages()
+        for stage in degrade:
+            self.degraded[stage] += 1
+        return AdmissionTicket(degrade)
+
+    def release(self, ticket: AdmissionTicket):
+        """
+        요청 반납 (여러 번 호출해도 한 번만 반영)
+
+        Args:
+            ticket: acquire가 반환한 수락 표
+        """
+        if ticket.released:
+            return
+        ticket.released = True
+        self._latencies.append(time.monotonic() - ticket.started)
+        latencies = np.fromiter(self._latencies, dtype='float64')
+        self._p95 = float(np.percentile(latencies, 95))
+        self._mean = float(latencies.mean())
+        self._hand_off()
+
+    def _hand_off(self):
+        """반납된 자리를 대기 중인 첫 요청에 넘기거나 처리 중 수 감소"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def _discard(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def degrade_stages(self) -> Tuple[str, ...]:
+        """현재 대기열 길이 / 최근 p95 기준 축소 모드에서 끌 단계"""
+        level = 0
+        depth = len(self._waiters)
+        if self.degrade_queue_depth > 0 and depth >= self.degrade_queue_depth:
+            level = 2 if depth >= self.degrade_queue_depth * 2 else 1
+        if self.degrade_p95 > 0 and self._p95 is not None and self._p95 >= self.degrade_p95:
+            level = max(level, 2 if self._p95 >= self.degrade_p95 * 2 else 1)
+        return DEGRADE_STAGES[:level]
+
+    def retry_after(self) -> int:
+        """재시도 권장 대기 시간(초): 대기열이 평균 처리 시간 기준으로 비워지는 시간, 최소 1초"""
+        mean = self._mean if self._mean is not None else 1.0
+        rounds = (len(self._waiters) + 1) / self.max_concurrency
+        return max(1, math.ceil(rounds * mean))
+
+    def stats(self) -> Dict[str, Any]:
+        """처리 중 / 대기 중 요청 수, 거절 수, 축소 모드 요청 수, 최근 p95(ms)"""
+        return {
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'active': self._active,
+            'queue_depth': len(self._waiters),
+            'admitted': self.admitted,
+            'queued': self.queued,
+            'shed_queue_full': self.shed_queue_full,
+            'shed_timeout': self.shed_timeout,
+            'degraded': dict(self.degraded),
+            'degrade_stages': list(self.degrade_stages()),
+            'p95_ms': round(self._p95 * 1000.0, 3) if self._p95 is not None else None
+        }
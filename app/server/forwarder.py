@@ -0,0 +1,261 @@
+"""
+두 번째 백엔드 결과 전송 모듈
+
+검색 응답과 분리된 백그라운드 전송기. 검색 요청은 전송 내용을 큐에 넣기만 하고,
+백그라운드 작업이 재사용 연결(httpx 연결 풀)로 묶음 단위 전송, 백오프 재시도,
+수신 서버 장애 시 로컬 디스크 큐 저장 및 복구 후 재전송을 담당한다.
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import httpx
+from typing import Any, Dict, List, Optional
+
+# 디스크 큐 파일 이름
+SPILL_FILE = 'pending.jsonl'
+
+
+class ResultForwarder:
+    """
+    두 번째 백엔드 비동기 전송기
+
+    - submit(): 큐에 넣고 즉시 반환 (큐가 가득 차면 디스크 큐에 저장)
+    - 전송 작업: 큐에서 최대 batch_size개를 꺼내 연결 풀로 동시에 전송
+    - 실패 시 지수 백오프로 max_retries회 재시도, 그래도 실패하면 디스크 큐에 저장하고
+      수신 서버를 retry_interval초 동안 장애 상태로 표시 (장애 중 전송분은 바로 디스크로)
+    - 복구 작업: retry_interval초마다 디스크 큐를 읽어 다시 큐에 넣음
+    """
+
+    def __init__(self, url: str, spill_dir: str, queue_size: int = 1000, batch_size: int = 16,
+                 workers: int = 2, max_retries: int = 3, backoff: float = 0.5, max_backoff: float = 10.0,
+                 retry_interval: float = 30.0, timeout: float = 5.0):
+        """
+        Args:
+            url: 수신 서버 URL
+            spill_dir: 전송하지 못한 결과를 저장할 디렉토리
+            queue_size: 메모리 큐 최대 크기
+            batch_size: 한 번에 동시 전송할 최대 결과 수
+            workers: 전송 작업 수
+            max_retries: 결과별 최대 재시도 횟수
+            backoff: 첫 재시도 대기 시간(초), 재시도마다 2배
+            max_backoff: 재시도 대기 시간 상한(초)
+            retry_interval: 장애 상태 유지 및 디스크 큐 재전송 주기(초)
+            timeout: 요청 제한 시간(초)
+        """
+        self.url = url
+        self.spill_dir = spill_dir
+        self.spill_path = os.path.join(spill_dir, SPILL_FILE)
+        self.queue_size = queue_size
+        self.batch_size = max(batch_size, 1)
+        self.workers = max(workers, 1)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_interval = retry_interval
+        self.timeout = timeout
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._tasks: List[asyncio.Task] = []
+        self._down_until = 0.0
+
+        # 전송 통계
+        self.stats_counts = {'submitted': 0, 'delivered': 0, 'failed': 0, 'spilled': 0, 'restored': 0}
+
+    async def start(self):
+        """연결 풀 생성 및 전송 / 디스크 큐 복구 작업 시작 (이벤트 루프 안에서 호출)"""
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self._recover_restore_files()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.batch_size, max_keepalive_connections=self.batch_size)
+        )
+        self._tasks = [asyncio.create_task(self._deliver_loop()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._restore_loop()))
+        print(f"결과 전송기 시작 (URL: {self.url}, 작업 수: {self.workers}, 묶음 크기: {self.batch_size})")
+
+    async def stop(self, drain_timeout: float = 5.0):
+        """
+        전송기 종료 (큐에 남은 결과는 drain_timeout초 동안 전송을 기다린 뒤 디스크 큐에 저장)
+
+        Args:
+            drain_timeout: 남은 결과 전송을 기다릴 시간(초)
+        """
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            pass
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        remaining = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        self._spill(remaining)
+
+        await self._client.aclose()
+        self._client = None
+        self._queue = None
+
+    def submit(self, payload: Dict[str, Any]) -> bool:
+        """
+        전송할 결과를 큐에 추가 (대기하지 않음)
+
+        Args:
+            payload: 전송할 JSON 본문
+
+        Returns:
+            bool: 메모리 큐에 들어갔으면 True, 디스크 큐에 저장되었으면 False
+        """
+        self.stats_counts['submitted'] += 1
+        if self._queue is None or self._is_down():
+            self._spill([payload])
+            return False
+        try:
+            self._queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            self._spill([payload])
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        """전송 통계 (큐 길이, 장애 상태 포함)"""
+        return {
+            **self.stats_counts,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'receiver_down': self._is_down()
+        }
+
+    def _is_down(self) -> bool:
+        """수신 서버 장애 상태 여부"""
+        return time.monotonic() < self._down_until
+
+    async def _deliver_loop(self):
+        """큐에서 결과를 묶음으로 꺼내 동시에 전송"""
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                if self._is_down():
+                    self._spill(batch)
+                else:
+                    await asyncio.gather(*(self._deliver(payload) for payload in batch))
+            except asyncio.CancelledError:
+                # 종료 중 전송 중이던 묶음은 디스크 큐에 저장 (일부는 중복 전송될 수 있음)
+                self._spill(batch)
+                raise
+            except Exception as e:
+                print(f"결과 전송 작업 오류 (디스크 큐에 저장): {str(e)}")
+                self._spill(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _deliver(self, payload: Dict[str, Any]):
+        """결과 하나를 백오프 재시도로 전송 (모두 실패하면 디스크 큐에 저장)"""
+        for attempt in range(self.max_retries + 1):
+            if attempt > 0:
+                if self._is_down():
+                    break
+                delay = min(self.backoff * (2 ** (attempt - 1)), self.max_backoff)
+                await asyncio.sleep(delay * (0.5 + random.random() / 2))
+            try:
+                response = await self._client.post(self.url, json=payload)
+                if response.status_code < 500:
+                    # 4xx는 재시도해도 같은 결과이므로 기록만 하고 버림
+                    if response.status_code >= 400:
+                        self.stats_counts['failed'] += 1
+                        print(f"두 번째 백엔드 전송 거부 (응답 코드: {response.status_code}): {response.text[:200]}")
+                    else:
+                        self.stats_counts['delivered'] += 1
+                    return
+                error = f"응답 코드 {response.status_code}"
+            except httpx.HTTPError as e:
+                error = f"{type(e).__name__}: {str(e)}"
+            print(f"두 번째 백엔드 전송 실패 ({attempt + 1}/{self.max_retries + 1}회): {error}")
+
+        # 재시도 소진: 수신 서버 장애로 보고 일정 시간 바로 디스크 큐로 보냄
+        self._down_until = time.monotonic() + self.retry_interval
+        self._spill([payload])
+
+    def _spill(self, payloads: List[Dict[str, Any]]):
+        """결과를 디스크 큐(JSON Lines)에 추가"""
+        if not payloads:
+            return
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                for payload in payloads:
+                    f.write(json.dumps(payload, ensure_ascii=False) + '\n')
+            self.stats_counts['spilled'] += len(payloads)
+        except Exception as e:
+            self.stats_counts['failed'] += len(payloads)
+            print(f"디스크 큐 저장 실패 ({len(payloads)}개 결과 유실): {str(e)}")
+
+    def _recover_restore_files(self):
+        """재전송 도중 중단되어 남은 파일을 디스크 큐에 다시 합침"""
+        for name in sorted(os.listdir(self.spill_dir)):
+            if not name.endswith('.restore'):
+                continue
+            path = os.path.join(self.spill_dir, name)
+            with open(path, 'r', encoding='utf-8') as src, open(self.spill_path, 'a', encoding='utf-8') as dst:
+                for line in src:
+                    if line.strip():
+                        dst.write(line if line.endswith('\n') else line + '\n')
+            os.remove(path)
+
+    async def _restore_loop(self):
+        """주기적으로 디스크 큐의 결과를 메모리 큐로 되돌림 (수신 서버 장애 중에는 건너뜀)"""
+        while True:
+            await asyncio.sleep(self.retry_interval)
+            if not self._is_down():
+                self._restore()
+
+    def _restore(self):
+        """
+        디스크 큐 파일을 옮겨 읽은 뒤 메모리 큐에 다시 넣음
+
+        파일 이름을 먼저 바꾸므로 읽는 동안 새로 저장되는 결과는 새 파일에 쌓이고,
+        메모리 큐가 가득 차서 넣지 못한 결과는 다시 디스크 큐에 저장된다.
+        """
+        if not os.path.exists(self.spill_path):
+            return
+        restore_path = f"{self.spill_path}.{int(time.time() * 1000)}.restore"
+        os.replace(self.spill_path, restore_path)
+
+        leftover = []
+        restored = 0
+        with open(restore_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    payload = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if leftover:
+                    leftover.append(payload)
+                    continue
+                try:
+                    self._queue.put_nowait(payload)
+                    restored += 1
+                except asyncio.QueueFull:
+                    leftover.append(payload)
+
+        self.stats_counts['restored'] += restored
+        if leftover:
+            self._spill(leftover)
+        os.remove(restore_path)
+        if restored:
+            print(f"디스크 큐에서 {restored}개 결과 재전송 (남은 결과: {len(leftover)}개)")
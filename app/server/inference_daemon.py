@@ -0,0 +1,250 @@
+"""
+로컬 추론 데몬 모듈
+
+임베딩 모델(BGE-m3, ko-sroberta)과 Cross-Encoder를 프로세스 하나에 한 번만 로드하고
+유닉스 소켓으로 API 서버 / search_ui / vuetodo-fragmentor / train_cross_encoder --test의
+임베딩 / 점수 계산 요청을 처리한다. 클라이언트는 INFERENCE_SOCKET 환경 변수로 데몬을 찾는다.
+
+소켓은 소유자 전용 디렉토리(0700)에 소유자 전용 권한으로 만들고, 연결은 항상 인증 키로 서로 인증한다.
+INFERENCE_AUTHKEY가 없으면 소켓 옆에 키 파일(0600)을 만들어 같은 사용자의 클라이언트가 읽게 한다.
+
+실행:
+    python -m app.server.inference_daemon --preload
+"""
+
+import os
+import sys
+import signal
+import argparse
+import threading
+import numpy as np
+from multiprocessing.connection import Listener, Client
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.embedding.inference_client import (
+    INFERENCE_METHODS, authkey_path, default_socket_path, load_authkey, load_or_create_key_file, prepare_private_dir
+)
+from app.server.rerank_batcher import RerankBatcher
+
+# --preload 시 미리 로드하는 모델 (CodeEmbedder / SemanticEncoder / CrossEncoder 기본값)
+PRELOAD_SENTENCE_MODELS = (('dragonkue/BGE-m3-ko', True), ('jhgan/ko-sroberta-multitask', False))
+PRELOAD_CROSS_MODEL = 'SeoJHeasdw/ktds-vue-code-search-reranker-ko'
+
+
+class InferenceDaemon:
+    """
+    모델 보관 및 추론 요청 처리
+
+    - 임베딩 모델: 이름별 SentenceTransformer 하나, 모델별 잠금으로 추론을 직렬화
+    - Cross-Encoder: 이름별 CrossEncoder + RerankBatcher, 여러 클라이언트의 쌍을 한 배치로 계산
+    - 모델은 처음 요청될 때 로드하고 프로세스가 끝날 때까지 유지
+    """
+
+    def __init__(self, device: str = 'cpu', max_batch: int = 64, max_wait_ms: float = 5.0):
+        """
+        Args:
+            device: Cross-Encoder 실행 장치 ('cpu' 또는 'cuda')
+            max_batch: Cross-Encoder 한 번의 추론에 넣을 최대 쌍 수
+            max_wait_ms: Cross-Encoder 배치를 모으는 최대 대기 시간(ms)
+        """
+        self.device = device
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+
+        self._sentence_models: Dict[str, Tuple[Any, threading.Lock]] = {}
+        self._cross_encoders: Dict[str, Tuple[Any, RerankBatcher]] = {}
+        self._load_lock = threading.Lock()
+
+        # 통계
+        self.encode_calls = 0
+        self.encoded_texts = 0
+
+    def ping(self) -> int:
+        return os.getpid()
+
+    def load_sentence(self, model_name: str, trust_remote_code: bool = False) -> int:
+        """
+        임베딩 모델 로드 (이미 있으면 재사용)
+
+        Returns:
+            int: 임베딩 차원 수
+        """
+        with self._load_lock:
+            if model_name not in self._sentence_models:
+                from sentence_transformers import SentenceTransformer
+                print(f"임베딩 모델 로드 중: {model_name}")
+                model = SentenceTransformer(model_name, trust_remote_code=trust_remote_code)
+                self._sentence_models[model_name] = (model, threading.Lock())
+            model, _ = self._sentence_models[model_name]
+        return model.get_sentence_embedding_dimension()
+
+    def encode(self, model_name: str, texts: List[str], batch_size: int = 32,
+               normalize_embeddings: bool = False) -> np.ndarray:
+        """
+        텍스트 목록 임베딩
+
+        Returns:
+            np.ndarray: (텍스트 수, 차원) 배열
+        """
+        if model_name not in self._sentence_models:
+            self.load_sentence(model_name)
+        model, lock = self._sentence_models[model_name]
+        with lock:
+            embeddings = model.encode(texts, batch_size=batch_size, normalize_embeddings=normalize_embeddings)
+            self.encode_calls += 1
+            self.encoded_texts += len(texts)
+        return np.asarray(embeddings)
+
+    def load_cross(self, model_name: str, max_seq_length: int = 512):
+        """Cross-Encoder 로드 (이미 있으면 재사용)"""
+        with self._load_lock:
+            if model_name in self._cross_encoders:
+                return
+            from app.embedding.cross_encoder import CrossEncoder
+            print(f"Cross-Encoder 모델 로드 중: {model_name}")
+            cross_encoder = CrossEncoder(
+                model_name=model_name,
+                device=self.device,
+                max_seq_length=max_seq_length,
+                inference_socket=''
+            )
+            batcher = RerankBatcher(
+                cross_encoder.compute_scores, max_batch=self.max_batch, max_wait_ms=self.max_wait_ms
+            )
+            self._cross_encoders[model_name] = (cross_encoder, batcher)
+
+    def score(self, model_name: str, pairs: List[Tuple[str, str]]) -> List[float]:
+        """(질문, 파편) 쌍 점수 계산 (다른 연결의 요청과 함께 배치 처리)"""
+        if model_name not in self._cross_encoders:
+            self.load_cross(model_name)
+        _, batcher = self._cross_encoders[model_name]
+        return batcher.score([tuple(pair) for pair in pairs])
+
+    def stats(self) -> Dict[str, Any]:
+        """로드된 모델, 임베딩 호출 수, Cross-Encoder 배치 통계"""
+        return {
+            'pid': os.getpid(),
+            'sentence_models': list(self._sentence_models),
+            'encode_calls': self.encode_calls,
+            'encoded_texts': self.encoded_texts,
+            'cross_encoders': {
+                model_name: batcher.stats() for model_name, (_, batcher) in self._cross_encoders.items()
+            }
+        }
+
+    def shutdown(self):
+        """Cross-Encoder 배치 작업 스레드 종료"""
+        for _, batcher in self._cross_encoders.values():
+            batcher.shutdown()
+
+    def dispatch(self, method: str, args: tuple, kwargs: dict):
+        """클라이언트 요청을 메서드로 실행"""
+        if method not in INFERENCE_METHODS:
+            raise ValueError(f"지원하지 않는 추론 요청: {method}")
+        return getattr(self, method)(*args, **kwargs)
+
+
+def _serve_connection(conn, daemon: InferenceDaemon):
+    """
+    연결 하나의 요청 처리 루프 (샤드 노드와 같은 메시지 형식, 연결 직후 request_id 0으로 준비 완료 알림)
+
+    Args:
+        conn: multiprocessing Connection
+        daemon: 추론 데몬
+    """
+    conn.send((0, True, os.getpid()))
+    while True:
+        try:
+            request_id, method, args, kwargs = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        try:
+            result = daemon.dispatch(method, args, kwargs)
+            conn.send((request_id, True, result))
+        except Exception as e:
+            conn.send((request_id, False, f"{type(e).__name__}: {str(e)}"))
+    conn.close()
+
+
+def _load_or_create_authkey(path: str) -> bytes:
+    """INFERENCE_AUTHKEY 또는 소켓 옆 키 파일의 인증 키 (키 파일이 없으면 0600으로 생성)"""
+    if os.environ.get('INFERENCE_AUTHKEY'):
+        return load_authkey(path)
+    return load_or_create_key_file(authkey_path(path))
+
+
+def _remove_stale_socket(path: str, authkey: bytes):
+    """이전 실행이 남긴 소켓 파일 제거 (다른 데몬이 응답하면 오류)"""
+    if not os.path.exists(path):
+        return
+    try:
+        Client(path, family='AF_UNIX', authkey=authkey).close()
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(path)
+        return
+    raise RuntimeError(f"이미 실행 중인 추론 데몬이 있습니다: {path}")
+
+
+def serve_inference(path: str, daemon: InferenceDaemon, authkey: Optional[bytes] = None):
+    """
+    추론 데몬 실행: 유닉스 소켓에서 연결을 받음 (연결마다 스레드 하나)
+
+    Args:
+        path: 유닉스 소켓 경로 (디렉토리는 소유자 전용으로 준비)
+        daemon: 추론 데몬
+        authkey: 연결 인증 키 (None이면 INFERENCE_AUTHKEY 또는 소켓 옆 키 파일)
+    """
+    prepare_private_dir(os.path.dirname(os.path.abspath(path)))
+    if authkey is None:
+        authkey = _load_or_create_authkey(path)
+    _remove_stale_socket(path, authkey)
+
+    # 소켓 파일이 만들어지는 순간부터 소유자만 접속 가능하도록 umask 적용
+    previous_umask = os.umask(0o177)
+    try:
+        listener = Listener(path, family='AF_UNIX', authkey=authkey)
+    finally:
+        os.umask(previous_umask)
+    print(f"추론 데몬 시작: {path} (PID: {os.getpid()})")
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except KeyboardInterrupt:
+                break
+            except Exception as e:
+                print(f"추론 데몬 연결 수락 실패: {str(e)}")
+                continue
+            threading.Thread(target=_serve_connection, args=(conn, daemon), daemon=True).start()
+    finally:
+        listener.close()
+        daemon.shutdown()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 추론 데몬 실행')
+    parser.add_argument('--socket', type=str, default=os.environ.get('INFERENCE_SOCKET') or default_socket_path(),
+                        help='유닉스 소켓 경로 (디렉토리는 소유자 전용 0700으로 생성)')
+    parser.add_argument('--device', type=str, default='cpu', help="Cross-Encoder 실행 장치 ('cpu' 또는 'cuda')")
+    parser.add_argument('--max-batch', type=int, default=64, help='Cross-Encoder 최대 배치 쌍 수')
+    parser.add_argument('--max-wait-ms', type=float, default=5.0, help='Cross-Encoder 배치 대기 시간(ms)')
+    parser.add_argument('--preload', action='store_true', help='기본 모델을 시작 시 미리 로드')
+    args = parser.parse_args()
+
+    daemon = InferenceDaemon(device=args.device, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    if args.preload:
+        for model_name, trust_remote_code in PRELOAD_SENTENCE_MODELS:
+            daemon.load_sentence(model_name, trust_remote_code)
+        daemon.load_cross(PRELOAD_CROSS_MODEL)
+
+    # 종료 신호에도 소켓 파일을 정리하도록 정상 종료로 처리
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    serve_inference(args.socket, daemon)
+
+
+if __name__ == "__main__":
+    main()
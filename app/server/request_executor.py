@@ -0,0 +1,81 @@
+"""
+요청 실행기 모듈
+
+임베딩 / 검색 / Cross-Encoder 재랭킹처럼 CPU를 오래 쓰는 동기 작업을
+이벤트 루프 밖 스레드 풀에서 실행하여 헬스 체크 등 다른 요청이 막히지 않게 한다.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class RequestExecutor:
+    """
+    동시 실행 수가 제한된 요청 실행기
+
+    torch 추론과 Faiss 검색은 GIL을 해제하므로 스레드로 실행해도 요청끼리 겹쳐서 처리된다.
+    동시 실행 수를 넘는 요청은 세마포어에서 대기하며, 대기 중 클라이언트 연결이 끊기면
+    스레드 풀에 작업을 넣지 않고 바로 취소된다.
+    """
+
+    def __init__(self, max_concurrency: int = 4):
+        """
+        Args:
+            max_concurrency: 동시에 실행할 최대 요청 수 (스레드 수)
+        """
+        self.max_concurrency = max(max_concurrency, 1)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='request')
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # 상태 통계
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """실행 중인 이벤트 루프에 묶인 세마포어 (처음 사용할 때 생성)"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        동기 함수를 스레드 풀에서 실행하고 결과를 기다림
+
+        Args:
+            func: 실행할 동기 함수
+            *args, **kwargs: 함수 인자
+
+        Returns:
+            Any: 함수 반환값 (예외는 그대로 전달)
+        """
+        semaphore = self._get_semaphore()
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, functools.partial(func, *args, **kwargs))
+        finally:
+            self.active -= 1
+            self.completed += 1
+            semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        """실행 중 / 대기 중 / 완료된 요청 수"""
+        return {
+            'max_concurrency': self.max_concurrency,
+            'active': self.active,
+            'waiting': self.waiting,
+            'completed': self.completed
+        }
+
+    def shutdown(self, wait: bool = False):
+        """스레드 풀 종료"""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,147 @@
+"""
+요청 간 동적 배치 재랭킹 모듈
+
+동시에 들어온 여러 검색 요청의 (질문, 파편) 쌍을 몇 ms 동안 모아 한 번의 패딩 배치로
+Cross-Encoder 추론을 실행하고, 점수를 각 요청에 나눠 돌려준다.
+"""
+
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 작업 스레드 종료 신호
+_STOP = object()
+
+
+class RerankBatcher:
+    """
+    Cross-Encoder 점수 계산 배치 서비스
+
+    - score(): 요청 스레드에서 호출, 배치 결과가 나올 때까지 대기
+    - 작업 스레드: 첫 요청 후 max_wait_ms 동안 또는 max_batch 쌍이 찰 때까지 모아 한 번에 계산
+    - 같은 쌍은 한 번만 계산하고, 길이순으로 정렬해 미니배치의 패딩을 줄임
+
+    모델 추론은 작업 스레드 하나에서만 실행되므로 요청 스레드끼리 CPU 코어를 나눠 쓰지 않는다.
+    """
+
+    def __init__(self, score_fn: Callable[[List[Tuple[str, str]], int], List[float]],
+                 max_batch: int = 64, max_wait_ms: float = 5.0):
+        """
+        Args:
+            score_fn: 실제 점수 계산 함수 (쌍 목록, 미니배치 크기) -> 점수 목록
+            max_batch: 한 번의 모델 추론에 넣을 최대 쌍 수
+            max_wait_ms: 첫 요청 후 다른 요청을 기다리는 최대 시간(ms)
+        """
+        self.score_fn = score_fn
+        self.max_batch = max(max_batch, 1)
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue: 'queue.Queue' = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='rerank-batcher', daemon=True)
+        self._stats_lock = threading.Lock()
+
+        # 통계
+        self.batches = 0
+        self.requests = 0
+        self.pairs = 0
+        self.unique_pairs = 0
+        self.wait_time = 0.0
+
+        self._thread.start()
+
+    def score(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """
+        (질문, 파편) 쌍 점수 계산 (다른 요청의 쌍과 함께 배치로 실행)
+
+        Args:
+            pairs: (질문, 파편 내용) 목록
+
+        Returns:
+            List[float]: 쌍별 점수 (입력 순서)
+        """
+        if not pairs:
+            return []
+        future: Future = Future()
+        self._queue.put((list(pairs), future, time.monotonic()))
+        return future.result()
+
+    def _collect(self, first) -> List:
+        """첫 요청 이후 max_wait 동안 또는 max_batch 쌍이 찰 때까지 요청 수집"""
+        items = [first]
+        total = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while total < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)
+                break
+            items.append(item)
+            total += len(item[0])
+        return items
+
+    def _run(self):
+        """작업 스레드: 요청 수집 -> 중복 제거 / 길이순 정렬 -> 배치 추론 -> 결과 분배"""
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            items = self._collect(first)
+            started = time.monotonic()
+
+            # 요청 간 같은 쌍은 한 번만 계산
+            positions: Dict[Tuple[str, str], int] = {}
+            unique: List[Tuple[str, str]] = []
+            for pairs, _, _ in items:
+                for pair in pairs:
+                    if pair not in positions:
+                        positions[pair] = len(unique)
+                        unique.append(pair)
+
+            # 비슷한 길이끼리 미니배치를 이루도록 정렬 (padding=True의 낭비 감소)
+            order = sorted(range(len(unique)), key=lambda i: len(unique[i][0]) + len(unique[i][1]))
+            try:
+                sorted_scores = self.score_fn([unique[i] for i in order], self.max_batch)
+                scores: List[Optional[float]] = [None] * len(unique)
+                for i, score in zip(order, sorted_scores):
+                    scores[i] = score
+                for pairs, future, _ in items:
+                    future.set_result([scores[positions[pair]] for pair in pairs])
+            except Exception as e:
+                for _, future, _ in items:
+                    future.set_exception(e)
+
+            with self._stats_lock:
+                self.batches += 1
+                self.requests += len(items)
+                self.pairs += sum(len(pairs) for pairs, _, _ in items)
+                self.unique_pairs += len(unique)
+                self.wait_time += sum(started - submitted for _, _, submitted in items)
+
+    def stats(self) -> Dict[str, float]:
+        """배치 수, 평균 배치 크기(요청/쌍), 평균 대기 시간(ms)"""
+        with self._stats_lock:
+            batches = max(self.batches, 1)
+            return {
+                'max_batch': self.max_batch,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'batches': self.batches,
+                'requests': self.requests,
+                'pairs': self.pairs,
+                'unique_pairs': self.unique_pairs,
+                'avg_requests_per_batch': round(self.requests / batches, 2),
+                'avg_pairs_per_batch': round(self.unique_pairs / batches, 2),
+                'avg_wait_ms': round(self.wait_time / max(self.requests, 1) * 1000.0, 3)
+            }
+
+    def shutdown(self):
+        """작업 스레드 종료 (대기 중인 요청은 처리 후 종료)"""
+        self._queue.put(_STOP)
+        self._thread.join(timeout=5.0)
@@ -0,0 +1,145 @@
+"""
+검색 결과 캐시 모듈
+
+같은 검색 요청(쿼리, k, 필터, 재랭킹 여부, 가중치 등)을 정규화한 해시와
+프로젝트 인덱스 버전을 키로 응답을 보관하여 임베딩 / 검색 / 재랭킹을 건너뛴다.
+"""
+
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def request_digest(fields: Dict[str, Any]) -> str:
+    """
+    검색 요청 필드의 정규화 해시 (키 순서, 공백과 무관)
+
+    Args:
+        fields: 결과에 영향을 주는 요청 필드
+
+    Returns:
+        str: SHA-1 16진 문자열
+    """
+    canonical = json.dumps(fields, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    LRU + TTL + 바이트 예산 결과 캐시
+
+    키는 (프로젝트, 인덱스 버전, 요청 해시)이며, 인덱스 버전이 바뀌면 이전 항목은 조회되지 않고
+    LRU로 밀려난다. 스냅샷 교체 시에는 invalidate()로 해당 프로젝트 항목을 바로 비운다.
+    """
+
+    def __init__(self, max_bytes: int = 64 << 20, ttl: float = 300.0, max_entries: int = 10000):
+        """
+        Args:
+            max_bytes: 보관할 결과 크기 합계 상한 (바이트)
+            ttl: 항목 유효 시간(초), 0이면 만료 없음
+            max_entries: 최대 항목 수
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._entries: 'OrderedDict[Tuple[str, str, str], Tuple[float, int, Any]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # 통계
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, project: str, version: str, digest: str) -> Optional[Any]:
+        """
+        캐시 조회 (적중 시 최근 사용으로 이동)
+
+        Args:
+            project: 프로젝트 이름
+            version: 인덱스 버전 (ProjectHandle.cache_version)
+            digest: 요청 해시 (request_digest)
+
+        Returns:
+            Optional[Any]: 저장된 값 (없거나 만료되면 None)
+        """
+        key = (project, version, digest)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, size, value = entry
+            if self.ttl > 0 and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, project: str, version: str, digest: str, value: Any, size: int):
+        """
+        캐시 저장 (예산을 넘으면 가장 오래 사용하지 않은 항목부터 제거)
+
+        Args:
+            project: 프로젝트 이름
+            version: 인덱스 버전
+            digest: 요청 해시
+            value: 저장할 값 (호출자는 저장 후 값을 변경하지 않아야 함)
+            size: 값 크기 추정치 (바이트)
+        """
+        if size > self.max_bytes:
+            return
+        key = (project, version, digest)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (time.monotonic(), size, value)
+            self._bytes += size
+            while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, project: Optional[str] = None) -> int:
+        """
+        프로젝트(None이면 전체) 항목 제거
+
+        Args:
+            project: 프로젝트 이름
+
+        Returns:
+            int: 제거한 항목 수
+        """
+        with self._lock:
+            if project is None:
+                keys = list(self._entries)
+            else:
+                keys = [key for key in self._entries if key[0] == project]
+            for key in keys:
+                self._bytes -= self._entries.pop(key)[1]
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """적중/실패 수, 적중률, 항목 수, 사용 바이트"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes
+            }
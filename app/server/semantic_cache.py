@@ -0,0 +1,170 @@
+"""
+의미 기반 쿼리 캐시 모듈
+
+최근 쿼리 임베딩을 작은 Faiss 내적 인덱스에 보관하고, 새 쿼리 임베딩과의 코사인 유사도가
+임계값 이상이면 캐시된 쿼리의 (재랭킹된) 결과를 재사용하여 검색기와 Cross-Encoder를 건너뛴다.
+("통계 보기 오류" / "자세한 통계 보기를 누르면 오류" 같은 같은 요구사항의 다른 표현)
+"""
+
+import time
+import threading
+import numpy as np
+import faiss
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# 최고 유사도 분포 구간 경계 (임계값 조정용 지표)
+SIMILARITY_BUCKETS = (0.80, 0.85, 0.90, 0.93, 0.95, 0.97, 0.99)
+
+
+class SemanticQueryCache:
+    """
+    쿼리 임베딩 유사도 기반 결과 캐시
+
+    - 구역: (프로젝트, 인덱스 버전, 쿼리 외 요청 파라미터 해시)마다 IndexIDMap(IndexFlatIP) 하나
+    - 항목: 정규화된 쿼리 임베딩 + 결과, 전체 항목 수 기준 LRU / TTL 제거
+    - 지표: 적중/실패 수, 조회마다 최고 유사도 구간별 개수 (임계값을 바꿨을 때의 적중률 추정)
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 2000, ttl: float = 600.0):
+        """
+        Args:
+            threshold: 재사용할 최소 코사인 유사도
+            max_entries: 전체 최대 항목 수
+            ttl: 항목 유효 시간(초), 0이면 만료 없음
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._partitions: Dict[Tuple[str, str, str], faiss.Index] = {}
+        # 항목 ID -> (구역, 쿼리, 저장 시각, 결과), 최근 사용 순
+        self._entries: 'OrderedDict[int, Tuple[Tuple[str, str, str], str, float, Any]]' = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        # 지표
+        self.hits = 0
+        self.misses = 0
+        self.similarity_counts = [0] * (len(SIMILARITY_BUCKETS) + 1)
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        """코사인 유사도용 L2 정규화 (1, d) float32"""
+        vector = np.asarray(embedding, dtype='float32').reshape(1, -1).copy()
+        faiss.normalize_L2(vector)
+        return vector
+
+    def lookup(self, project: str, version: str, params_digest: str,
+               embedding: np.ndarray) -> Optional[Tuple[str, Any, float]]:
+        """
+        가장 유사한 캐시 쿼리 조회
+
+        Args:
+            project: 프로젝트 이름
+            version: 인덱스 버전 (ProjectHandle.cache_version)
+            params_digest: 쿼리를 제외한 요청 파라미터 해시
+            embedding: 새 쿼리 임베딩
+
+        Returns:
+            Optional[Tuple]: (캐시된 쿼리, 결과, 유사도) - 임계값 미만이면 None
+        """
+        partition_key = (project, version, params_digest)
+        vector = self._normalize(embedding)
+        with self._lock:
+            index = self._partitions.get(partition_key)
+            if index is None or index.ntotal == 0:
+                self.misses += 1
+                return None
+
+            similarities, ids = index.search(vector, 1)
+            entry_id, similarity = int(ids[0][0]), float(similarities[0][0])
+            entry = self._entries.get(entry_id)
+            if entry is not None and self.ttl > 0 and time.monotonic() - entry[2] > self.ttl:
+                self._remove(entry_id)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.similarity_counts[int(np.searchsorted(SIMILARITY_BUCKETS, similarity, side='right'))] += 1
+            if similarity < self.threshold:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            return entry[1], entry[3], similarity
+
+    def put(self, project: str, version: str, params_digest: str,
+            embedding: np.ndarray, query: str, value: Any):
+        """
+        쿼리 결과 저장 (전체 항목 수를 넘으면 가장 오래 사용하지 않은 항목부터 제거)
+
+        Args:
+            project: 프로젝트 이름
+            version: 인덱스 버전
+            params_digest: 쿼리를 제외한 요청 파라미터 해시
+            embedding: 쿼리 임베딩
+            query: 쿼리 문자열
+            value: 저장할 결과 (호출자는 저장 후 값을 변경하지 않아야 함)
+        """
+        partition_key = (project, version, params_digest)
+        vector = self._normalize(embedding)
+        with self._lock:
+            index = self._partitions.get(partition_key)
+            if index is None:
+                index = faiss.IndexIDMap(faiss.IndexFlatIP(vector.shape[1]))
+                self._partitions[partition_key] = index
+
+            entry_id = self._next_id
+            self._next_id += 1
+            index.add_with_ids(vector, np.array([entry_id], dtype='int64'))
+            self._entries[entry_id] = (partition_key, query, time.monotonic(), value)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_id: int):
+        """항목 제거 (구역이 비면 구역도 제거, 잠금 안에서 호출)"""
+        partition_key = self._entries.pop(entry_id)[0]
+        index = self._partitions[partition_key]
+        index.remove_ids(np.array([entry_id], dtype='int64'))
+        if index.ntotal == 0:
+            del self._partitions[partition_key]
+
+    def invalidate(self, project: Optional[str] = None) -> int:
+        """
+        프로젝트(None이면 전체) 항목 제거
+
+        Args:
+            project: 프로젝트 이름
+
+        Returns:
+            int: 제거한 항목 수
+        """
+        with self._lock:
+            entry_ids = [
+                entry_id for entry_id, entry in self._entries.items()
+                if project is None or entry[0][0] == project
+            ]
+            for entry_id in entry_ids:
+                self._remove(entry_id)
+            return len(entry_ids)
+
+    def stats(self) -> Dict[str, Any]:
+        """적중률, 항목 수, 최고 유사도 구간별 조회 수"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            bounds: List[str] = [f"<{SIMILARITY_BUCKETS[0]:.2f}"] + [
+                f">={bound:.2f}" for bound in SIMILARITY_BUCKETS
+            ]
+            return {
+                'threshold': self.threshold,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'partitions': len(self._partitions),
+                'best_similarity': dict(zip(bounds, self.similarity_counts))
+            }
@@ -0,0 +1,55 @@
+"""
+동일 요청 합치기(single-flight) 모듈
+
+같은 키의 작업이 이미 실행 중이면 새로 실행하지 않고 그 결과를 함께 기다린다.
+여러 검토자가 같은 요구사항을 동시에 열 때 같은 검색이 여러 번 실행되지 않게 한다.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    키별 실행 중 작업 공유 (이벤트 루프 안에서만 사용)
+
+    작업은 요청과 분리된 Task로 실행하고 각 요청은 shield로 기다리므로,
+    한 요청의 연결이 끊겨 취소되어도 같은 작업을 기다리는 다른 요청은 영향을 받지 않는다.
+    작업이 끝나면 키를 지우므로 결과 보관은 캐시가 담당한다.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+        # 통계
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        키의 작업을 실행하거나 실행 중인 작업의 결과를 기다림
+
+        Args:
+            key: 작업 키 (같은 키는 같은 결과를 내야 함)
+            func: 작업 코루틴을 만드는 인자 없는 함수
+
+        Returns:
+            Any: 작업 결과 (예외는 기다리는 모든 요청에 전달)
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        """실행 / 합쳐진 요청 수, 현재 실행 중인 키 수"""
+        return {
+            'executions': self.executions,
+            'coalesced': self.coalesced,
+            'inflight': len(self._inflight)
+        }
@@ -0,0 +1,115 @@
+"""
+검색 지연 시간 예산 모듈
+
+요청별 마감 시각(Deadline)과 단계별 평균 소요 시간(LatencyEstimator)으로
+검색 단계마다 남은 시간 안에 끝낼 수 있는지 판단하고, 줄이거나 건너뛴 단계를 기록한다.
+"""
+
+import time
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+class Deadline:
+    """
+    요청 하나의 마감 시각
+
+    검색 파이프라인의 각 단계는 remaining() / allows()로 남은 예산을 확인하고,
+    예산 때문에 결과를 줄이거나 건너뛴 단계는 degrade()로 기록한다 (응답의 degraded).
+    """
+
+    def __init__(self, timeout: float):
+        """
+        Args:
+            timeout: 요청 시작부터 허용하는 시간(초)
+        """
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+        self.degraded: List[str] = []
+
+    @classmethod
+    def from_ms(cls, timeout_ms: Optional[float]) -> Optional['Deadline']:
+        """밀리초 예산으로 생성 (None 또는 0이면 None = 무제한)"""
+        if not timeout_ms:
+            return None
+        return cls(timeout_ms / 1000.0)
+
+    def remaining(self) -> float:
+        """남은 시간(초), 지났으면 0"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def allows(self, estimate: Optional[float]) -> bool:
+        """
+        예상 소요 시간만큼 남았는지 확인
+
+        Args:
+            estimate: 예상 소요 시간(초), None(측정값 없음)이면 마감 전인지만 확인
+        """
+        if estimate is None:
+            return not self.expired()
+        return self.remaining() >= estimate
+
+    def degrade(self, stage: str):
+        """예산 때문에 줄이거나 건너뛴 단계 기록 (중복 제외)"""
+        if stage not in self.degraded:
+            self.degraded.append(stage)
+
+
+class LatencyEstimator:
+    """
+    단계별 소요 시간 지수 이동 평균
+
+    처음 측정값은 그대로 쓰고 이후에는 alpha 비율로 반영하여,
+    인덱스 크기나 장비 부하가 바뀌면 몇 번의 요청 안에 따라간다.
+
+    예상 시간 때문에 건너뛴 단계는 다시 측정되지 않으므로, 마지막 측정 이후 half_life초마다
+    예상 시간을 절반으로 줄인다. 한 번의 느린 측정(콜드 스타트 등)이 있어도 시간이 지나면
+    예산 안에 들어와 다시 실행되고 새 측정값으로 보정된다.
+    """
+
+    def __init__(self, alpha: float = 0.2, half_life: float = 30.0):
+        """
+        Args:
+            alpha: 새 측정값 반영 비율 (0~1)
+            half_life: 측정이 없을 때 예상 시간이 절반으로 줄어드는 시간(초), 0이면 줄이지 않음
+        """
+        self.alpha = alpha
+        self.half_life = half_life
+        self._estimates: Dict[str, Tuple[float, float]] = {}  # stage -> (예상 시간, 마지막 측정 시각)
+        self._lock = threading.Lock()
+
+    def _decayed(self, seconds: float, observed_at: float, now: float) -> float:
+        """마지막 측정 이후 지난 시간만큼 줄인 예상 시간"""
+        if self.half_life <= 0:
+            return seconds
+        return seconds * 0.5 ** ((now - observed_at) / self.half_life)
+
+    def observe(self, stage: str, seconds: float):
+        """단계 소요 시간 측정값 반영"""
+        with self._lock:
+            now = time.monotonic()
+            previous = self._estimates.get(stage)
+            if previous is None:
+                self._estimates[stage] = (seconds, now)
+            else:
+                current = self._decayed(*previous, now)
+                self._estimates[stage] = (current + self.alpha * (seconds - current), now)
+
+    def estimate(self, stage: str) -> Optional[float]:
+        """단계 예상 소요 시간(초), 측정값이 없으면 None"""
+        entry = self._estimates.get(stage)
+        if entry is None:
+            return None
+        return self._decayed(*entry, time.monotonic())
+
+    def stats(self) -> Dict[str, float]:
+        """단계별 예상 소요 시간(ms)"""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                stage: round(self._decayed(*entry, now) * 1000.0, 3)
+                for stage, entry in self._estimates.items()
+            }
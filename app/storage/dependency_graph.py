@@ -0,0 +1,208 @@
+"""
+컴포넌트 / import 의존성 그래프 모듈
+
+파서가 만든 파일 단위 간선 목록을 CSR 인접 배열(자식 방향, 부모 방향)로 보관하고,
+faiss_idx -> 노드 매핑 배열로 검색 결과 파편에서 바로 이웃 파일을 찾는다.
+검색 확장은 추가 벡터 검색 없이 배열 읽기만으로 처리된다.
+"""
+
+import os
+import json
+import numpy as np
+from typing import Any, Dict, List, Optional
+
+# 간선 종류 (kinds 배열 값 = 인덱스)
+EDGE_KINDS = ('import', 'component')
+
+# 확장 방향
+EXPAND_DIRECTIONS = ('parents', 'children', 'both')
+
+
+def _build_csr(num_nodes: int, sources: np.ndarray, targets: np.ndarray, kinds: np.ndarray):
+    """간선 목록을 source 기준 CSR 배열 (offsets, targets, kinds)로 변환"""
+    order = np.lexsort((targets, sources))
+    counts = np.bincount(sources, minlength=num_nodes)
+    offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets, targets[order].astype(np.int32), kinds[order].astype(np.int8)
+
+
+class DependencyGraph:
+    """
+    파일 노드 의존성 그래프
+
+    - children: 파일이 import하거나 하위 컴포넌트로 사용하는 파일
+    - parents: 파일을 import하거나 하위 컴포넌트로 사용하는 파일
+    - node_of[faiss_idx]: 파편이 속한 파일 노드 (-1은 그래프에 없는 파일)
+
+    간선은 인덱싱 시점의 파서 결과로 고정되며, 파편 추가/삭제 시에는 저장소가 node_of만 갱신한다.
+    """
+
+    def __init__(self, nodes: Optional[List[str]] = None, capacity: int = 1024):
+        """
+        Args:
+            nodes: 노드 파일 경로 목록
+            capacity: node_of 초기 크기
+        """
+        self.nodes = list(nodes or [])
+        self.node_ids = {file_path: i for i, file_path in enumerate(self.nodes)}
+        empty_offsets = np.zeros(len(self.nodes) + 1, dtype=np.int64)
+        self.child_offsets = self.parent_offsets = empty_offsets
+        self.child_targets = self.parent_targets = np.zeros(0, dtype=np.int32)
+        self.child_kinds = self.parent_kinds = np.zeros(0, dtype=np.int8)
+        self.size = 0  # faiss_idx 상한 (ntotal)
+        self.node_of = np.full(max(capacity, 1), -1, dtype=np.int32)
+
+    @classmethod
+    def from_edges(cls, nodes: List[str], edges: List[List[Any]]) -> 'DependencyGraph':
+        """
+        파서 결과로 그래프 생성
+
+        Args:
+            nodes: 노드 파일 경로 목록
+            edges: [부모 노드, 자식 노드, 간선 종류] 목록
+
+        Returns:
+            DependencyGraph: 생성된 그래프
+        """
+        graph = cls(nodes)
+        if not edges:
+            return graph
+
+        sources = np.asarray([edge[0] for edge in edges], dtype=np.int64)
+        targets = np.asarray([edge[1] for edge in edges], dtype=np.int64)
+        kinds = np.asarray([EDGE_KINDS.index(edge[2]) for edge in edges], dtype=np.int8)
+        graph.child_offsets, graph.child_targets, graph.child_kinds = _build_csr(
+            len(graph.nodes), sources, targets, kinds
+        )
+        graph.parent_offsets, graph.parent_targets, graph.parent_kinds = _build_csr(
+            len(graph.nodes), targets, sources, kinds
+        )
+        return graph
+
+    @property
+    def num_edges(self) -> int:
+        """간선 수"""
+        return len(self.child_targets)
+
+    def reserve(self, size: int):
+        """
+        node_of를 size까지 확장 (새 파편은 노드 없음)
+
+        Args:
+            size: 새 faiss_idx 상한
+        """
+        if size > len(self.node_of):
+            node_of = np.full(max(size, len(self.node_of) * 2), -1, dtype=np.int32)
+            node_of[:self.size] = self.node_of[:self.size]
+            self.node_of = node_of
+        self.size = max(self.size, size)
+
+    def bind(self, idx: int, file_path: Optional[str]):
+        """
+        파편을 파일 노드에 연결
+
+        Args:
+            idx: 파편 faiss_idx
+            file_path: 파편의 파일 경로
+        """
+        self.reserve(idx + 1)
+        self.node_of[idx] = self.node_ids.get(file_path, -1)
+
+    def bind_files(self, file_ids: Dict[str, List[int]], size: int):
+        """
+        파일별 파편 목록으로 node_of 전체 재구성
+
+        Args:
+            file_ids: 파일 경로 -> faiss_idx 목록
+            size: faiss_idx 상한
+        """
+        self.size = 0
+        self.node_of = np.full(max(size, 1), -1, dtype=np.int32)
+        self.reserve(size)
+        for file_path, ids in file_ids.items():
+            node = self.node_ids.get(file_path)
+            if node is not None and len(ids):
+                self.node_of[np.asarray(list(ids), dtype=np.int64)] = node
+
+    def unbind(self, ids: List[int]):
+        """삭제된 파편의 노드 연결 해제"""
+        ids = [idx for idx in ids if idx < self.size]
+        if ids:
+            self.node_of[ids] = -1
+
+    def node_for(self, idx: int) -> int:
+        """파편의 노드 (-1은 없음)"""
+        return int(self.node_of[idx]) if idx < self.size else -1
+
+    def neighbors(self, node: int, direction: str = 'both') -> np.ndarray:
+        """
+        노드의 1-hop 이웃 노드
+
+        Args:
+            node: 기준 노드
+            direction: 'parents', 'children', 'both'
+
+        Returns:
+            np.ndarray: 이웃 노드 배열
+        """
+        if node < 0 or node >= len(self.nodes):
+            return np.zeros(0, dtype=np.int32)
+
+        parts = []
+        if direction in ('children', 'both'):
+            parts.append(self.child_targets[self.child_offsets[node]:self.child_offsets[node + 1]])
+        if direction in ('parents', 'both'):
+            parts.append(self.parent_targets[self.parent_offsets[node]:self.parent_offsets[node + 1]])
+        # import와 컴포넌트 간선이 같은 파일 쌍을 잇는 경우가 있으므로 중복 제거
+        return np.unique(np.concatenate(parts))
+
+    def nbytes(self) -> int:
+        """배열이 차지하는 바이트 수"""
+        return sum(array.nbytes for array in (
+            self.child_offsets, self.child_targets, self.child_kinds,
+            self.parent_offsets, self.parent_targets, self.parent_kinds,
+            self.node_of
+        ))
+
+    def save(self, graph_dir: str):
+        """
+        그래프 저장 (numpy 배열 + 노드/메타 JSON)
+
+        Args:
+            graph_dir: 저장 디렉토리
+        """
+        os.makedirs(graph_dir, exist_ok=True)
+        arrays = {
+            'child_offsets': self.child_offsets,
+            'child_targets': self.child_targets,
+            'child_kinds': self.child_kinds,
+            'parent_offsets': self.parent_offsets,
+            'parent_targets': self.parent_targets,
+            'parent_kinds': self.parent_kinds,
+            'node_of': self.node_of[:self.size]
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(graph_dir, f"{name}.npy"), array)
+        with open(os.path.join(graph_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'size': self.size, 'nodes': self.nodes}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, graph_dir: str, mmap: bool = False) -> 'DependencyGraph':
+        """
+        저장된 그래프 로드
+
+        Args:
+            graph_dir: 저장 디렉토리
+            mmap: True이면 copy-on-write 메모리 맵으로 로드
+        """
+        with open(os.path.join(graph_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        graph = cls(meta['nodes'], capacity=1)
+        mode = 'c' if mmap else None
+        for name in ('child_offsets', 'child_targets', 'child_kinds',
+                     'parent_offsets', 'parent_targets', 'parent_kinds', 'node_of'):
+            setattr(graph, name, np.load(os.path.join(graph_dir, f"{name}.npy"), mmap_mode=mode))
+        graph.size = meta['size']
+        return graph
@@ -3,12 +3,70 @@ Faiss 벡터 저장소 모듈 (Cross-Encoder 재랭킹 기능 추가)
 """
 
 import os
+import copy
 import json
+import time
 import pickle
+import shutil
 import numpy as np
 import faiss
+from contextlib import contextmanager
 from typing import List, Dict, Any, Optional, Tuple, Set
 
+from app.storage.metadata_store import SQLiteMetadataStore
+from app.storage.secondary_index import SecondaryIndex
+from app.storage.keyword_index import BM25KeywordIndex
+from app.storage.knn_graph import KNNGraph, DEFAULT_NEIGHBORS
+from app.storage.dependency_graph import DependencyGraph
+from app.storage.search_executor import SearchExecutor
+from app.storage.fusion import fuse_results, parse_search_options
+from app.storage.deadline import Deadline, LatencyEstimator
+
+# 키워드 검색 시 파편 타입별 점수 가중치
+KEYWORD_TYPE_WEIGHTS = {
+    'component': 1.3,   # 컴포넌트 가중치 낮춤
+    'javascript': 1.2,  # JavaScript 파일 적절한 가중치
+    'script': 1.2,      # Vue 스크립트 섹션도 동일 가중치
+    'template': 1.1,    # 템플릿 가중치 조정
+    'css': 0.9,         # CSS 파일 낮은 가중치
+    'style': 0.9        # Vue 스타일 섹션 낮은 가중치
+}
+KEYWORD_DEFAULT_WEIGHT = 0.8  # 기타 파일 가장 낮은 가중치
+
+# 지연 시간 예산이 있는 재랭킹에서 한 번에 점수를 계산할 최소 후보 수 (결합 점수 순으로 나눠 계산)
+RERANK_CHUNK_SIZE = 8
+
+# 메모리 맵 로드 플래그 (IndexFlat의 벡터 배열까지 mmap하려면 IO_FLAG_MMAP_IFC 필요)
+FAISS_MMAP_FLAGS = getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+# 메모리 맵 로드 시 SQLite mmap 상한 (바이트)
+METADATA_MMAP_SIZE = 1 << 30
+
+# 체크포인트 디렉토리 안의 파일 이름
+CHECKPOINT_FILES = {
+    'index': 'code.index',
+    'semantic': 'semantic.index',
+    'id_map': 'id_map.pkl',
+    'secondary': 'secondary.pkl',
+    'keyword': 'keyword',
+    'knn': 'knn',
+    'deps': 'deps',
+    'manifest': 'manifest.json'
+}
+# 보관할 체크포인트 수 (현재 + 직전, 직전 체크포인트를 읽는 중인 다른 프로세스 보호)
+KEEP_CHECKPOINTS = 2
+# 체크포인트 시 Faiss 행 중 살아 있는 파편 비율이 이 값 미만이면 압축 (삭제된 행 제거 후 faiss_idx 재배치)
+COMPACT_LIVE_RATIO = 0.5
+# 압축 시 Faiss 벡터를 한 번에 복원할 행 수
+COMPACT_BATCH = 4096
+
+# kNN 그래프 이웃 계산 시 한 번에 처리할 행 수
+KNN_SEARCH_BATCH = 1024
+
+# 의존성 확장 후보 점수 가중치 (파일 관계만으로 추가되므로 시드 점수보다 낮게, _downweight 참고)
+DEPENDENCY_EXPAND_WEIGHT = 0.5
+# 의존성 확장 시 시드별 최대 이웃 파일 수
+DEPENDENCY_EXPAND_MAX_FILES = 8
+
 class FaissVectorStore:
     """
     Faiss를 사용한 코드 임베딩 벡터 저장소
@@ -19,7 +77,17 @@ class FaissVectorStore:
                  index_type: str = 'Cosine',
                  data_dir: str = './data',
                  index_name: str = 'vue_todo_fragments',
-                 cross_encoder=None):
+                 cross_encoder=None,
+                 semantic_encoder=None,
+                 exact_scan_ratio: float = 0.1,
+                 fusion_method: str = 'max',
+                 search_executor: Optional[SearchExecutor] = None,
+                 retriever_timeouts: Optional[Dict[str, float]] = None,
+                 use_mmap: bool = False,
+                 checkpoint_interval: int = 1000,
+                 read_only: bool = False,
+                 knn_neighbors: int = DEFAULT_NEIGHBORS,
+                 compact_live_ratio: float = COMPACT_LIVE_RATIO):
         """
         Args:
             dimension: 벡터 차원 수
@@ -27,15 +95,46 @@ class FaissVectorStore:
             data_dir: 데이터 저장 디렉토리
             index_name: 인덱스 이름
             cross_encoder: CrossEncoder 인스턴스 (재랭킹용)
+            semantic_encoder: SemanticEncoder 인스턴스 (없으면 처음 필요할 때 로드)
+            exact_scan_ratio: 필터 통과 비율이 이 값 이하이면 부분집합 정확 검색 사용
+            fusion_method: 기본 결과 결합 방식 ('max', 'minmax', 'zscore', 'rrf')
+            search_executor: 1차 검색기 동시 실행기 (없으면 저장소 전용으로 생성)
+            retriever_timeouts: 검색기 이름('vector', 'keyword', 'semantic') -> 제한 시간(초)
+            use_mmap: 저장된 인덱스를 메모리 맵으로 로드 (시작 시 복사 없음, 여러 워커가
+                      OS 페이지 캐시의 같은 페이지를 공유). 파편 추가 시에만 힙으로 복사한다.
+            checkpoint_interval: 변경 로그가 이 개수 이상 쌓이면 커밋 시 체크포인트 기록
+            read_only: 읽기 전용으로 열기 (추가/삭제/체크포인트 불가). 불변 스냅샷(SnapshotManager 참고)
+                       뿐 아니라 다른 프로세스가 쓰는 중인 data_dir도 열 수 있다 (열 때까지 커밋된 변경 로그 재적용).
+            knn_neighbors: 색인 시점에 유지할 파편별 kNN 이웃 수 (0이면 kNN 그래프 사용 안 함)
+            compact_live_ratio: 체크포인트 시 살아 있는 파편 / Faiss 행 비율이 이 값 미만이면 압축 (0이면 자동 압축 안 함)
         """
         self.dimension = dimension
         self.index_type = index_type
         self.data_dir = data_dir
         self.index_name = index_name
+        self.exact_scan_ratio = exact_scan_ratio
+        self.fusion_method = fusion_method
+        self.use_mmap = use_mmap
+        self.checkpoint_interval = checkpoint_interval
+        self.read_only = read_only
+        self.knn_neighbors = knn_neighbors
+        self.compact_live_ratio = compact_live_ratio
+        
+        # 1차 검색기 동시 실행 설정
+        self.search_executor = search_executor or SearchExecutor(max_workers=8)
+        self._owns_search_executor = search_executor is None
+        self.retriever_timeouts = retriever_timeouts or {}
+        
+        # 지연 시간 예산 판단용 단계별 소요 시간 ('semantic': 의미 기반 검색기, 'rerank_pair': 쌍당 재랭킹)
+        self.latency = LatencyEstimator()
         
         # Cross-Encoder 설정
         self.cross_encoder = cross_encoder
         
+        # 의미 기반 검색용 인코더
+        self.semantic_encoder = semantic_encoder
+        self._semantic_warmed = False
+        
         # 저장 디렉토리 생성
         self.index_dir = os.path.join(data_dir, 'faiss')
         self.meta_dir = os.path.join(data_dir, 'metadata')
@@ -43,28 +142,117 @@ class FaissVectorStore:
         os.makedirs(self.index_dir, exist_ok=True)
         os.makedirs(self.meta_dir, exist_ok=True)
         
-        # 인덱스 파일 경로
+        # 체크포인트 경로 (CURRENT 파일이 현재 체크포인트 디렉토리 이름을 가리킴)
+        self.checkpoint_dir = os.path.join(self.index_dir, f"{index_name}_checkpoints")
+        self.current_path = os.path.join(self.checkpoint_dir, 'CURRENT')
+        self.metadata_db_path = os.path.join(self.meta_dir, f"{index_name}_metadata.db")
+        
+        # 구버전 단일 파일 경로 (이관용)
         self.index_path = os.path.join(self.index_dir, f"{index_name}.index")
+        self.semantic_index_path = os.path.join(self.index_dir, f"{index_name}_semantic.index")
         self.id_map_path = os.path.join(self.meta_dir, f"{index_name}_id_map.pkl")
         self.metadata_path = os.path.join(self.meta_dir, f"{index_name}_metadata.json")
+        self.secondary_index_path = os.path.join(self.meta_dir, f"{index_name}_secondary.pkl")
+        self.keyword_index_dir = os.path.join(self.meta_dir, f"{index_name}_keyword")
         
         # 내부 상태
         self.index = None
+        self.semantic_index = None  # faiss_idx와 같은 순서의 의미 임베딩 인덱스
+        self._mapped = False  # Faiss 인덱스가 읽기 전용 메모리 맵 상태인지 여부
         self.id_to_idx = {}  # fragment_id -> faiss_idx 매핑
         self.idx_to_id = {}  # faiss_idx -> fragment_id 매핑
-        self.fragment_metadata = {}  # fragment_id -> metadata 매핑
+        # fragment_id -> metadata 매핑 (SQLite 컬럼 저장소, full_content는 요청 시에만 로드)
+        self.fragment_metadata = SQLiteMetadataStore(
+            self.metadata_db_path,
+            mmap_size=METADATA_MMAP_SIZE if use_mmap else 0,
+            read_only=read_only
+        )
+        # file_path / type / component_name 보조 인덱스 및 집계 통계
+        self.secondary_index = SecondaryIndex()
+        # 전체 코드 내용에 대한 BM25 역색인
+        self.keyword_index = BM25KeywordIndex()
+        # 파편별 상위 이웃 (관련 코드 조회 / 그래프 확장)
+        self.knn_graph = self._new_knn_graph()
+        # 컴포넌트 / import 의존성 그래프 (set_dependency_graph 전에는 None)
+        self.dependency_graph: Optional[DependencyGraph] = None
+        
+        # 쓰기 상태 (커밋 대기 중인 변경, 마지막 체크포인트 이후 변경 로그 수)
+        self._pending: List[Tuple] = []
+        self._in_transaction = False
+        self._checkpoint_seq = 0
+        self._changes_since_checkpoint = 0
+        # 압축된 체크포인트를 반영했지만 메타데이터 DB의 faiss_idx 재배치가 실패한 상태
+        self._renumber_pending = False
+        
+        # 검색 결과가 바뀔 수 있는 변경(커밋 적용, 초기화, 의존성 그래프 교체)마다 증가 (결과 캐시 무효화용)
+        self.generation = 0
         
         # 인덱스 초기화 또는 로드
         self._init_index()
     
+    @staticmethod
+    def index_exists(data_dir: str, index_name: str = 'vue_todo_fragments') -> bool:
+        """
+        저장된 인덱스(체크포인트 또는 구버전 단일 파일)가 있는지 확인
+        
+        Args:
+            data_dir: 데이터 저장 디렉토리
+            index_name: 인덱스 이름
+        """
+        index_dir = os.path.join(data_dir, 'faiss')
+        return (
+            os.path.exists(os.path.join(index_dir, f"{index_name}_checkpoints", 'CURRENT'))
+            or os.path.exists(os.path.join(index_dir, f"{index_name}.index"))
+        )
+    
+    def _checkpoint_paths(self, checkpoint_path: str) -> Dict[str, str]:
+        """체크포인트 디렉토리 안의 구성 요소별 경로"""
+        return {key: os.path.join(checkpoint_path, name) for key, name in CHECKPOINT_FILES.items()}
+    
+    def _legacy_paths(self) -> Dict[str, str]:
+        """구버전 단일 파일 레이아웃의 구성 요소별 경로"""
+        return {
+            'index': self.index_path,
+            'semantic': self.semantic_index_path,
+            'id_map': self.id_map_path,
+            'secondary': self.secondary_index_path,
+            'keyword': self.keyword_index_dir,
+            'knn': None,
+            'deps': None,
+            'manifest': None
+        }
+    
+    def _current_checkpoint(self) -> Optional[str]:
+        """CURRENT가 가리키는 체크포인트 디렉토리 경로 (없으면 None)"""
+        if not os.path.exists(self.current_path):
+            return None
+        with open(self.current_path, 'r', encoding='utf-8') as f:
+            name = f.read().strip()
+        checkpoint_path = os.path.join(self.checkpoint_dir, name)
+        return checkpoint_path if os.path.isdir(checkpoint_path) else None
+    
     def _init_index(self):
-        """인덱스 초기화 또는 기존 인덱스 로드"""
-        # 기존 인덱스가 있으면 로드
-        if os.path.exists(self.index_path) and os.path.exists(self.id_map_path):
-            self._load_index()
+        """인덱스 초기화 또는 기존 인덱스(체크포인트 + 변경 로그) 로드"""
+        checkpoint_path = self._current_checkpoint()
+        if checkpoint_path is not None:
+            self._load_index(self._checkpoint_paths(checkpoint_path))
+        elif self.read_only:
+            raise FileNotFoundError(f"스냅샷 체크포인트를 찾을 수 없습니다: {self.checkpoint_dir}")
+        elif os.path.exists(self.index_path) and os.path.exists(self.id_map_path):
+            # 체크포인트 도입 이전 인덱스는 로드 후 체크포인트로 이관
+            self._load_index(self._legacy_paths())
+            self.checkpoint()
         else:
-            # 새 인덱스 생성
             self._create_index()
+            self.secondary_index = SecondaryIndex()
+            self.keyword_index = BM25KeywordIndex()
+            self.knn_graph = self._new_knn_graph()
+            self.dependency_graph = None
+            
+            # 첫 체크포인트 전에 커밋된 변경은 로그에서 복구, 로그에 없는 메타데이터는 제거
+            self._changes_since_checkpoint = self._replay_changes(0)
+            if self._changes_since_checkpoint == 0:
+                self.fragment_metadata.clear()
     
     def _create_index(self):
         """인덱스 새로 생성"""
@@ -78,78 +266,699 @@ class FaissVectorStore:
         else:
             # 기본값으로 L2 거리 사용
             self.index = faiss.IndexFlatL2(self.dimension)
+        
+        # 의미 임베딩 인덱스는 첫 추가 시 차원에 맞춰 생성
+        self.semantic_index = None
+        self._mapped = False
             
         print(f"새 Faiss 인덱스 생성 완료 (차원: {self.dimension}, 타입: {self.index_type})")
     
-    def _load_index(self):
-        """기존 인덱스 및 메타데이터 로드"""
+    def _load_index(self, paths: Dict[str, str]):
+        """
+        체크포인트 로드 후 이후 변경 로그 재적용
+        
+        Args:
+            paths: 구성 요소별 파일 경로 (_checkpoint_paths 또는 _legacy_paths)
+        """
         try:
-            # Faiss 인덱스 로드
-            self.index = faiss.read_index(self.index_path)
+            # Faiss 인덱스 로드 (use_mmap이면 복사 없이 메모리 맵)
+            self.index = self._read_faiss_index(paths['index'])
+            self._mapped = self.use_mmap
             
             # ID 매핑 로드
-            with open(self.id_map_path, 'rb') as f:
+            with open(paths['id_map'], 'rb') as f:
                 data = pickle.load(f)
                 self.id_to_idx = data.get('id_to_idx', {})
                 self.idx_to_id = data.get('idx_to_id', {})
             
-            # 메타데이터 JSON 파일에서 로드
-            if os.path.exists(self.metadata_path):
-                with open(self.metadata_path, 'r', encoding='utf-8') as f:
-                    self.fragment_metadata = json.load(f)
+            checkpoint_seq = 0
+            compacted = False
+            if paths['manifest'] and os.path.exists(paths['manifest']):
+                with open(paths['manifest'], 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                checkpoint_seq = manifest['seq']
+                compacted = manifest.get('compacted', False)
+            
+            # 압축된 체크포인트 반영 직후 중단되었으면 메타데이터 DB의 faiss_idx 재배치를 마저 수행
+            if compacted and not self.read_only:
+                renumbered = self.fragment_metadata.renumber(self.id_to_idx)
+                if renumbered:
+                    print(f"압축 체크포인트에 맞춰 메타데이터 재배치 완료 ({renumbered}개)")
+            
+            # 구버전 JSON 메타데이터가 있고 SQLite가 비어 있으면 1회 이관
+            if os.path.exists(self.metadata_path) and len(self.fragment_metadata) == 0:
+                migrated = self.fragment_metadata.import_legacy_json(self.metadata_path, self.id_to_idx)
+                print(f"JSON 메타데이터 이관 완료 ({migrated}개)")
+            
+            # 체크포인트의 보조 인덱스 / 키워드 역색인 / 의미 임베딩 인덱스 로드 (맞지 않으면 None)
+            secondary_index = self._read_secondary_index(paths['secondary'])
+            keyword_index = self._read_keyword_index(paths['keyword'])
+            semantic_index = self._read_semantic_index(paths['semantic'])
+            knn_graph = self._read_knn_graph(paths['knn'])
+            self.secondary_index = secondary_index or SecondaryIndex()
+            self.keyword_index = keyword_index or BM25KeywordIndex()
+            self.semantic_index = semantic_index
+            self.knn_graph = knn_graph  # 없으면 재적용 중에는 갱신하지 않고 마지막에 재구성
+            self.dependency_graph = self._read_dependency_graph(paths['deps'])
+            rebuild_semantic = semantic_index is None and self.index.ntotal > 0
+            
+            # 체크포인트 이후 커밋된 변경 재적용
+            replayed = self._replay_changes(checkpoint_seq, update_semantic=not rebuild_semantic)
+            
+            # 체크포인트에서 읽지 못한 구성 요소는 (재적용 후 상태의) 메타데이터로부터 재구성
+            if secondary_index is None:
+                self._rebuild_secondary_index()
+            if keyword_index is None:
+                self._rebuild_keyword_index()
+            if rebuild_semantic:
+                self._rebuild_semantic_index()
+            if knn_graph is None and self.knn_neighbors > 0:
+                self._rebuild_knn_graph()
+            if self.dependency_graph is not None and self.dependency_graph.size != self.index.ntotal:
+                self.dependency_graph.bind_files(self.secondary_index.by_file, self.index.ntotal)
+            
+            self._checkpoint_seq = checkpoint_seq
+            self._changes_since_checkpoint = replayed
                 
-            print(f"Faiss 인덱스 로드 완료 (벡터 수: {self.index.ntotal})")
+            print(f"Faiss 인덱스 로드 완료 (벡터 수: {self.index.ntotal}, 재적용한 변경: {replayed}개)")
             
         except Exception as e:
             print(f"인덱스 로드 실패: {str(e)}")
+            if self.read_only:
+                raise
             self._create_index()
+            self.id_to_idx = {}
+            self.idx_to_id = {}
+            self.fragment_metadata.clear()
+            self.secondary_index = SecondaryIndex()
+            self.keyword_index = BM25KeywordIndex()
+            self.knn_graph = self._new_knn_graph()
+            self.dependency_graph = None
+    
+    def _read_secondary_index(self, path: str) -> Optional[SecondaryIndex]:
+        """체크포인트의 보조 인덱스 로드 (없거나 인덱스와 맞지 않으면 None)"""
+        if os.path.exists(path):
+            try:
+                secondary_index = SecondaryIndex.load(path)
+                if secondary_index.size == self.index.ntotal:
+                    return secondary_index
+            except Exception as e:
+                print(f"보조 인덱스 로드 실패: {str(e)}")
+        return None
+    
+    def _read_keyword_index(self, index_dir: str) -> Optional[BM25KeywordIndex]:
+        """체크포인트의 키워드 역색인 로드 (없거나 인덱스와 맞지 않으면 None)"""
+        if os.path.exists(os.path.join(index_dir, 'meta.json')):
+            try:
+                keyword_index = BM25KeywordIndex.load(index_dir, mmap=self.use_mmap)
+                if keyword_index.size == self.index.ntotal:
+                    return keyword_index
+            except Exception as e:
+                print(f"키워드 역색인 로드 실패: {str(e)}")
+        return None
+    
+    def _read_semantic_index(self, path: str) -> Optional[faiss.Index]:
+        """체크포인트의 의미 임베딩 인덱스 로드 (없거나 인덱스와 맞지 않으면 None)"""
+        if os.path.exists(path):
+            try:
+                semantic_index = self._read_faiss_index(path)
+                if semantic_index.ntotal == self.index.ntotal:
+                    return semantic_index
+            except Exception as e:
+                print(f"의미 임베딩 인덱스 로드 실패: {str(e)}")
+        return None
+    
+    def _read_knn_graph(self, graph_dir: Optional[str]) -> Optional[KNNGraph]:
+        """체크포인트의 kNN 그래프 로드 (없거나 인덱스/이웃 수와 맞지 않으면 None)"""
+        if self.knn_neighbors > 0 and graph_dir and os.path.exists(os.path.join(graph_dir, 'meta.json')):
+            try:
+                knn_graph = KNNGraph.load(graph_dir, mmap=self.use_mmap)
+                if knn_graph.size == self.index.ntotal and knn_graph.n_neighbors == self.knn_neighbors:
+                    return knn_graph
+            except Exception as e:
+                print(f"kNN 그래프 로드 실패: {str(e)}")
+        return None
+    
+    def _read_dependency_graph(self, graph_dir: Optional[str]) -> Optional[DependencyGraph]:
+        """체크포인트의 의존성 그래프 로드 (없으면 None, 파편 매핑은 재적용 후 맞춰짐)"""
+        if graph_dir and os.path.exists(os.path.join(graph_dir, 'meta.json')):
+            try:
+                return DependencyGraph.load(graph_dir, mmap=self.use_mmap)
+            except Exception as e:
+                print(f"의존성 그래프 로드 실패: {str(e)}")
+        return None
+    
+    def _rebuild_secondary_index(self):
+        """메타데이터로부터 보조 인덱스 재구성"""
+        self.secondary_index = SecondaryIndex.build(self.fragment_metadata.iter_rows(), self.index.ntotal)
+        print(f"보조 인덱스 재구성 완료 (파편 수: {self.secondary_index.live_count})")
+    
+    def _rebuild_keyword_index(self):
+        """전체 내용으로부터 키워드 역색인 재구성"""
+        self.keyword_index = BM25KeywordIndex()
+        for idx, fragment_type, name, content in self.fragment_metadata.iter_documents():
+            self.keyword_index.add(idx, f"{name}\n{content}", self._keyword_boost(fragment_type))
+        self.keyword_index.size = self.index.ntotal
+        print(f"키워드 역색인 재구성 완료 (문서 수: {self.keyword_index.n_docs})")
+    
+    def _new_knn_graph(self) -> Optional[KNNGraph]:
+        """빈 kNN 그래프 (knn_neighbors가 0이면 None)"""
+        return KNNGraph(self.knn_neighbors) if self.knn_neighbors > 0 else None
+    
+    def _rebuild_knn_graph(self):
+        """Faiss 인덱스로부터 kNN 그래프 재구성 (삭제되지 않은 모든 파편의 이웃 계산)"""
+        self.knn_graph = self._new_knn_graph()
+        self.knn_graph.reserve(self.index.ntotal)
+        self._compute_knn_rows(np.flatnonzero(self.secondary_index.live[:self.index.ntotal]))
+        print(f"kNN 그래프 재구성 완료 (파편 수: {self.secondary_index.live_count}, 이웃 수: {self.knn_neighbors})")
+    
+    def _compute_knn_rows(self, rows: np.ndarray):
+        """
+        주어진 faiss_idx 행의 이웃을 Faiss 검색으로 다시 계산 (삭제된 파편 제외)
+        
+        Args:
+            rows: 다시 계산할 faiss_idx 배열
+        """
+        if len(rows) == 0:
+            return
+        bitmap, _ = self._selection_bitmap(None)
+        is_l2 = self.index.metric_type == faiss.METRIC_L2
+        for start in range(0, len(rows), KNN_SEARCH_BATCH):
+            batch = np.asarray(rows[start:start + KNN_SEARCH_BATCH], dtype='int64')
+            vectors = self.index.reconstruct_batch(batch)
+            distances, indices = self._index_search(vectors, self.knn_neighbors + 1, bitmap)
+            # L2 거리는 클수록 유사하도록 부호 반전
+            self.knn_graph.set_rows(batch, indices, -distances if is_l2 else distances)
+    
+    def _update_knn_graph(self, added: List[int], removed: List[int]):
+        """
+        커밋된 추가/삭제를 kNN 그래프에 증분 반영
+        
+        새 파편은 이웃을 계산하고, 새 파편이 상위 M개 안에 드는 기존 행에는 새 파편을 삽입하며,
+        삭제된 파편을 이웃으로 가진 행은 다시 계산한다 (전체 재구성과 같은 결과).
+        
+        Args:
+            added: 추가된 faiss_idx 목록
+            removed: 삭제된 faiss_idx 목록
+        """
+        graph = self.knn_graph
+        if graph is None:
+            return
+        
+        before = graph.size
+        graph.reserve(self.index.ntotal)
+        graph.clear_rows(removed)
+        
+        live = self.secondary_index.live
+        new_rows = np.array([idx for idx in added if idx >= before and live[idx]], dtype=np.int64)
+        stale_rows = graph.rows_referencing(removed)
+        stale_rows = stale_rows[live[stale_rows]] if len(stale_rows) else stale_rows
+        
+        self._compute_knn_rows(np.union1d(new_rows, stale_rows))
+        self._insert_new_neighbors(new_rows, before, skip_rows=stale_rows)
+    
+    def _insert_new_neighbors(self, new_rows: np.ndarray, before: int, skip_rows: np.ndarray):
+        """
+        기존 행 중 새 파편이 상위 M개 안에 드는 행에 새 파편을 이웃으로 삽입
+        
+        기존 행 × 새 파편 유사도만 계산하므로 비용은 (기존 파편 수 × 새 파편 수)에 비례한다.
+        
+        Args:
+            new_rows: 새로 추가된 faiss_idx 배열
+            before: 기존 행의 faiss_idx 상한
+            skip_rows: 이미 다시 계산한 행 (새 파편 포함)
+        """
+        if len(new_rows) == 0 or before == 0:
+            return
+        
+        graph = self.knn_graph
+        is_l2 = self.index.metric_type == faiss.METRIC_L2
+        new_vectors = self.index.reconstruct_batch(new_rows.astype('int64'))
+        new_norms = (new_vectors ** 2).sum(axis=1)
+        
+        old_rows = np.setdiff1d(np.flatnonzero(self.secondary_index.live[:before]), skip_rows)
+        for start in range(0, len(old_rows), KNN_SEARCH_BATCH):
+            batch = old_rows[start:start + KNN_SEARCH_BATCH]
+            vectors = self.index.reconstruct_batch(batch.astype('int64'))
+            similarities = vectors @ new_vectors.T
+            if is_l2:
+                similarities = 2 * similarities - (vectors ** 2).sum(axis=1, keepdims=True) - new_norms
+            
+            # 행이 가득 찼으면 최하위 이웃보다 유사한 경우만 삽입 대상
+            worst = np.where(graph.neighbors[batch, -1] == -1, -np.inf, graph.scores[batch, -1])
+            for i, j in zip(*np.nonzero(similarities > worst[:, None])):
+                graph.insert(int(batch[i]), int(new_rows[j]), float(similarities[i, j]))
+    
+    def _rebuild_semantic_index(self):
+        """메타데이터로부터 의미 임베딩 인덱스 재구성 (색인 시점처럼 일괄 인코딩)"""
+        self.semantic_index = None
+        
+        # 삭제된 파편 자리는 0 벡터로 채워 faiss_idx 정렬 유지
+        texts = [''] * self.index.ntotal
+        for idx, _, metadata in self.fragment_metadata.iter_rows():
+            texts[idx] = self._semantic_text(metadata)
+        
+        vectors = self._get_semantic_encoder().encode(texts)
+        self._add_semantic_vectors(vectors)
+        print(f"의미 임베딩 인덱스 재구성 완료 (벡터 수: {self.semantic_index.ntotal})")
+    
+    def _read_faiss_index(self, path: str) -> faiss.Index:
+        """Faiss 인덱스 읽기 (use_mmap이면 읽기 전용 메모리 맵)"""
+        if self.use_mmap:
+            return faiss.read_index(path, FAISS_MMAP_FLAGS)
+        return faiss.read_index(path)
+    
+    @staticmethod
+    def _write_faiss_index(index: faiss.Index, path: str):
+        """
+        Faiss 인덱스를 임시 파일에 쓴 뒤 교체
+        
+        기존 파일을 그대로 덮어쓰면 이 파일을 mmap 중인 다른 워커가 잘린 페이지를 읽게 되므로
+        새 inode로 교체하여 기존 매핑은 이전 내용을 계속 보도록 한다.
+        """
+        tmp_path = f"{path}.tmp"
+        faiss.write_index(index, tmp_path)
+        os.replace(tmp_path, path)
+    
+    def _ensure_writable(self):
+        """메모리 맵으로 로드한 Faiss 인덱스를 수정 가능한 힙 복사본으로 전환"""
+        if not self._mapped:
+            return
+        
+        # 메모리 맵 인덱스에 add하면 Faiss가 프로세스를 중단시키므로 직렬화/역직렬화로 복사
+        self.index = faiss.deserialize_index(faiss.serialize_index(self.index))
+        if self.semantic_index is not None:
+            self.semantic_index = faiss.deserialize_index(faiss.serialize_index(self.semantic_index))
+        self._mapped = False
+    
+    @staticmethod
+    def _keyword_boost(fragment_type: str) -> float:
+        """키워드 점수의 파편 타입별 가중치"""
+        return KEYWORD_TYPE_WEIGHTS.get(fragment_type, KEYWORD_DEFAULT_WEIGHT)
     
-    def _save_index(self):
-        """인덱스 및 메타데이터 저장"""
+    def checkpoint(self, compact: Optional[bool] = None) -> Optional[str]:
+        """
+        현재 인덱스를 새 체크포인트 디렉토리에 기록하고 CURRENT를 원자적으로 교체
+        
+        모든 파일을 임시 디렉토리에 쓴 뒤 디렉토리 이름 변경 -> CURRENT 교체 순서로 반영하므로
+        도중에 중단되어도 이전 체크포인트 + 변경 로그로 복구된다. 교체 후 반영된 변경 로그와
+        오래된 체크포인트를 정리한다.
+        
+        삭제된 파편의 Faiss 행이 많으면(compact_live_ratio 참고) 삭제된 행을 뺀 압축 인덱스를 기록하고,
+        CURRENT 교체 후 메타데이터 DB의 faiss_idx를 재배치한다. 재배치 전에 중단되면
+        다음 로드 시 압축 체크포인트의 ID 매핑으로 재배치를 마저 수행한다.
+        
+        Args:
+            compact: True면 항상 압축, False면 압축 안 함, None이면 살아 있는 파편 비율로 결정
+        
+        Returns:
+            Optional[str]: 저장된 체크포인트 디렉토리 경로 (실패 시 None)
+        """
+        self._check_writable()
+        if self._renumber_pending and not self._finish_renumber():
+            print("체크포인트 저장 실패: 메타데이터 재배치가 끝나지 않았습니다.")
+            return None
+        
+        if compact is None:
+            compact = self._should_compact()
+        # 커밋 대기 중인 변경은 기존 faiss_idx를 기준으로 하므로 압축하지 않음
+        compact = compact and not self._pending
+        previous = self._install_components(self._compacted_components()) if compact else None
+        published = False
         try:
+            seq = self.fragment_metadata.last_change_seq()
+            name = f"{seq:012d}-{int(time.time() * 1000)}"
+            tmp_path = os.path.join(self.checkpoint_dir, f"{name}.tmp")
+            paths = self._checkpoint_paths(tmp_path)
+            os.makedirs(tmp_path, exist_ok=True)
+            
             # Faiss 인덱스 저장
-            faiss.write_index(self.index, self.index_path)
+            self._write_faiss_index(self.index, paths['index'])
+            if self.semantic_index is not None:
+                self._write_faiss_index(self.semantic_index, paths['semantic'])
             
             # ID 매핑 저장
-            with open(self.id_map_path, 'wb') as f:
+            with open(paths['id_map'], 'wb') as f:
                 pickle.dump({
                     'id_to_idx': self.id_to_idx,
                     'idx_to_id': self.idx_to_id
                 }, f)
             
-            # 메타데이터 별도 저장
-            self._save_metadata()
+            # 보조 인덱스 및 키워드 역색인 저장
+            self.secondary_index.save(paths['secondary'])
+            self.keyword_index.save(paths['keyword'])
+            if self.knn_graph is not None:
+                self.knn_graph.save(paths['knn'])
+            if self.dependency_graph is not None:
+                self.dependency_graph.save(paths['deps'])
+            
+            with open(paths['manifest'], 'w', encoding='utf-8') as f:
+                json.dump({
+                    'seq': seq,
+                    'ntotal': self.index.ntotal,
+                    'compacted': compact,
+                    'created_at': time.time()
+                }, f)
+            
+            # 체크포인트 반영 (디렉토리 이름 변경 후 CURRENT 교체)
+            os.rename(tmp_path, os.path.join(self.checkpoint_dir, name))
+            self._atomic_write_text(self.current_path, name)
+            published = True
+            
+            # 압축했으면 메타데이터 DB의 faiss_idx를 새 인덱스에 맞춤
+            if compact:
+                self._renumber_pending = True
+                self._finish_renumber()
+            
+            # 반영된 변경 로그 및 오래된 체크포인트 정리
+            self.fragment_metadata.truncate_changes(seq)
+            self._checkpoint_seq = seq
+            self._changes_since_checkpoint = 0
+            self._remove_old_checkpoints(name)
                 
-            print(f"Faiss 인덱스 저장 완료 (벡터 수: {self.index.ntotal})")
+            print(f"체크포인트 저장 완료 (벡터 수: {self.index.ntotal}, 변경 로그: {seq}"
+                  f"{', 압축' if compact else ''})")
+            return os.path.join(self.checkpoint_dir, name)
             
         except Exception as e:
-            print(f"인덱스 저장 실패: {str(e)}")
+            # CURRENT 교체 전이면 압축 전 인덱스로 되돌림 (디스크와 메모리의 faiss_idx 일치 유지)
+            if previous is not None and not published:
+                self._install_components(previous)
+            print(f"체크포인트 저장 실패: {str(e)}")
+            return None
     
-    def _save_metadata(self):
-        """메타데이터만 별도 저장 (JSON 형식)"""
+    def compact(self) -> Optional[str]:
+        """
+        삭제된 파편의 행을 모든 인덱스에서 제거하고 압축 체크포인트 기록
+        
+        삭제는 faiss_idx 재배치를 피하기 위해 행을 남겨 두므로, 교체가 잦으면 Faiss / 의미 임베딩 /
+        kNN 그래프 / 키워드 배열이 계속 커진다. 체크포인트가 compact_live_ratio 기준으로 자동 압축하며,
+        이 메서드는 기준과 관계없이 바로 압축한다.
+        
+        Returns:
+            Optional[str]: 저장된 체크포인트 디렉토리 경로 (실패 시 None)
+        """
+        self.commit()
+        return self.checkpoint(compact=True)
+    
+    def _should_compact(self) -> bool:
+        """살아 있는 파편 / Faiss 행 비율이 compact_live_ratio 미만인지 여부"""
+        ntotal = self.index.ntotal
+        if self.compact_live_ratio <= 0 or ntotal == 0:
+            return False
+        return len(self.id_to_idx) / ntotal < self.compact_live_ratio
+    
+    def _compacted_components(self) -> Dict[str, Any]:
+        """
+        삭제된 행을 뺀 새 인덱스 구성 요소 (순서를 보존하여 faiss_idx를 0부터 재배치)
+        
+        기존 구성 요소는 수정하지 않으므로 체크포인트 기록이 실패하면 그대로 되돌릴 수 있다.
+        
+        Returns:
+            Dict[str, Any]: _install_components에 넘길 속성 이름 -> 값
+        """
+        live_rows = np.array(sorted(self.idx_to_id), dtype='int64')
+        mapping = np.full(self.index.ntotal, -1, dtype='int64')
+        mapping[live_rows] = np.arange(len(live_rows))
+        
+        def compact_index(index: faiss.Index) -> faiss.Index:
+            compacted = faiss.IndexFlat(index.d, index.metric_type)
+            for start in range(0, len(live_rows), COMPACT_BATCH):
+                compacted.add(index.reconstruct_batch(live_rows[start:start + COMPACT_BATCH]))
+            return compacted
+        
+        idx_to_id = {int(mapping[idx]): fragment_id for idx, fragment_id in self.idx_to_id.items()}
+        secondary_index = SecondaryIndex.build(
+            ((int(mapping[idx]), fragment_id, metadata)
+             for idx, fragment_id, metadata in self.fragment_metadata.iter_rows()),
+            len(live_rows)
+        )
+        dependency_graph = None
+        if self.dependency_graph is not None:
+            dependency_graph = copy.copy(self.dependency_graph)
+            dependency_graph.bind_files(secondary_index.by_file, len(live_rows))
+        
+        return {
+            'index': compact_index(self.index),
+            'semantic_index': compact_index(self.semantic_index) if self.semantic_index is not None else None,
+            '_mapped': False,
+            'id_to_idx': {fragment_id: idx for idx, fragment_id in idx_to_id.items()},
+            'idx_to_id': idx_to_id,
+            'secondary_index': secondary_index,
+            'keyword_index': self.keyword_index.compacted(live_rows, mapping),
+            'knn_graph': self.knn_graph.compacted(live_rows, mapping) if self.knn_graph is not None else None,
+            'dependency_graph': dependency_graph
+        }
+    
+    def _install_components(self, components: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        인덱스 구성 요소 교체
+        
+        Returns:
+            Dict[str, Any]: 교체 전 구성 요소 (되돌리기용)
+        """
+        previous = {name: getattr(self, name) for name in components}
+        for name, value in components.items():
+            setattr(self, name, value)
+        self.generation += 1
+        return previous
+    
+    def _finish_renumber(self) -> bool:
+        """
+        압축된 체크포인트에 맞춰 메타데이터 DB의 faiss_idx 재배치 (실패하면 다음 커밋/체크포인트에서 재시도)
+        
+        Returns:
+            bool: 재배치 완료 여부
+        """
         try:
-            with open(self.metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(self.fragment_metadata, f, ensure_ascii=False, indent=2)
+            self.fragment_metadata.renumber(self.id_to_idx)
         except Exception as e:
-            print(f"메타데이터 저장 실패: {str(e)}")
+            print(f"메타데이터 재배치 실패: {str(e)}")
+            return False
+        self._renumber_pending = False
+        return True
+    
+    def _check_writable(self):
+        """읽기 전용(스냅샷) 저장소에 대한 쓰기 방지"""
+        if self.read_only:
+            raise RuntimeError("읽기 전용 스냅샷 저장소는 수정할 수 없습니다.")
+    
+    @staticmethod
+    def _atomic_write_text(path: str, text: str):
+        """텍스트 파일을 임시 파일에 쓰고 fsync 후 교체"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    
+    def _remove_old_checkpoints(self, current_name: str):
+        """현재 체크포인트와 직전 체크포인트만 남기고 정리 (중단된 임시 디렉토리 포함)"""
+        names = sorted(
+            name for name in os.listdir(self.checkpoint_dir)
+            if os.path.isdir(os.path.join(self.checkpoint_dir, name))
+        )
+        complete = [name for name in names if not name.endswith('.tmp')]
+        keep = set(complete[-KEEP_CHECKPOINTS:]) | {current_name}
+        for name in names:
+            if name not in keep:
+                shutil.rmtree(os.path.join(self.checkpoint_dir, name), ignore_errors=True)
+    
+    def _replay_changes(self, after_seq: int, update_semantic: bool = True) -> int:
+        """
+        체크포인트 이후 변경 로그를 메모리 인덱스에 재적용
+        
+        Args:
+            after_seq: 체크포인트에 반영된 마지막 변경 로그 번호
+            update_semantic: 의미 임베딩 인덱스에도 적용할지 여부 (재구성 예정이면 False)
+            
+        Returns:
+            int: 재적용한 변경 수
+        """
+        records = [
+            (op, idx, fragment_id, metadata,
+             None if vector is None else np.frombuffer(vector, dtype='float32'),
+             None if semantic_vector is None else np.frombuffer(semantic_vector, dtype='float32'))
+            for _, op, idx, fragment_id, metadata, vector, semantic_vector
+            in self.fragment_metadata.iter_changes(after_seq)
+        ]
+        if records:
+            self._apply_changes(records, update_semantic=update_semantic)
+        return len(records)
+    
+    def _apply_changes(self, records: List[Tuple], update_semantic: bool = True):
+        """
+        커밋된 변경을 메모리 인덱스(Faiss, ID 매핑, 보조 인덱스, 키워드 역색인)에 적용
+        
+        Args:
+            records: (op, faiss_idx, fragment_id, metadata, vector, semantic_vector) 목록 (커밋 순서)
+            update_semantic: 의미 임베딩 인덱스에도 적용할지 여부
+        """
+        # 추가된 벡터는 faiss_idx 순서대로 한 번에 추가
+        adds = [record for record in records if record[0] == 'add' and record[1] >= self.index.ntotal]
+        if adds:
+            self._ensure_writable()
+            self.index.add(np.array([record[4] for record in adds], dtype='float32'))
+            if update_semantic:
+                self._add_semantic_vectors(np.array([record[5] for record in adds]))
+        
+        added, removed = [], []
+        for op, idx, fragment_id, metadata, _, _ in records:
+            if op == 'add':
+                added.append(idx)
+                self.id_to_idx[fragment_id] = idx
+                self.idx_to_id[idx] = fragment_id
+                self.secondary_index.add(idx, metadata)
+                if idx >= self.keyword_index.size:
+                    self.keyword_index.add(
+                        idx,
+                        f"{metadata.get('name', '')}\n{metadata.get('full_content', '')}",
+                        self._keyword_boost(metadata.get('type', ''))
+                    )
+            else:
+                self.id_to_idx.pop(fragment_id, None)
+                self.idx_to_id.pop(idx, None)
+                self.secondary_index.remove(idx, metadata)
+                self.keyword_index.remove(idx)
+                removed.append(idx)
+        
+        self._update_knn_graph(added, removed)
+        
+        if self.dependency_graph is not None:
+            self.dependency_graph.unbind(removed)
+            for op, idx, _, metadata, _, _ in records:
+                if op == 'add':
+                    self.dependency_graph.bind(idx, metadata.get('file_path'))
+        
+        self.generation += 1
+    
+    @contextmanager
+    def transaction(self):
+        """
+        여러 add_fragments / remove_fragments 호출을 하나의 커밋으로 묶는 트랜잭션
+        
+        블록이 정상 종료되면 commit(), 예외가 발생하면 rollback()한다.
+        중첩된 transaction()은 바깥 트랜잭션에 합쳐진다.
+        
+        예:
+            with vector_store.transaction():
+                vector_store.remove_fragments(old_ids)
+                vector_store.add_fragments(fragments, embeddings)
+        """
+        if self._in_transaction:
+            yield self
+            return
+        
+        self._in_transaction = True
+        try:
+            yield self
+        except Exception:
+            self.rollback()
+            raise
+        else:
+            self.commit()
+        finally:
+            self._in_transaction = False
+    
+    def commit(self):
+        """
+        대기 중인 추가/삭제 커밋
+        
+        메타데이터와 변경 로그(벡터 포함)를 SQLite 단일 트랜잭션으로 기록한 뒤 메모리 인덱스에 적용한다.
+        인덱스 파일은 변경 로그가 checkpoint_interval 이상 쌓였을 때만 체크포인트로 기록하므로
+        작은 추가의 I/O는 변경량에 비례한다.
+        """
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        self._check_writable()
+        if self._renumber_pending and not self._finish_renumber():
+            self._pending = pending
+            raise RuntimeError("압축 후 메타데이터 재배치가 끝나지 않아 커밋할 수 없습니다.")
+        
+        # 삭제할 기존 파편의 메타데이터 (보조 인덱스 갱신 및 로그 재적용용)
+        removed_metadata = self.fragment_metadata.get_many(
+            [fragment_id for op, fragment_id, *_ in pending if op == 'remove' and fragment_id in self.id_to_idx]
+        )
+        
+        # faiss_idx 할당 (추가 순서대로 ntotal부터)
+        records = []
+        next_idx = self.index.ntotal
+        added = {}  # 이번 커밋에서 추가된 fragment_id -> (faiss_idx, metadata)
+        for op, fragment_id, metadata, vector, semantic_vector in pending:
+            if op == 'add':
+                added[fragment_id] = (next_idx, metadata)
+                records.append(('add', next_idx, fragment_id, metadata, vector, semantic_vector))
+                next_idx += 1
+            else:
+                if fragment_id in added:
+                    idx, metadata = added.pop(fragment_id)
+                    metadata = {key: value for key, value in metadata.items() if key != 'full_content'}
+                else:
+                    idx, metadata = self.id_to_idx[fragment_id], removed_metadata.get(fragment_id, {})
+                records.append(('remove', idx, fragment_id, metadata, None, None))
+        
+        # 메타데이터 + 변경 로그 기록 (이 트랜잭션이 커밋되어야 변경이 유효)
+        self.fragment_metadata.commit_changes([
+            (op, idx, fragment_id, metadata,
+             None if vector is None else np.asarray(vector, dtype='float32').tobytes(),
+             None if semantic_vector is None else np.asarray(semantic_vector, dtype='float32').tobytes())
+            for op, idx, fragment_id, metadata, vector, semantic_vector in records
+        ])
+        
+        # 메모리 인덱스 적용
+        self._apply_changes(records)
+        self._changes_since_checkpoint += len(records)
+        
+        n_added = sum(1 for record in records if record[0] == 'add')
+        print(f"변경 커밋 완료 (추가 {n_added}개, 삭제 {len(records) - n_added}개, 현재 총 {len(self.id_to_idx)}개)")
+        
+        if self._changes_since_checkpoint >= self.checkpoint_interval:
+            self.checkpoint()
+    
+    def rollback(self):
+        """커밋되지 않은 추가/삭제 취소"""
+        self._pending = []
+    
+    def _staged_ids(self) -> Tuple[Set[str], Set[str]]:
+        """커밋 대기 중인 변경을 반영한 (추가될 ID, 삭제될 기존 ID) 집합"""
+        added, removed = set(), set()
+        for op, fragment_id, *_ in self._pending:
+            if op == 'add':
+                added.add(fragment_id)
+            elif fragment_id in added:
+                added.discard(fragment_id)
+            else:
+                removed.add(fragment_id)
+        return added, removed
     
-    def add_fragments(self, fragments: List[Dict[str, Any]], embeddings: Dict[str, np.ndarray]):
+    def add_fragments(self, fragments: List[Dict[str, Any]], embeddings: Dict[str, np.ndarray],
+                      semantic_embeddings: Optional[Dict[str, np.ndarray]] = None):
         """
         코드 파편 및 임베딩을 인덱스에 추가
         
+        transaction() 안에서 호출하면 커밋 시점에, 그 외에는 즉시 커밋된다.
+        
         Args:
             fragments: 코드 파편 목록
             embeddings: fragment_id를 키로 하는 임베딩 딕셔너리
+            semantic_embeddings: fragment_id를 키로 하는 의미 임베딩 딕셔너리
+                                 (없으면 SemanticEncoder로 일괄 생성)
         """
+        self._check_writable()
+        
         # 추가할 벡터와 ID 준비
         vectors = []
         fragment_ids = []
+        new_metadata = []
+        added, removed = self._staged_ids()
         
         for fragment in fragments:
             fragment_id = fragment['id']
             
             # 이미 있는 fragment_id는 건너뛰기
-            if fragment_id in self.id_to_idx:
+            if fragment_id in added or (fragment_id in self.id_to_idx and fragment_id not in removed):
                 continue
                 
             # 임베딩이 없는 경우 건너뛰기
@@ -166,32 +975,58 @@ class FaissVectorStore:
                 
             vectors.append(vector)
             fragment_ids.append(fragment_id)
+            added.add(fragment_id)
             
-            # 메타데이터 저장
-            self.fragment_metadata[fragment_id] = self._extract_metadata(fragment)
+            # 메타데이터 추출
+            new_metadata.append(self._extract_metadata(fragment))
         
         if not vectors:
             print("추가할 새 벡터가 없습니다.")
             return
-            
-        # Faiss 인덱스에 벡터 추가
-        vectors_array = np.array(vectors).astype('float32')
-        start_idx = self.index.ntotal
         
-        self.index.add(vectors_array)
+        # 의미 임베딩을 색인 시점에 함께 저장 (요청 처리 중에는 파편 인코딩 없음)
+        if semantic_embeddings is not None and all(fid in semantic_embeddings for fid in fragment_ids):
+            semantic_vectors = np.array([semantic_embeddings[fid] for fid in fragment_ids])
+        else:
+            semantic_vectors = self._get_semantic_encoder().encode(
+                [self._semantic_text(metadata) for metadata in new_metadata]
+            )
         
-        # ID 매핑 업데이트
-        for i, fragment_id in enumerate(fragment_ids):
-            idx = start_idx + i
-            self.id_to_idx[fragment_id] = idx
-            self.idx_to_id[idx] = fragment_id
-            
-        print(f"{len(vectors)}개 벡터 추가 완료 (현재 총 {self.index.ntotal}개)")
+        for fragment_id, metadata, vector, semantic_vector in zip(fragment_ids, new_metadata, vectors, semantic_vectors):
+            self._pending.append(('add', fragment_id, metadata, vector, semantic_vector))
         
-        # 인덱스 저장
-        self._save_index()
+        if not self._in_transaction:
+            self.commit()
     
-    def _extract_metadata(self, fragment: Dict[str, Any]) -> Dict[str, Any]:
+    def remove_fragments(self, fragment_ids: List[str]):
+        """
+        코드 파편을 인덱스에서 삭제
+        
+        Faiss 벡터는 그대로 두고(faiss_idx 재배치 방지) ID 매핑, 메타데이터,
+        보조 인덱스에서만 제거하여 검색 대상에서 제외한다. 남은 행은 체크포인트의 압축
+        (compact_live_ratio, compact())에서 제거된다.
+        transaction() 안에서 호출하면 커밋 시점에, 그 외에는 즉시 커밋된다.
+        
+        Args:
+            fragment_ids: 삭제할 파편 ID 목록
+        """
+        self._check_writable()
+        added, removed = self._staged_ids()
+        staged = 0
+        for fragment_id in dict.fromkeys(fragment_ids):
+            if fragment_id in added or (fragment_id in self.id_to_idx and fragment_id not in removed):
+                self._pending.append(('remove', fragment_id, None, None, None))
+                staged += 1
+        
+        if not staged:
+            print("삭제할 파편이 없습니다.")
+            return
+        
+        if not self._in_transaction:
+            self.commit()
+    
+    @staticmethod
+    def _extract_metadata(fragment: Dict[str, Any]) -> Dict[str, Any]:
         """
         검색에 필요한 메타데이터 추출 (저장 크기 최적화)
         
@@ -221,80 +1056,47 @@ class FaissVectorStore:
         return metadata
     
     # 키워드 기반 검색
-    def _keyword_search(self, query: str, k: int = 20) -> List[Dict[str, Any]]:
+    def _keyword_search(self, query: str, k: int = 20,
+                        filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
-        키워드 기반 검색 구현
+        키워드 기반 검색 구현 (전체 코드 내용에 대한 BM25 역색인)
         
         Args:
             query: 검색 쿼리 문자열
             k: 반환할 결과 수
+            filters: 필터링 조건
             
         Returns:
             List[Dict]: 키워드 검색 결과
         """
-        # 쿼리 단어 분리
-        query_terms = query.lower().split()
-        
-        # 결과 저장용 딕셔너리
-        scores = {}
-        
-        for fragment_id, metadata in self.fragment_metadata.items():
-            content = metadata.get('content_preview', '').lower()
-            fragment_type = metadata.get('type', '')
-            
-            # 기본 점수
-            score = 0
-            
-            # 쿼리 텀별 매칭 확인
-            for term in query_terms:
-                # 정확한 단어 매칭에 가중치 부여
-                if term in content.split():
-                    score += 3.0
-                # 부분 문자열 매칭
-                elif term in content:
-                    score += 1.0
-            
-            # 타입별 가중치 부여 (균형있게 조정)
-            if fragment_type == 'component':
-                score *= 1.3  # 컴포넌트 가중치 낮춤
-            elif fragment_type == 'javascript':
-                score *= 1.2  # JavaScript 파일 적절한 가중치
-            elif fragment_type == 'script':
-                score *= 1.2  # Vue 스크립트 섹션도 동일 가중치
-            elif fragment_type == 'template':
-                score *= 1.1  # 템플릿 가중치 조정
-            elif fragment_type == 'css':
-                score *= 0.9  # CSS 파일 낮은 가중치
-            elif fragment_type == 'style':
-                score *= 0.9  # Vue 스타일 섹션 낮은 가중치
-            else:
-                score *= 0.8  # 기타 파일 가장 낮은 가중치
-            
-            if score > 0:
-                scores[fragment_id] = score
-        
-        # 점수 기준 상위 결과 정렬
-        sorted_results = sorted(
-            [(fragment_id, score) for fragment_id, score in scores.items()],
-            key=lambda x: x[1],
-            reverse=True
-        )[:k]
-        
-        # 결과 포맷팅
-        results = []
-        for fragment_id, score in sorted_results:
-            metadata = self.fragment_metadata.get(fragment_id, {})
-            results.append({
-                'id': fragment_id,
-                'score': float(score),
-                'type': metadata.get('type', ''),
-                'name': metadata.get('name', ''),
-                'file_path': metadata.get('file_path', ''),
-                'file_name': metadata.get('file_name', ''),
-                'content_preview': metadata.get('content_preview', '')
-            })
+        return self._keyword_search_batch([query], k=k, filters=filters)[0]
+
+    def _keyword_search_batch(self, queries: List[str], k: int = 20,
+                              filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        여러 쿼리의 키워드 검색 (필터 비트맵은 한 번만 계산)
         
-        return results
+        Args:
+            queries: 검색 쿼리 문자열 목록
+            k: 쿼리별 반환할 결과 수
+            filters: 필터링 조건 (모든 쿼리 공통)
+            
+        Returns:
+            List[List[Dict]]: 쿼리별 키워드 검색 결과
+        """
+        bitmap, residual_filters = self._selection_bitmap(filters)
+        
+        # 비트맵으로 처리하지 못한 필터가 있으면 더 많은 후보 검색
+        search_k = k * 5 if residual_filters else k
+        hits_per_query = [
+            [
+                (self.idx_to_id[idx], score)
+                for idx, score in self.keyword_index.search(query, k=search_k, bitmap=bitmap)
+                if idx in self.idx_to_id
+            ]
+            for query in queries
+        ]
+        return self._format_hits_batch(hits_per_query, k, residual_filters)
 
     # 벡터 검색을 수행하는 내부 메서드
     def _vector_search(self, query_vector: np.ndarray, k: int = 5, 
@@ -302,62 +1104,136 @@ class FaissVectorStore:
         """
         벡터 유사도 기반 검색 수행
         """
+        return self._vector_search_batch(np.asarray(query_vector).reshape(1, -1), k=k, filters=filters)[0]
+
+    def _vector_search_batch(self, query_vectors: np.ndarray, k: int = 5,
+                             filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        여러 쿼리 벡터의 유사도 검색 (한 번의 Faiss 행렬 검색)
+        
+        Args:
+            query_vectors: (쿼리 수, 차원) 쿼리 벡터 배열
+            k: 쿼리별 반환할 결과 수
+            filters: 필터링 조건 (모든 쿼리 공통)
+            
+        Returns:
+            List[List[Dict]]: 쿼리별 벡터 검색 결과
+        """
+        # 벡터 형식 변환
+        query_vectors = np.array(query_vectors, dtype='float32').reshape(-1, self.dimension)
+        
         # 코사인 유사도를 위한 정규화 (필요 시)
         if self.index_type == 'Cosine':
-            query_vector = query_vector / np.linalg.norm(query_vector)
+            faiss.normalize_L2(query_vectors)
+        
+        # 보조 인덱스로 처리 가능한 필터는 비트맵으로, 나머지는 메타데이터로 확인
+        bitmap, residual_filters = self._selection_bitmap(filters)
+        
+        # 비트맵으로 처리하지 못한 필터가 있는 경우에만 더 많은 결과를 가져와서 후처리
+        search_k = k * 5 if residual_filters else k
             
-        # 벡터 형식 변환
-        query_vector = np.array([query_vector]).astype('float32')
+        # 검색 실행 (필터는 Faiss 내부에서 적용)
+        distances, indices = self._index_search(query_vectors, search_k, bitmap)
+        
+        # 유효한 후보만 남기기
+        # IP 유사도는 높을수록 좋고, L2 거리는 낮을수록 좋음
+        # 따라서 거리를 점수로 변환 (L2 거리인 경우 음수로 변환)
+        sign = -1.0 if self.index_type == 'L2' else 1.0
+        hits_per_query = [
+            [
+                (self.idx_to_id[idx], sign * float(distance))
+                for distance, idx in zip(row_distances, row_indices)
+                if idx != -1 and idx in self.idx_to_id
+            ]
+            for row_distances, row_indices in zip(distances, indices)
+        ]
+        return self._format_hits_batch(hits_per_query, k, residual_filters)
+
+    def _selection_bitmap(self, filters: Optional[Dict[str, Any]]) -> Tuple[Optional[np.ndarray], Dict[str, Any]]:
+        """
+        필터를 검색 대상 faiss_idx 비트맵으로 변환 (삭제된 파편 제외 포함)
         
-        # 필터링이 필요한 경우 더 많은 결과를 가져와서 후처리
-        search_k = k
-        if filters:
-            search_k = min(k * 5, self.index.ntotal)  # 필터링을 위해 더 많은 후보 검색
+        Args:
+            filters: 필터 조건
             
-        # 검색 실행
-        distances, indices = self.index.search(query_vector, search_k)
+        Returns:
+            Tuple: (검색 대상 비트맵 또는 None(전체), 비트맵으로 처리하지 못한 나머지 필터)
+        """
+        bitmap, residual_filters = self.secondary_index.match(filters)
         
-        # 결과 변환 및 필터링
-        results = []
-        for i, idx in enumerate(indices[0]):
-            # 유효한 인덱스가 아닌 경우 건너뛰기
-            if idx == -1 or idx not in self.idx_to_id:
-                continue
-                
-            fragment_id = self.idx_to_id[idx]
-            metadata = self.fragment_metadata.get(fragment_id, {})
+        # 필터가 없어도 삭제된 파편이 있으면 live 비트맵으로 제외
+        if bitmap is None and self.secondary_index.live_count < self.index.ntotal:
+            bitmap = self.secondary_index.live_bitmap()
             
-            # 필터 적용
-            if filters and not self._apply_filters(metadata, filters):
-                continue
-                
-            # IP 유사도는 높을수록 좋고, L2 거리는 낮을수록 좋음
-            # 따라서 거리를 점수로 변환 (L2 거리인 경우 음수로 변환)
-            score = distances[0][i]
-            if self.index_type == 'L2':
-                score = -score
-                
-            results.append({
-                'id': fragment_id,
-                'score': float(score),
-                'type': metadata.get('type', ''),
-                'name': metadata.get('name', ''),
-                'file_path': metadata.get('file_path', ''),
-                'file_name': metadata.get('file_name', ''),
-                'content_preview': metadata.get('content_preview', '')
-            })
+        return bitmap, residual_filters
+    
+    def _index_search(self, query_vectors: np.ndarray, k: int,
+                      bitmap: Optional[np.ndarray] = None,
+                      index: Optional[faiss.Index] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        비트맵 선택도에 따라 검색 방식을 고르는 Faiss 검색
+        
+        - 비트맵 없음: 일반 ANN 검색
+        - 통과 비율이 exact_scan_ratio 이하: 부분집합 벡터만 꺼내 정확 검색
+        - 그 외: IDSelectorBitmap을 SearchParameters로 전달하여 Faiss 내부에서 필터링
+        
+        Args:
+            query_vectors: (쿼리 수, 차원) float32 배열 (정규화 완료)
+            k: 반환할 결과 수
+            bitmap: 검색 대상 faiss_idx 비트맵
+            index: 검색할 Faiss 인덱스 (기본값: 코드 임베딩 인덱스)
             
-            # 충분한 결과를 얻었으면 종료
-            if len(results) >= k:
-                break
-                
-        return results
+        Returns:
+            Tuple: (distances, indices) - faiss.Index.search와 동일한 형식 (-1은 결과 없음)
+        """
+        index = self.index if index is None else index
+        is_l2 = index.metric_type == faiss.METRIC_L2
+        ntotal = index.ntotal
+        if bitmap is None:
+            return index.search(query_vectors, min(k, ntotal))
+        
+        selected = np.flatnonzero(bitmap[:ntotal])
+        n_queries = len(query_vectors)
+        if len(selected) == 0:
+            return (np.zeros((n_queries, 0), dtype='float32'), np.full((n_queries, 0), -1, dtype='int64'))
+        
+        k = min(k, len(selected))
+        
+        # 선택도가 낮으면 부분집합 정확 검색
+        if len(selected) <= self.exact_scan_ratio * ntotal:
+            subset = index.reconstruct_batch(selected.astype('int64'))
+            if is_l2:
+                scores = -(
+                    (query_vectors ** 2).sum(axis=1, keepdims=True)
+                    - 2 * query_vectors @ subset.T
+                    + (subset ** 2).sum(axis=1)
+                )
+            else:
+                scores = query_vectors @ subset.T
+            
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            distances = np.take_along_axis(top_scores, order, axis=1)
+            if is_l2:
+                distances = -distances
+            return distances.astype('float32'), selected[top]
+        
+        # 그 외에는 Faiss ID 선택자로 필터링 검색
+        packed = np.packbits(bitmap[:ntotal], bitorder='little')
+        selector = faiss.IDSelectorBitmap(ntotal, faiss.swig_ptr(packed))
+        params = faiss.SearchParameters(sel=selector)
+        return index.search(query_vectors, k, params=params)
 
     def _semantic_search(self, query: str, k: int = 20, 
                    filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
         의미 기반 검색 구현 (키워드 검색 보완)
         
+        파편의 의미 임베딩은 색인 시점에 별도 Faiss 인덱스에 저장되어 있으므로
+        요청 시에는 쿼리 한 건만 인코딩하고 한 번의 행렬 검색으로 상위 k개를 찾는다.
+        
         Args:
             query: 검색 쿼리 문자열
             k: 반환할 결과 수
@@ -366,202 +1242,116 @@ class FaissVectorStore:
         Returns:
             List[Dict]: 의미 기반 검색 결과
         """
-        if not hasattr(self, 'semantic_model'):
-            # 모델 초기화 (처음 호출 시에만)
-            from sentence_transformers import SentenceTransformer
-            self.semantic_model = SentenceTransformer('jhgan/ko-sroberta-multitask')
-            
-            # 캐시 디렉토리 설정
-            self.semantic_cache_dir = os.path.join(self.data_dir, 'semantic_cache')
-            os.makedirs(self.semantic_cache_dir, exist_ok=True)
-        
-        # 쿼리 임베딩 생성
-        query_embedding = self.semantic_model.encode(query)
-        
-        # 결과 저장용 딕셔너리
-        scores = {}
-        
-        # 모든 파편에 대해 의미적 유사도 계산
-        for fragment_id, metadata in self.fragment_metadata.items():
-            # 필터 적용
-            if filters and not self._apply_filters(metadata, filters):
-                continue
-            
-            content = metadata.get('content_preview', '')
-            if not content:
-                continue
-            
-            # 캐시에서 임베딩 검색 또는 새로 생성
-            content_embedding = self._get_semantic_embedding_from_cache(fragment_id)
-            if content_embedding is None:
-                content_embedding = self.semantic_model.encode(content)
-                self._save_semantic_embedding_to_cache(fragment_id, content_embedding)
-            
-            # 코사인 유사도 계산
-            similarity = self._cosine_similarity(query_embedding, content_embedding)
-            scores[fragment_id] = float(similarity)
-        
-        # 점수 기준 상위 결과 정렬
-        sorted_results = sorted(
-            [(fragment_id, score) for fragment_id, score in scores.items()],
-            key=lambda x: x[1],
-            reverse=True
-        )[:k]
-        
-        # 결과 포맷팅
-        results = []
-        for fragment_id, score in sorted_results:
-            metadata = self.fragment_metadata.get(fragment_id, {})
-            results.append({
-                'id': fragment_id,
-                'score': float(score),
-                'type': metadata.get('type', ''),
-                'name': metadata.get('name', ''),
-                'file_path': metadata.get('file_path', ''),
-                'file_name': metadata.get('file_name', ''),
-                'content_preview': metadata.get('content_preview', '')
-            })
-        
-        return results
+        return self._semantic_search_batch([query], k=k, filters=filters)[0]
 
-    def _cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
+    def _semantic_search_batch(self, queries: List[str], k: int = 20,
+                               filters: Optional[Dict[str, Any]] = None,
+                               query_embeddings: Optional[np.ndarray] = None) -> List[List[Dict[str, Any]]]:
         """
-        두 벡터 간의 코사인 유사도 계산
+        여러 쿼리의 의미 기반 검색 (한 번의 인코더 호출 + 한 번의 Faiss 행렬 검색)
         
         Args:
-            vec1: 첫 번째 벡터
-            vec2: 두 번째 벡터
+            queries: 검색 쿼리 문자열 목록
+            k: 쿼리별 반환할 결과 수
+            filters: 필터링 조건 (모든 쿼리 공통)
+            query_embeddings: 미리 계산된 쿼리 의미 임베딩 (샤드 코디네이터가 한 번만 인코딩한 경우)
             
         Returns:
-            float: 코사인 유사도 (-1에서 1 사이의 값)
+            List[List[Dict]]: 쿼리별 의미 기반 검색 결과
         """
-        # 벡터 정규화
-        vec1_normalized = vec1 / np.linalg.norm(vec1)
-        vec2_normalized = vec2 / np.linalg.norm(vec2)
-        
-        # 코사인 유사도 계산
-        similarity = np.dot(vec1_normalized, vec2_normalized)
-        
-        return similarity
+        if self.semantic_index is None or self.semantic_index.ntotal == 0:
+            return [[] for _ in queries]
+        
+        # 쿼리 임베딩 일괄 생성 (정규화됨)
+        if query_embeddings is None:
+            query_embeddings = self._get_semantic_encoder().encode(queries)
+        query_embeddings = np.asarray(query_embeddings, dtype=np.float32).reshape(len(queries), -1)
+        
+        bitmap, residual_filters = self._selection_bitmap(filters)
+        search_k = k * 5 if residual_filters else k
+        
+        distances, indices = self._index_search(query_embeddings, search_k, bitmap, index=self.semantic_index)
+        
+        hits_per_query = [
+            [
+                (self.idx_to_id[idx], float(distance))
+                for distance, idx in zip(row_distances, row_indices)
+                if idx != -1 and idx in self.idx_to_id
+            ]
+            for row_distances, row_indices in zip(distances, indices)
+        ]
+        return self._format_hits_batch(hits_per_query, k, residual_filters)
 
-    def _get_semantic_embedding_from_cache(self, fragment_id: str) -> Optional[np.ndarray]:
+    def _get_semantic_encoder(self):
         """
-        캐시에서 의미 임베딩 검색
+        의미 임베딩 인코더 반환 (없으면 처음 사용할 때 로드)
         
-        Args:
-            fragment_id: 파편 ID
-            
-        Returns:
-            Optional[np.ndarray]: 캐시된 임베딩 또는 None
+        처음 반환하기 전에 한 번 인코딩하여 모델 로드 / 첫 호출 준비 시간이
+        검색 단계 소요 시간 측정에 섞이지 않도록 한다.
         """
-        if not hasattr(self, 'semantic_cache_dir'):
-            return None
-            
-        cache_path = os.path.join(self.semantic_cache_dir, f"semantic_{fragment_id}.pkl")
-        if os.path.exists(cache_path):
-            try:
-                with open(cache_path, 'rb') as f:
-                    return pickle.load(f)
-            except Exception as e:
-                print(f"캐시 로드 오류: {str(e)}")
-                return None
-        
-        return None
+        if self.semantic_encoder is None:
+            from app.embedding.semantic_encoder import SemanticEncoder
+            self.semantic_encoder = SemanticEncoder()
+        if not self._semantic_warmed:
+            self.semantic_encoder.encode(['warmup'])
+            self._semantic_warmed = True
+        return self.semantic_encoder
+    
+    @staticmethod
+    def _semantic_text(metadata: Dict[str, Any]) -> str:
+        """의미 임베딩에 사용할 파편 텍스트 (미리보기 내용)"""
+        return metadata.get('content_preview', '')
+    
+    def _add_semantic_vectors(self, vectors: np.ndarray):
+        """의미 임베딩 인덱스에 벡터 추가 (faiss_idx와 같은 순서)"""
+        vectors = np.asarray(vectors, dtype='float32')
+        faiss.normalize_L2(vectors)
+        if self.semantic_index is None:
+            self.semantic_index = faiss.IndexFlatIP(vectors.shape[1])
+        self.semantic_index.add(vectors)
 
-    def _save_semantic_embedding_to_cache(self, fragment_id: str, embedding: np.ndarray) -> None:
+    def _format_hits(self, hits: List[Tuple[str, float]], k: int,
+                     residual_filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
-        의미 임베딩을 캐시에 저장
+        (fragment_id, 점수) 목록을 검색 결과 형식으로 변환
         
         Args:
-            fragment_id: 파편 ID
-            embedding: 임베딩 벡터
-        """
-        if not hasattr(self, 'semantic_cache_dir'):
-            return
+            hits: 점수 내림차순 (fragment_id, 점수) 목록
+            k: 반환할 결과 수
+            residual_filters: 비트맵으로 처리하지 못한 필터
             
-        cache_path = os.path.join(self.semantic_cache_dir, f"semantic_{fragment_id}.pkl")
-        try:
-            with open(cache_path, 'wb') as f:
-                pickle.dump(embedding, f)
-        except Exception as e:
-            print(f"캐시 저장 오류: {str(e)}")
+        Returns:
+            List[Dict]: 검색 결과 목록
+        """
+        return self._format_hits_batch([hits], k, residual_filters)[0]
 
-    def _ensemble_results(self, vector_results: List[Dict], keyword_results: List[Dict], 
-                        semantic_results: List[Dict], k: int = 5) -> List[Dict]:
+    def _format_hits_batch(self, hits_per_query: List[List[Tuple[str, float]]], k: int,
+                           residual_filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
         """
-        벡터 검색, 키워드 검색, 의미 기반 검색 결과를 결합
+        쿼리별 (fragment_id, 점수) 목록을 검색 결과 형식으로 변환 (메타데이터는 한 번에 조회)
         
         Args:
-            vector_results: 벡터 검색 결과
-            keyword_results: 키워드 검색 결과
-            semantic_results: 의미 기반 검색 결과
-            k: 반환할 결과 수
+            hits_per_query: 쿼리별 점수 내림차순 (fragment_id, 점수) 목록
+            k: 쿼리별 반환할 결과 수
+            residual_filters: 비트맵으로 처리하지 못한 필터
             
         Returns:
-            List[Dict]: 결합된 검색 결과
+            List[List[Dict]]: 쿼리별 검색 결과 목록
         """
-        # 가중치 설정
-        vector_weight = 0.4
-        keyword_weight = 0.2
-        semantic_weight = 0.4
-        
-        # 결과 ID를 키로, 점수를 값으로 하는 딕셔너리 생성
-        vector_scores = {r['id']: r['score'] for r in vector_results}
-        keyword_scores = {r['id']: r['score'] for r in keyword_results}
-        semantic_scores = {r['id']: r['score'] for r in semantic_results}
-        
-        # 모든 고유 파편 ID 수집
-        all_ids = set(vector_scores.keys()) | set(keyword_scores.keys()) | set(semantic_scores.keys())
-        
-        # 점수 정규화를 위한 최대값
-        max_vector_score = max(vector_scores.values()) if vector_scores else 1.0
-        max_keyword_score = max(keyword_scores.values()) if keyword_scores else 1.0
-        max_semantic_score = max(semantic_scores.values()) if semantic_scores else 1.0
-        
-        # 결합 점수 계산
-        ensemble_scores = {}
-        for fragment_id in all_ids:
-            # 정규화된 벡터 점수 (없으면 0)
-            norm_vector_score = vector_scores.get(fragment_id, 0) / max_vector_score
-            
-            # 정규화된 키워드 점수 (없으면 0)
-            norm_keyword_score = keyword_scores.get(fragment_id, 0) / max_keyword_score
-            
-            # 정규화된 의미 기반 점수 (없으면 0)
-            norm_semantic_score = semantic_scores.get(fragment_id, 0) / max_semantic_score
-            
-            # 가중 결합 점수 계산
-            ensemble_scores[fragment_id] = (
-                vector_weight * norm_vector_score + 
-                keyword_weight * norm_keyword_score + 
-                semantic_weight * norm_semantic_score
-            )
-        
-        # 결합 점수 기준 정렬
-        sorted_results = sorted(
-            [(fragment_id, score) for fragment_id, score in ensemble_scores.items()],
-            key=lambda x: x[1],
-            reverse=True
-        )[:k]
-        
-        # 결과 포맷팅
-        results = []
-        for fragment_id, score in sorted_results:
-            # 원본 결과에서 메타데이터 가져오기
-            for r in vector_results + keyword_results + semantic_results:
-                if r['id'] == fragment_id:
-                    result = r.copy()
-                    result['score'] = float(score)  # 앙상블 점수로 업데이트
-                    results.append(result)
-                    break
-                    
-            # 이미 찾았으면 다음 ID로
-            if len(results) == len(sorted_results[:len(results)]):
-                continue
+        metadata_map = self.fragment_metadata.get_many(
+            {fragment_id for hits in hits_per_query for fragment_id, _ in hits}
+        )
+        
+        results_per_query = []
+        for hits in hits_per_query:
+            results = []
+            for fragment_id, score in hits:
+                metadata = metadata_map.get(fragment_id, {})
                 
-            # 원본 결과에 없는 경우 메타데이터에서 직접 가져오기
-            metadata = self.fragment_metadata.get(fragment_id, {})
-            if metadata:
+                # 보조 인덱스로 처리하지 못한 필터 적용
+                if residual_filters and not self._apply_filters(metadata, residual_filters):
+                    continue
+                    
                 results.append({
                     'id': fragment_id,
                     'score': float(score),
@@ -571,9 +1361,42 @@ class FaissVectorStore:
                     'file_name': metadata.get('file_name', ''),
                     'content_preview': metadata.get('content_preview', '')
                 })
+                
+                # 충분한 결과를 얻었으면 종료
+                if len(results) >= k:
+                    break
+            results_per_query.append(results)
+                
+        return results_per_query
+
+    def _ensemble_results(self, vector_results: List[Dict], keyword_results: List[Dict], 
+                        semantic_results: List[Dict], k: int = 5,
+                        weights: Optional[Dict[str, float]] = None,
+                        method: Optional[str] = None) -> List[Dict]:
+        """
+        벡터 검색, 키워드 검색, 의미 기반 검색 결과를 결합
         
-        return results
+        Args:
+            vector_results: 벡터 검색 결과
+            keyword_results: 키워드 검색 결과
+            semantic_results: 의미 기반 검색 결과
+            k: 반환할 결과 수
+            weights: 검색기별 가중치 (없으면 기본 가중치)
+            method: 결합 방식 (없으면 저장소 기본값, fusion.FUSION_METHODS 참고)
+            
+        Returns:
+            List[Dict]: 결합된 검색 결과
+        """
+        return fuse_results(
+            {'vector': vector_results, 'keyword': keyword_results, 'semantic': semantic_results},
+            weights=weights,
+            k=k,
+            method=method or self.fusion_method
+        )
 
+    def _parse_search_options(self, filters: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """filters에 함께 전달된 검색 옵션을 분리 (fusion.parse_search_options 참고)"""
+        return parse_search_options(filters)
     
     def _apply_filters(self, metadata: Dict[str, Any], filters: Dict[str, Any]) -> bool:
         """
@@ -587,7 +1410,7 @@ class FaissVectorStore:
             bool: 필터 통과 여부
         """
         # rerank와 ensemble_weight는 필터링에서 제외
-        skip_keys = ['rerank', 'ensemble_weight', 'query_text']
+        skip_keys = ['rerank', 'ensemble_weight', 'ensemble_weights', 'query_text', 'fusion']
         
         for key, value in filters.items():
             # 필터링 제외 키는 건너뛰기
@@ -612,15 +1435,18 @@ class FaissVectorStore:
     
     def search(self, query_vector: np.ndarray, k: int = 5, 
           filters: Optional[Dict[str, Any]] = None,
-          rerank: bool = False) -> List[Dict[str, Any]]:
+          rerank: bool = False,
+          deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
         """
         쿼리 벡터와 유사한 코드 파편 검색 (앙상블 검색 적용)
         
         Args:
             query_vector: 쿼리 벡터
             k: 반환할 결과 수
-            filters: 필터링 조건 (예: {'type': 'component'})
+            filters: 필터링 조건 (예: {'type': 'component'}).
+                     검색 옵션 query_text, ensemble_weight, ensemble_weights, fusion, graph_expand, dependency_expand, semantic도 함께 전달 가능
             rerank: Cross-Encoder로 재랭킹 수행 여부
+            deadline: 요청 지연 시간 예산 (넘을 것 같은 단계는 줄이거나 건너뛰고 deadline.degraded에 기록)
             
         Returns:
             List[Dict]: 검색 결과 목록
@@ -628,65 +1454,511 @@ class FaissVectorStore:
         if self.index.ntotal == 0:
             return []
         
-        # filters에서 앙상블과 재랭킹 관련 옵션 추출
-        vector_weight = 0.4  # 기본값
-        keyword_weight = 0.2  # 기본값
-        semantic_weight = 0.4  # 기본값
-        query_text = None
+        # filters에서 앙상블 관련 옵션 추출
+        filters, options = self._parse_search_options(filters)
+        query_text = options['query_text']
+        
+        return self._search_many(
+            query_vectors=np.asarray(query_vector).reshape(1, -1),
+            query_texts=[query_text],
+            k=k,
+            filters=filters,
+            options=options,
+            rerank=rerank,
+            deadline=deadline
+        )[0]
+    
+    def search_batch(self, query_vectors: np.ndarray, query_texts: Optional[List[str]] = None,
+                     k: int = 5, filters: Optional[Dict[str, Any]] = None,
+                     rerank: bool = False) -> List[List[Dict[str, Any]]]:
+        """
+        여러 쿼리를 한 번에 검색 (대량 요구사항 분석용)
+        
+        코드 임베딩은 한 번의 Faiss 행렬 검색, 의미 임베딩은 한 번의 인코더 호출과
+        행렬 검색으로 처리하고, 재랭킹은 모든 (쿼리, 파편) 쌍을 공유 미니배치로 계산한다.
+        
+        Args:
+            query_vectors: (쿼리 수, 차원) 쿼리 벡터 배열
+            query_texts: 쿼리 문자열 목록 (키워드/의미 기반 검색 및 재랭킹용)
+            k: 쿼리별 반환할 결과 수
+            filters: 필터링 조건 및 앙상블 옵션 (모든 쿼리 공통)
+            rerank: Cross-Encoder로 재랭킹 수행 여부
+            
+        Returns:
+            List[List[Dict]]: 쿼리별 검색 결과 목록
+        """
+        query_vectors = np.asarray(query_vectors).reshape(-1, self.dimension)
+        if query_texts is not None and len(query_texts) != len(query_vectors):
+            raise ValueError("query_texts와 query_vectors의 개수가 다릅니다.")
+        
+        if self.index.ntotal == 0:
+            return [[] for _ in range(len(query_vectors))]
+        
+        filters, options = self._parse_search_options(filters)
+        return self._search_many(
+            query_vectors=query_vectors,
+            query_texts=query_texts or [None] * len(query_vectors),
+            k=k,
+            filters=filters,
+            options=options,
+            rerank=rerank
+        )
+    
+    def retrieve_batch(self, query_vectors: np.ndarray, query_texts: List[Optional[str]], k: int,
+                       filters: Optional[Dict[str, Any]] = None,
+                       semantic_query_vectors: Optional[np.ndarray] = None,
+                       deadline: Optional[Deadline] = None,
+                       semantic: bool = True) -> List[Dict[str, List[Dict[str, Any]]]]:
+        """
+        1차 검색기(벡터 / 키워드 / 의미 기반)를 동시에 실행하고 결합 전 결과를 반환
+        
+        샤드 워커는 이 결과를 그대로 코디네이터에 보내고, 결합과 재랭킹은 코디네이터가 한 번만 수행한다.
+        
+        Args:
+            query_vectors: (쿼리 수, 차원) 쿼리 벡터 배열
+            query_texts: 쿼리 문자열 목록 (None이면 벡터 검색만 수행)
+            k: 검색기별 결과 수
+            filters: 필터링 조건 (검색 옵션 제거됨)
+            semantic_query_vectors: query_texts 중 문자열이 있는 쿼리의 의미 임베딩 (순서대로, 없으면 직접 인코딩)
+            deadline: 요청 지연 시간 예산. 키워드/의미 기반 검색기는 남은 시간까지만 기다리고,
+                      의미 기반 검색기는 평균 소요 시간이 남은 시간보다 길면 실행하지 않는다.
+                      벡터 검색기는 항상 결과를 기다린다.
+            semantic: False면 의미 기반 검색기를 실행하지 않음
+            
+        Returns:
+            List[Dict]: 쿼리별 {'vector': [...], 'keyword': [...], 'semantic': [...]}
+        """
+        query_vectors = np.asarray(query_vectors).reshape(-1, self.dimension)
+        n_queries = len(query_vectors)
+        if self.index.ntotal == 0:
+            return [{'vector': [], 'keyword': [], 'semantic': []} for _ in range(n_queries)]
+        
+        # 키워드/의미 기반 검색은 query_text가 있는 쿼리만
+        text_positions = [i for i, text in enumerate(query_texts) if text]
+        texts = [query_texts[i] for i in text_positions]
+        
+        # 1차 검색기 구성
+        tasks = {
+            'vector': lambda: self._vector_search_batch(query_vectors, k=k, filters=filters)
+        }
+        if texts:
+            tasks['keyword'] = lambda: self._keyword_search_batch(texts, k=k, filters=filters)
+            
+            def semantic_task():
+                # 인코더 로드 / 첫 호출 준비 시간은 측정값에서 제외
+                if semantic_query_vectors is None:
+                    self._get_semantic_encoder()
+                started = time.monotonic()
+                results = self._semantic_search_batch(
+                    texts, k=k, filters=filters, query_embeddings=semantic_query_vectors
+                )
+                self.latency.observe('semantic', time.monotonic() - started)
+                return results
+            
+            # 예산 안에 끝나지 않을 의미 기반 검색은 실행하지 않음
+            if semantic and deadline is not None and not deadline.allows(self.latency.estimate('semantic')):
+                deadline.degrade('semantic')
+            elif semantic:
+                tasks['semantic'] = semantic_task
+        
+        # 검색기 동시 실행 (제한 시간을 넘긴 검색기는 빈 결과로 결합)
+        timeouts = self.retriever_timeouts
+        if deadline is not None:
+            timeouts = dict(timeouts)
+            remaining = deadline.remaining()
+            for name in tasks:
+                if name != 'vector':
+                    timeouts[name] = min(timeouts.get(name, remaining), remaining)
+        retriever_results, missed = self.search_executor.run(tasks, timeouts)
+        if deadline is not None:
+            for name in missed:
+                deadline.degrade(name)
+        vector_results = retriever_results.get('vector') or [[] for _ in range(n_queries)]
+        per_query = [
+            {'vector': vector_results[i], 'keyword': [], 'semantic': []}
+            for i in range(n_queries)
+        ]
+        for name in ('keyword', 'semantic'):
+            for position, results in zip(text_positions, retriever_results.get(name, [])):
+                per_query[position][name] = results
+        
+        return per_query
+    
+    def _search_many(self, query_vectors: np.ndarray, query_texts: List[Optional[str]], k: int,
+                     filters: Dict[str, Any], options: Dict[str, Any],
+                     rerank: bool, deadline: Optional[Deadline] = None) -> List[List[Dict[str, Any]]]:
+        """
+        단일/배치 검색 공통 파이프라인: 1차 검색기 동시 실행 -> 결과 결합 -> 재랭킹
+        
+        Args:
+            query_vectors: (쿼리 수, 차원) 쿼리 벡터 배열
+            query_texts: 쿼리 문자열 목록 (None이면 벡터 검색만 수행)
+            k: 쿼리별 반환할 결과 수
+            filters: 필터링 조건 (검색 옵션 제거됨)
+            options: _parse_search_options에서 분리한 검색 옵션
+            rerank: Cross-Encoder로 재랭킹 수행 여부
+            deadline: 요청 지연 시간 예산 (None이면 무제한)
+            
+        Returns:
+            List[List[Dict]]: 쿼리별 검색 결과 목록
+        """
+        combined_per_query = self._candidates_many(
+            query_vectors, query_texts, k, filters, options, rerank, deadline=deadline
+        )
+        return self._rerank_many(combined_per_query, query_texts, k, rerank, deadline=deadline)
+    
+    def _candidates_many(self, query_vectors: np.ndarray, query_texts: List[Optional[str]], k: int,
+                         filters: Dict[str, Any], options: Dict[str, Any],
+                         rerank: bool, deadline: Optional[Deadline] = None) -> List[List[Dict[str, Any]]]:
+        """
+        재랭킹 전 단계: 1차 검색기 동시 실행 -> 결과 결합 -> 그래프/의존성 확장
+        
+        Args:
+            query_vectors: (쿼리 수, 차원) 쿼리 벡터 배열
+            query_texts: 쿼리 문자열 목록
+            k: 쿼리별 반환할 결과 수
+            filters: 필터링 조건 (검색 옵션 제거됨)
+            options: _parse_search_options에서 분리한 검색 옵션
+            rerank: 재랭킹 예정 여부 (True면 k * 4개 후보 검색)
+            deadline: 요청 지연 시간 예산 (마감이 지나면 그래프/의존성 확장 생략)
+            
+        Returns:
+            List[List[Dict]]: 쿼리별 결합 점수 순 후보 목록
+        """
         candidate_k = k * 4 if rerank else k  # 재랭킹 시 더 많은 후보 검색
+        retrieved = self.retrieve_batch(
+            query_vectors, query_texts, k=candidate_k, filters=filters, deadline=deadline,
+            semantic=options.get('semantic', True)
+        )
+        
+        combined_per_query = [
+            self._combine_retrieved(lists, query_text, candidate_k, options)
+            for lists, query_text in zip(retrieved, query_texts)
+        ]
+        if options.get('graph_expand'):
+            if deadline is not None and deadline.expired():
+                deadline.degrade('graph_expand')
+            else:
+                combined_per_query = self._expand_with_graph(
+                    combined_per_query, seeds=k, per_seed=options['graph_expand'], filters=filters
+                )
+        if options.get('dependency_expand'):
+            if deadline is not None and deadline.expired():
+                deadline.degrade('dependency_expand')
+            else:
+                combined_per_query = self._expand_with_dependencies(
+                    combined_per_query, seeds=k, direction=options['dependency_expand'], filters=filters
+                )
+        return combined_per_query
+    
+    def search_candidates(self, query_vector: np.ndarray, k: int = 5,
+                          filters: Optional[Dict[str, Any]] = None,
+                          rerank: bool = False,
+                          deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """
+        재랭킹 전 후보 검색 (스트리밍 검색의 1단계, 상위 k개가 1차 검색 결과)
         
-        if filters and 'query_text' in filters:
-            query_text = filters.pop('query_text')
+        search(..., rerank=rerank)는 이 결과를 rerank_candidates에 넘긴 것과 같다.
         
-        if filters and 'ensemble_weights' in filters:
-            try:
-                weights = filters.pop('ensemble_weights')
-                if isinstance(weights, dict):
-                    vector_weight = float(weights.get('vector', 0.4))
-                    keyword_weight = float(weights.get('keyword', 0.2))
-                    semantic_weight = float(weights.get('semantic', 0.4))
-            except (ValueError, TypeError):
-                pass
-        
-        # 벡터 검색 수행 
-        vector_results = self._vector_search(query_vector, k=candidate_k, filters=filters)
-        
-        # 키워드 검색 수행 (query_text가 있는 경우만)
-        keyword_results = []
-        if query_text:
-            keyword_results = self._keyword_search(query_text, k=candidate_k)
-        
-        # 의미 기반 검색 수행 (query_text가 있는 경우만)
-        semantic_results = []
-        if query_text:
-            semantic_results = self._semantic_search(query_text, k=candidate_k, filters=filters)
-                
-        # 앙상블 검색 (세 가지 검색 결과 결합)
-        if query_text and (keyword_results or semantic_results):
-            combined_results = self._ensemble_results(
-                vector_results=vector_results,
-                keyword_results=keyword_results,
-                semantic_results=semantic_results,
-                k=candidate_k
+        Args:
+            query_vector: 쿼리 벡터
+            k: 반환할 결과 수
+            filters: 필터링 조건 및 검색 옵션 (search와 같음)
+            rerank: 이후 재랭킹 예정 여부 (True면 k * 4개 후보 반환)
+            deadline: 요청 지연 시간 예산 (None이면 무제한)
+            
+        Returns:
+            List[Dict]: 결합 점수 순 후보 목록
+        """
+        if self.index.ntotal == 0:
+            return []
+        
+        filters, options = self._parse_search_options(filters)
+        return self._candidates_many(
+            query_vectors=np.asarray(query_vector).reshape(1, -1),
+            query_texts=[options['query_text']],
+            k=k,
+            filters=filters,
+            options=options,
+            rerank=rerank,
+            deadline=deadline
+        )[0]
+    
+    def rerank_candidates(self, query_text: str, candidates: List[Dict[str, Any]],
+                          k: int = 5, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """
+        search_candidates 결과를 Cross-Encoder로 재랭킹 (스트리밍 검색의 2단계)
+        
+        Args:
+            query_text: 쿼리 문자열
+            candidates: search_candidates 결과
+            k: 반환할 결과 수
+            deadline: 요청 지연 시간 예산 (None이면 무제한)
+            
+        Returns:
+            List[Dict]: 상위 k개 결과 (Cross-Encoder가 없으면 후보 상위 k개)
+        """
+        return self._rerank_many([list(candidates)], [query_text], k, rerank=True, deadline=deadline)[0]
+    
+    @staticmethod
+    def _downweight(score: float, weight: float) -> float:
+        """
+        확장 후보 점수: 시드 점수를 (1 - weight) 비율만큼 낮춘 값
+        
+        L2 점수(-거리)나 음수 내적처럼 시드 점수가 음수여도 시드보다 높아지지 않는다
+        (score × weight는 음수 점수를 오히려 높임).
+        
+        Args:
+            score: 시드 점수
+            weight: 유사도 가중치 ([0, 1] 범위로 자름, 내적 유사도는 1을 넘을 수 있음)
+        """
+        weight = min(max(weight, 0.0), 1.0)
+        return score - abs(score) * (1.0 - weight)
+    
+    def _expand_with_graph(self, combined_per_query: List[List[Dict[str, Any]]], seeds: int,
+                           per_seed: int, filters: Dict[str, Any]) -> List[List[Dict[str, Any]]]:
+        """
+        상위 결과의 kNN 이웃을 후보에 추가 (그래프 확장 검색)
+        
+        이웃 점수는 시드 점수를 이웃 유사도만큼 낮춘 값(_downweight)이므로 시드 점수의 부호와
+        관계없이 시드보다 높아지지 않으며, 재랭킹 시에는 Cross-Encoder가 확장된 후보까지 함께 평가한다.
+        
+        Args:
+            combined_per_query: 쿼리별 결합된 후보 목록
+            seeds: 쿼리별 확장할 상위 결과 수
+            per_seed: 시드별 추가할 최대 이웃 수
+            filters: 필터링 조건 (확장 후보에도 적용)
+            
+        Returns:
+            List[List[Dict]]: 쿼리별 확장된 후보 목록 (점수 내림차순)
+        """
+        if self.knn_graph is None:
+            return combined_per_query
+        
+        bitmap, residual_filters = self._selection_bitmap(filters)
+        live = self.secondary_index.live
+        is_l2 = self.index.metric_type == faiss.METRIC_L2
+        
+        hits_per_query = []
+        for results in combined_per_query:
+            seen = {result['id'] for result in results}
+            expanded = {}
+            for seed in results[:seeds]:
+                seed_idx = self.id_to_idx.get(seed['id'])
+                if seed_idx is None:
+                    continue
+                ids, similarities = self.knn_graph.neighbors_of(seed_idx, live=live if bitmap is None else bitmap)
+                for neighbor, similarity in zip(ids[:per_seed].tolist(), similarities[:per_seed].tolist()):
+                    fragment_id = self.idx_to_id.get(neighbor)
+                    if fragment_id is None or fragment_id in seen:
+                        continue
+                    # L2 그래프는 -거리를 저장하므로 (0, 1] 유사도로 변환
+                    weight = 1.0 / (1.0 - similarity) if is_l2 else max(similarity, 0.0)
+                    score = self._downweight(seed['score'], weight)
+                    if score > expanded.get(fragment_id, float('-inf')):
+                        expanded[fragment_id] = score
+            hits_per_query.append(sorted(expanded.items(), key=lambda hit: hit[1], reverse=True))
+        
+        expanded_per_query = self._format_hits_batch(
+            hits_per_query, k=seeds * per_seed, residual_filters=residual_filters
+        )
+        return [
+            sorted(results + expanded, key=lambda result: result['score'], reverse=True)
+            for results, expanded in zip(combined_per_query, expanded_per_query)
+        ]
+    
+    def _expand_with_dependencies(self, combined_per_query: List[List[Dict[str, Any]]], seeds: int,
+                                  direction: str, filters: Dict[str, Any]) -> List[List[Dict[str, Any]]]:
+        """
+        상위 결과 파일의 부모/자식 파일(1-hop)의 파편을 후보에 추가 (의존성 확장 검색)
+        
+        의존성 그래프의 인접 배열만 읽으므로 추가 벡터 검색이 없다. 이웃 파일에 component 파편이
+        있으면 그것만, 없으면 (JS 모듈 등) 파일의 모든 파편을 추가하며, 점수는
+        시드 점수를 DEPENDENCY_EXPAND_WEIGHT만큼 낮춘 값(_downweight)이다.
+        
+        Args:
+            combined_per_query: 쿼리별 결합된 후보 목록
+            seeds: 쿼리별 확장할 상위 결과 수
+            direction: 'parents', 'children', 'both'
+            filters: 필터링 조건 (확장 후보에도 적용)
+            
+        Returns:
+            List[List[Dict]]: 쿼리별 확장된 후보 목록 (점수 내림차순)
+        """
+        graph = self.dependency_graph
+        if graph is None:
+            return combined_per_query
+        
+        bitmap, residual_filters = self._selection_bitmap(filters)
+        selected = self.secondary_index.live if bitmap is None else bitmap
+        component_bitmap = self.secondary_index.type_bitmap('component')
+        
+        hits_per_query = []
+        for results in combined_per_query:
+            seen = {result['id'] for result in results}
+            expanded = {}
+            for seed in results[:seeds]:
+                seed_idx = self.id_to_idx.get(seed['id'])
+                if seed_idx is None:
+                    continue
+                nodes = graph.neighbors(graph.node_for(seed_idx), direction)
+                for node in nodes[:DEPENDENCY_EXPAND_MAX_FILES].tolist():
+                    ids = np.asarray(self.secondary_index.ids_for_file(graph.nodes[node]), dtype=np.int64)
+                    if len(ids) == 0:
+                        continue
+                    components = ids[component_bitmap[ids]]
+                    if len(components):
+                        ids = components
+                    score = self._downweight(seed['score'], DEPENDENCY_EXPAND_WEIGHT)
+                    for idx in ids[selected[ids]].tolist():
+                        fragment_id = self.idx_to_id.get(idx)
+                        if fragment_id is None or fragment_id in seen:
+                            continue
+                        if score > expanded.get(fragment_id, float('-inf')):
+                            expanded[fragment_id] = score
+            hits_per_query.append(sorted(expanded.items(), key=lambda hit: hit[1], reverse=True))
+        
+        expanded_per_query = self._format_hits_batch(
+            hits_per_query, k=max(len(hits) for hits in hits_per_query) if hits_per_query else 0,
+            residual_filters=residual_filters
+        )
+        return [
+            sorted(results + expanded, key=lambda result: result['score'], reverse=True)
+            for results, expanded in zip(combined_per_query, expanded_per_query)
+        ]
+    
+    def set_dependency_graph(self, graph: Dict[str, Any]):
+        """
+        파서가 만든 의존성 그래프를 저장소에 반영하고 체크포인트에 기록
+        
+        간선 목록을 CSR 인접 배열로 변환하고 현재 파편을 file_path 기준으로 노드에 연결한다.
+        이후 추가/삭제되는 파편의 노드 연결은 변경 적용 시 갱신된다.
+        
+        Args:
+            graph: VueParser.build_dependency_graph 결과 {'nodes', 'edges'}
+        """
+        self._check_writable()
+        self.commit()
+        dependency_graph = DependencyGraph.from_edges(graph['nodes'], graph['edges'])
+        dependency_graph.bind_files(self.secondary_index.by_file, self.index.ntotal)
+        self.dependency_graph = dependency_graph
+        self.generation += 1
+        self.checkpoint()
+        print(f"의존성 그래프 반영 완료 (파일 수: {len(dependency_graph.nodes)}, 간선 수: {dependency_graph.num_edges})")
+    
+    def _combine_retrieved(self, lists: Dict[str, List[Dict[str, Any]]], query_text: Optional[str],
+                           k: int, options: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        한 쿼리의 검색기별 결과를 앙상블 결합 (키워드/의미 결과가 없으면 벡터 결과 그대로)
+        
+        Args:
+            lists: 검색기 이름 -> 결과 목록
+            query_text: 쿼리 문자열
+            k: 반환할 결과 수
+            options: 검색 옵션 (weights, fusion)
+            
+        Returns:
+            List[Dict]: 결합된 검색 결과
+        """
+        if query_text and (lists['keyword'] or lists['semantic']):
+            return self._ensemble_results(
+                vector_results=lists['vector'],
+                keyword_results=lists['keyword'],
+                semantic_results=lists['semantic'],
+                k=k,
+                weights=options['weights'],
+                method=options['fusion']
             )
-        else:
-            combined_results = vector_results
+        return lists['vector'][:k]
+    
+    def _rerank_many(self, combined_per_query: List[List[Dict[str, Any]]],
+                     query_texts: List[Optional[str]], k: int, rerank: bool,
+                     deadline: Optional[Deadline] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Cross-Encoder 재랭킹 적용 (모든 쿼리의 후보를 공유 미니배치로 계산)
         
-        # Cross-Encoder 재랭킹 적용
-        if rerank and self.cross_encoder and query_text:
+        Args:
+            combined_per_query: 쿼리별 결합된 후보 목록
+            query_texts: 쿼리 문자열 목록 (문자열이 있는 쿼리만 재랭킹)
+            k: 쿼리별 반환할 결과 수
+            rerank: 재랭킹 수행 여부
+            deadline: 요청 지연 시간 예산 (있으면 쿼리별로 _rerank_within_deadline 사용)
+            
+        Returns:
+            List[List[Dict]]: 쿼리별 상위 k개 결과
+        """
+        text_positions = [i for i, text in enumerate(query_texts) if text]
+        if rerank and self.cross_encoder and text_positions and deadline is not None:
+            for position in text_positions:
+                combined_per_query[position] = self._rerank_within_deadline(
+                    query_texts[position], combined_per_query[position], k, deadline
+                )
+        elif rerank and self.cross_encoder and text_positions:
             try:
-                reranked_results = self.cross_encoder.rerank(
-                    query=query_text,
-                    passages=combined_results,
+                reranked = self.cross_encoder.rerank_batch(
+                    queries=[query_texts[i] for i in text_positions],
+                    passages_list=[combined_per_query[i] for i in text_positions],
                     top_k=k
                 )
-                return reranked_results
+                for position, results in zip(text_positions, reranked):
+                    combined_per_query[position] = results
             except Exception as e:
                 print(f"재랭킹 중 오류 발생: {str(e)}")
                 # 오류 발생 시 원래 결과 사용
-                return combined_results[:k]
         
-        return combined_results[:k]
+        return [results[:k] for results in combined_per_query]
+    
+    def _rerank_within_deadline(self, query_text: str, candidates: List[Dict[str, Any]], k: int,
+                                deadline: Deadline) -> List[Dict[str, Any]]:
+        """
+        지연 시간 예산 안에서 결합 점수 순으로 후보를 나눠 재랭킹
+        
+        max(k, RERANK_CHUNK_SIZE)개씩 점수를 계산하고, 다음 묶음의 예상 소요 시간(쌍당 평균 × 묶음 크기)이
+        남은 시간보다 길면 멈춘다. 점수를 계산한 후보는 Cross-Encoder 점수 순, 나머지는 결합 점수 순으로
+        뒤에 붙이며, 모든 후보를 계산하지 못하면 'rerank'를 degraded에 기록한다.
+        
+        Args:
+            query_text: 쿼리 문자열
+            candidates: 결합 점수 순 후보 목록
+            k: 반환할 결과 수
+            deadline: 요청 지연 시간 예산
+            
+        Returns:
+            List[Dict]: 재랭킹된 후보 목록
+        """
+        chunk_size = max(k, RERANK_CHUNK_SIZE)
+        scored = []
+        position = 0
+        while position < len(candidates):
+            chunk = candidates[position:position + chunk_size]
+            per_pair = self.latency.estimate('rerank_pair')
+            if not deadline.allows(None if per_pair is None else per_pair * len(chunk)):
+                break
+            
+            started = time.monotonic()
+            try:
+                scores = self.cross_encoder.score_pairs(
+                    [(query_text, passage.get('content_preview', '')) for passage in chunk]
+                )
+            except Exception as e:
+                print(f"재랭킹 중 오류 발생: {str(e)}")
+                break
+            self.latency.observe('rerank_pair', (time.monotonic() - started) / len(chunk))
+            scored.extend(zip(scores, chunk))
+            position += len(chunk)
+        
+        if position < len(candidates):
+            deadline.degrade('rerank')
+        if not scored:
+            return candidates
+        
+        ranked = sorted(scored, key=lambda x: x[0], reverse=True)
+        reranked = []
+        for score, passage in ranked:
+            result = passage.copy()
+            result['cross_score'] = float(score)
+            reranked.append(result)
+        return reranked + candidates[position:]
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -695,36 +1967,17 @@ class FaissVectorStore:
         Returns:
             Dict: 통계 정보
         """
-        type_counts = {}
-        file_counts = set()  # 중복 없이 파일 경로 저장하기 위해 set 사용
-        component_names = set()
-        
-        for fragment_id, metadata in self.fragment_metadata.items():
-            # 타입별 카운트
-            frag_type = metadata.get('type', 'unknown')
-            if frag_type in type_counts:
-                type_counts[frag_type] += 1
-            else:
-                type_counts[frag_type] = 1
-                
-            # 파일별 카운트
-            file_path = metadata.get('file_path', '')
-            if file_path:
-                file_counts.add(file_path)
-                
-            # 컴포넌트별 카운트
-            if frag_type == 'component':
-                component_name = metadata.get('component_name', '')
-                if component_name:
-                    component_names.add(component_name)
+        # 추가/삭제 시점에 갱신된 집계 통계 사용 (O(1))
+        aggregate = self.secondary_index.stats()
         
         stats = {
-            'vector_count': self.index.ntotal,
+            'vector_count': len(self.id_to_idx),
+            'index_rows': self.index.ntotal,  # 삭제 후 압축 전 행 포함
             'dimension': self.dimension,
             'index_type': self.index_type,
-            'fragment_types': type_counts,
-            'file_counts': len(file_counts),
-            'component_count': len(component_names)
+            'fragment_types': aggregate['fragment_types'],
+            'file_counts': aggregate['file_counts'],
+            'component_count': aggregate['component_count']
         }
         
         # Cross-Encoder 정보 추가
@@ -737,9 +1990,37 @@ class FaissVectorStore:
             stats['cross_encoder'] = {
                 'enabled': False
             }
+        
+        # 지연 시간 예산 판단에 쓰는 단계별 평균 소요 시간(ms)
+        stats['stage_latency_ms'] = self.latency.stats()
             
         return stats
     
+    def memory_usage(self) -> int:
+        """
+        저장소가 차지하는 메모리 추정치 (바이트)
+        
+        Flat 인덱스 벡터, 키워드/보조 인덱스 배열, ID 매핑을 합산한다. 메모리 맵으로 로드한
+        배열도 검색 중 페이지 캐시에 올라오므로 포함한다 (메타데이터 DB는 제외).
+        
+        Returns:
+            int: 추정 바이트 수
+        """
+        total = self.index.ntotal * self.index.d * 4
+        if self.semantic_index is not None:
+            total += self.semantic_index.ntotal * self.semantic_index.d * 4
+        total += sum(
+            getattr(self.keyword_index, name).nbytes
+            for name in ('offsets', 'doc_ids', 'tfs', 'doc_len', 'doc_boost')
+        )
+        total += self.secondary_index.live.nbytes * (1 + len(self.secondary_index.type_bitmaps))
+        if self.knn_graph is not None:
+            total += self.knn_graph.nbytes()
+        if self.dependency_graph is not None:
+            total += self.dependency_graph.nbytes()
+        total += len(self.id_to_idx) * 200  # id_to_idx / idx_to_id 딕셔너리 항목
+        return total
+    
     def get_fragments_by_file(self, file_path: str) -> List[Dict[str, Any]]:
         """
         특정 파일의 모든 파편 검색
@@ -752,18 +2033,24 @@ class FaissVectorStore:
         """
         results = []
         
-        for fragment_id, metadata in self.fragment_metadata.items():
-            if metadata.get('file_path') == file_path:
-                idx = self.id_to_idx.get(fragment_id)
-                if idx is not None:
-                    results.append({
-                        'id': fragment_id,
-                        'type': metadata.get('type', ''),
-                        'name': metadata.get('name', ''),
-                        'file_path': metadata.get('file_path', ''),
-                        'file_name': metadata.get('file_name', ''),
-                        'content_preview': metadata.get('content_preview', '')
-                    })
+        # 보조 인덱스에서 해당 파일의 파편만 조회 (O(결과 수))
+        fragment_ids = [
+            self.idx_to_id[idx] for idx in self.secondary_index.ids_for_file(file_path)
+            if idx in self.idx_to_id
+        ]
+        metadata_map = self.fragment_metadata.get_many(fragment_ids)
+        
+        for fragment_id in fragment_ids:
+            metadata = metadata_map.get(fragment_id)
+            if metadata is not None:
+                results.append({
+                    'id': fragment_id,
+                    'type': metadata.get('type', ''),
+                    'name': metadata.get('name', ''),
+                    'file_path': metadata.get('file_path', ''),
+                    'file_name': metadata.get('file_name', ''),
+                    'content_preview': metadata.get('content_preview', '')
+                })
                     
         return results
     
@@ -771,6 +2058,9 @@ class FaissVectorStore:
         """
         특정 파편과 유사한 다른 파편 검색
         
+        kNN 그래프가 있으면 저장된 이웃 행을 읽기만 하고(O(M)), 없거나 k가 이웃 수보다 크면
+        벡터를 복원해 전체 검색한다.
+        
         Args:
             fragment_id: 기준 파편 ID
             k: 반환할 결과 수
@@ -782,25 +2072,76 @@ class FaissVectorStore:
         if fragment_id not in self.id_to_idx:
             return []
             
-        # 기준 파편의 인덱스와 벡터 가져오기
         idx = self.id_to_idx[fragment_id]
-        vector = self.index.reconstruct(idx)
         
-        # 자기 자신을 제외한 유사 파편 검색
+        if self.knn_graph is not None and k <= self.knn_graph.n_neighbors:
+            ids, scores = self.knn_graph.neighbors_of(idx, live=self.secondary_index.live)
+            hits = [
+                (self.idx_to_id[neighbor], float(score))
+                for neighbor, score in zip(ids.tolist(), scores.tolist())
+                if neighbor in self.idx_to_id
+            ]
+            return self._format_hits_batch([hits], k)[0]
+        
+        # 기준 파편의 벡터로 자기 자신을 제외한 유사 파편 검색
+        vector = self.index.reconstruct(idx)
         results = self.search(vector, k=k+1)
         
         # 자기 자신 제거
-        return [r for r in results if r['id'] != fragment_id]
+        return [r for r in results if r['id'] != fragment_id][:k]
+    
+    def get_fragment_content(self, fragment_id: str) -> str:
+        """
+        파편의 전체 코드 내용 조회 (요청 시에만 디스크에서 로드)
+        
+        Args:
+            fragment_id: 파편 ID
+            
+        Returns:
+            str: 전체 내용 (없으면 빈 문자열)
+        """
+        return self.fragment_metadata.get_content(fragment_id) or ''
+    
+    def get_fragment_contents(self, fragment_ids: List[str]) -> Dict[str, str]:
+        """
+        여러 파편의 전체 코드 내용을 한 번에 조회 (top-k 결과용)
+        
+        Args:
+            fragment_ids: 파편 ID 목록
+            
+        Returns:
+            Dict[str, str]: fragment_id -> 전체 내용
+        """
+        return self.fragment_metadata.get_contents(fragment_ids)
     
     def save(self):
-        """인덱스 명시적 저장"""
-        self._save_index()
+        """대기 중인 변경을 커밋하고 체크포인트 저장"""
+        self.commit()
+        self.checkpoint()
     
     def clear(self):
         """인덱스 초기화"""
+        self._check_writable()
+        self._pending = []
         self._create_index()
         self.id_to_idx = {}
         self.idx_to_id = {}
-        self.fragment_metadata = {}
-        self._save_index()
-        print("인덱스가 초기화되었습니다.")
\ No newline at end of file
+        self.fragment_metadata.clear()
+        self.secondary_index = SecondaryIndex()
+        self.keyword_index = BM25KeywordIndex()
+        self.knn_graph = self._new_knn_graph()
+        self.dependency_graph = None
+        self.generation += 1
+        self.checkpoint()
+        print("인덱스가 초기화되었습니다.")
+    
+    def close(self):
+        """
+        메타데이터 DB 연결(모든 스레드)과 저장소 전용 검색 실행기 종료
+        
+        대기 중인 변경은 커밋하지 않으며 (필요하면 먼저 commit / save), 외부에서 받은
+        공유 검색 실행기는 종료하지 않는다.
+        """
+        self.fragment_metadata.close_all()
+        if self._owns_search_executor:
+            self.search_executor.shutdown()
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""
+검색 결과 결합(fusion) 모듈
+
+벡터 / 키워드 / 의미 기반 검색 결과를 faiss_idx(dense ID) 기준 numpy 배열로 받아
+가중 점수 결합 또는 Reciprocal Rank Fusion으로 상위 k개를 선택한다.
+검색 결과 딕셔너리 목록을 바로 결합하는 fuse_results와 검색 옵션 파싱도 제공한다
+(단일 저장소와 샤드 코디네이터가 공유).
+"""
+
+import numpy as np
+from typing import Dict, List, Any, Optional, Tuple
+
+from app.storage.dependency_graph import EXPAND_DIRECTIONS
+
+# 지원하는 결합 방식
+# - max: 최대값으로 나눈 점수의 가중합 (기존 방식)
+# - minmax: min-max 정규화 점수의 가중합
+# - zscore: z-score 정규화 점수의 가중합
+# - rrf: Reciprocal Rank Fusion (순위 기반, 점수 스케일 무관)
+FUSION_METHODS = ('max', 'minmax', 'zscore', 'rrf')
+
+# 기본 검색기별 가중치
+DEFAULT_WEIGHTS = {
+    'vector': 0.4,
+    'keyword': 0.2,
+    'semantic': 0.4
+}
+
+# RRF 순위 보정 상수
+RRF_K = 60
+
+
+def weights_from_ensemble_weight(ensemble_weight: float) -> Dict[str, float]:
+    """
+    단일 앙상블 가중치(0~1)를 검색기별 가중치로 변환
+
+    키워드 가중치는 0.2로 고정하고 나머지 0.8을 벡터(ensemble_weight)와
+    의미 기반(1 - ensemble_weight) 검색에 나눈다. 0.5이면 기본 가중치와 같다.
+
+    Args:
+        ensemble_weight: 벡터 검색 비중 (0.0 ~ 1.0)
+
+    Returns:
+        Dict[str, float]: 검색기별 가중치
+    """
+    ensemble_weight = min(max(float(ensemble_weight), 0.0), 1.0)
+    keyword_weight = DEFAULT_WEIGHTS['keyword']
+    dense_weight = 1.0 - keyword_weight
+    return {
+        'vector': dense_weight * ensemble_weight,
+        'keyword': keyword_weight,
+        'semantic': dense_weight * (1.0 - ensemble_weight)
+    }
+
+
+def normalize_scores(scores: np.ndarray, method: str) -> np.ndarray:
+    """
+    한 검색기의 점수 배열 정규화
+
+    Args:
+        scores: 점수 배열 (순위 내림차순)
+        method: 결합 방식 (FUSION_METHODS 중 하나)
+
+    Returns:
+        np.ndarray: 정규화된 점수 배열
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    if len(scores) == 0:
+        return scores
+
+    if method == 'rrf':
+        return 1.0 / (RRF_K + np.arange(1, len(scores) + 1))
+
+    if method == 'minmax':
+        low, high = scores.min(), scores.max()
+        if high - low <= 0:
+            return np.ones_like(scores)
+        return (scores - low) / (high - low)
+
+    if method == 'zscore':
+        std = scores.std()
+        if std <= 0:
+            return np.zeros_like(scores)
+        return (scores - scores.mean()) / std
+
+    # max: 기존 방식과 동일하게 최대값으로 나눔
+    high = scores.max()
+    return scores / (high if high != 0 else 1.0)
+
+
+def fuse(ranked_lists: Dict[str, Tuple[np.ndarray, np.ndarray]],
+         weights: Optional[Dict[str, float]] = None,
+         k: int = 5,
+         method: str = 'max') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    여러 검색기 결과를 결합하여 상위 k개 선택
+
+    Args:
+        ranked_lists: 검색기 이름 -> (faiss_idx 배열, 점수 배열). 각 목록은 점수 내림차순.
+        weights: 검색기 이름 -> 가중치 (없으면 DEFAULT_WEIGHTS)
+        k: 반환할 결과 수
+        method: 결합 방식 (FUSION_METHODS 중 하나)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (faiss_idx 배열, 결합 점수 배열) - 점수 내림차순
+    """
+    if method not in FUSION_METHODS:
+        raise ValueError(f"지원하지 않는 결합 방식: {method} (지원: {', '.join(FUSION_METHODS)})")
+
+    weights = weights or DEFAULT_WEIGHTS
+    names = [name for name, (ids, _) in ranked_lists.items() if len(ids)]
+    if not names:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+    all_ids = np.concatenate([np.asarray(ranked_lists[name][0], dtype=np.int64) for name in names])
+    unique_ids, inverse = np.unique(all_ids, return_inverse=True)
+    fused = np.zeros(len(unique_ids), dtype=np.float64)
+
+    # 검색기별 정규화 점수를 가중 합산 (한 목록 안에서 ID는 중복되지 않음)
+    offset = 0
+    for name in names:
+        ids, scores = ranked_lists[name]
+        count = len(ids)
+        weight = weights.get(name, 0.0)
+        if weight:
+            fused[inverse[offset:offset + count]] += weight * normalize_scores(scores, method)
+        offset += count
+
+    # 상위 k개만 부분 정렬
+    k = min(k, len(unique_ids))
+    top = np.argpartition(-fused, k - 1)[:k]
+    top = top[np.argsort(-fused[top], kind='stable')]
+    return unique_ids[top], fused[top]
+
+
+def fuse_results(ranked_results: Dict[str, List[Dict[str, Any]]],
+                 weights: Optional[Dict[str, float]] = None,
+                 k: int = 5,
+                 method: str = 'max') -> List[Dict[str, Any]]:
+    """
+    검색기별 결과 딕셔너리 목록을 fragment_id 기준으로 결합
+
+    ID를 이 호출 안에서만 쓰는 정수로 바꿔 fuse에 전달하므로
+    저장소의 faiss_idx가 없는 경우(여러 샤드의 결과)에도 사용할 수 있다.
+
+    Args:
+        ranked_results: 검색기 이름 -> 결과 목록 ({'id', 'score', ...}, 점수 내림차순)
+        weights: 검색기 이름 -> 가중치 (없으면 DEFAULT_WEIGHTS)
+        k: 반환할 결과 수
+        method: 결합 방식 (FUSION_METHODS 중 하나)
+
+    Returns:
+        List[Dict]: 결합 점수로 갱신된 결과 목록 (점수 내림차순)
+    """
+    positions = {}
+    originals = []
+    ranked_lists = {}
+    for name, results in ranked_results.items():
+        ids = np.empty(len(results), dtype=np.int64)
+        for i, result in enumerate(results):
+            position = positions.get(result['id'])
+            if position is None:
+                position = positions[result['id']] = len(originals)
+                originals.append(result)
+            ids[i] = position
+        scores = np.fromiter((r['score'] for r in results), dtype=np.float64, count=len(results))
+        ranked_lists[name] = (ids, scores)
+
+    fused_ids, fused_scores = fuse(ranked_lists, weights=weights, k=k, method=method)
+
+    # 원본 결과를 복사하고 결합 점수로 업데이트
+    fused_results = []
+    for position, score in zip(fused_ids.tolist(), fused_scores.tolist()):
+        result = originals[position].copy()
+        result['score'] = float(score)
+        fused_results.append(result)
+    return fused_results
+
+
+def parse_search_options(filters: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    filters에 함께 전달된 검색 옵션을 분리 (원본 filters는 변경하지 않음)
+
+    Args:
+        filters: 필터 조건 + 검색 옵션 (query_text, ensemble_weight, ensemble_weights, fusion,
+                 graph_expand, dependency_expand, semantic)
+
+    Returns:
+        Tuple: (필터 조건, 검색 옵션 {'query_text', 'weights', 'fusion', 'graph_expand', 'dependency_expand', 'semantic'})
+    """
+    filters = dict(filters) if filters else {}
+    options = {
+        'query_text': filters.pop('query_text', None),
+        'weights': None,
+        'fusion': filters.pop('fusion', None),
+        'graph_expand': 0,
+        'dependency_expand': None,
+        # False면 의미 기반 검색기를 실행하지 않음 (과부하 시 축소 모드 등)
+        'semantic': filters.pop('semantic', True) is not False
+    }
+
+    ensemble_weight = filters.pop('ensemble_weight', None)
+    ensemble_weights = filters.pop('ensemble_weights', None)
+    graph_expand = filters.pop('graph_expand', None)
+    dependency_expand = filters.pop('dependency_expand', None)
+
+    try:
+        options['graph_expand'] = max(int(graph_expand or 0), 0)
+    except (ValueError, TypeError):
+        pass
+
+    try:
+        if isinstance(ensemble_weights, dict):
+            options['weights'] = {
+                'vector': float(ensemble_weights.get('vector', DEFAULT_WEIGHTS['vector'])),
+                'keyword': float(ensemble_weights.get('keyword', DEFAULT_WEIGHTS['keyword'])),
+                'semantic': float(ensemble_weights.get('semantic', DEFAULT_WEIGHTS['semantic']))
+            }
+        elif ensemble_weight is not None:
+            options['weights'] = weights_from_ensemble_weight(ensemble_weight)
+    except (ValueError, TypeError):
+        pass
+
+    # 의존성 확장 방향 (True는 양방향)
+    if dependency_expand is True:
+        dependency_expand = 'both'
+    if dependency_expand in EXPAND_DIRECTIONS:
+        options['dependency_expand'] = dependency_expand
+
+    if options['fusion'] not in FUSION_METHODS:
+        options['fusion'] = None
+
+    return filters, options
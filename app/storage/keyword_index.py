@@ -0,0 +1,334 @@
+"""
+BM25 역색인 기반 키워드 검색 모듈
+"""
+
+import os
+import re
+import json
+import heapq
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+
+# 식별자 / 숫자 / 한글 토큰 추출
+TOKEN_PATTERN = re.compile(r'[A-Za-z][A-Za-z0-9_$]*|[0-9]+|[가-힣]+')
+# camelCase / PascalCase 분리
+CAMEL_PATTERN = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    코드 인식 토큰화
+
+    - 식별자는 전체(소문자) + camelCase/snake_case 분리 결과를 함께 사용
+    - 한글은 글자 2-gram (한 글자 단어는 그대로)
+
+    Args:
+        text: 토큰화할 텍스트
+
+    Returns:
+        List[str]: 토큰 목록
+    """
+    tokens = []
+    for word in TOKEN_PATTERN.findall(text):
+        if '가' <= word[0] <= '힣':
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+            continue
+
+        lowered = word.lower()
+        tokens.append(lowered)
+
+        parts = []
+        for piece in re.split(r'[_$]+', word):
+            parts.extend(CAMEL_PATTERN.findall(piece))
+        if len(parts) > 1:
+            tokens.extend(part.lower() for part in parts)
+
+    return tokens
+
+
+class BM25KeywordIndex:
+    """
+    faiss_idx 기준 BM25 역색인
+
+    저장된 역색인은 CSR 형식(offsets / doc_ids / tfs)의 numpy 배열이며,
+    마지막 저장 이후 추가된 문서는 delta 포스팅에 보관했다가 저장 시 병합한다.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Args:
+            k1: BM25 단어 빈도 포화 파라미터
+            b: BM25 문서 길이 정규화 파라미터
+        """
+        self.k1 = k1
+        self.b = b
+
+        # 저장된 CSR 포스팅
+        self.vocab: Dict[str, int] = {}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.zeros(0, dtype=np.int32)
+        self.tfs = np.zeros(0, dtype=np.float32)
+
+        # 저장 이후 추가된 포스팅 (term -> ([doc_id], [tf]))
+        self.delta: Dict[str, Tuple[List[int], List[float]]] = {}
+
+        # 문서별 길이 및 가중치 (faiss_idx 기준)
+        self.doc_len = np.zeros(0, dtype=np.float32)
+        self.doc_boost = np.zeros(0, dtype=np.float32)
+
+        self.size = 0  # faiss_idx 상한 (ntotal)
+        self.n_docs = 0
+        self.total_len = 0.0
+
+    def _ensure_capacity(self, idx: int):
+        if idx < len(self.doc_len):
+            return
+        capacity = max(1024, len(self.doc_len))
+        while capacity <= idx:
+            capacity *= 2
+        doc_len = np.zeros(capacity, dtype=np.float32)
+        doc_len[:len(self.doc_len)] = self.doc_len
+        doc_boost = np.zeros(capacity, dtype=np.float32)
+        doc_boost[:len(self.doc_boost)] = self.doc_boost
+        self.doc_len = doc_len
+        self.doc_boost = doc_boost
+
+    def add(self, idx: int, text: str, boost: float = 1.0):
+        """
+        문서 추가
+
+        Args:
+            idx: faiss_idx
+            text: 색인할 전체 텍스트
+            boost: 문서 점수 가중치 (파편 타입별 가중치 등)
+        """
+        tokens = tokenize(text)
+        self._ensure_capacity(idx)
+
+        term_freqs: Dict[str, int] = {}
+        for token in tokens:
+            term_freqs[token] = term_freqs.get(token, 0) + 1
+
+        for term, tf in term_freqs.items():
+            doc_list, tf_list = self.delta.setdefault(term, ([], []))
+            doc_list.append(idx)
+            tf_list.append(float(tf))
+
+        self.doc_len[idx] = len(tokens)
+        self.doc_boost[idx] = boost
+        self.size = max(self.size, idx + 1)
+        self.n_docs += 1
+        self.total_len += len(tokens)
+
+    def remove(self, idx: int):
+        """
+        문서 삭제 (통계에서 제외하고 가중치를 0으로 표시, 포스팅은 다음 저장 시 병합하면서 제거)
+
+        Args:
+            idx: faiss_idx
+        """
+        if idx >= self.size or self.doc_boost[idx] == 0:
+            return
+        self.n_docs -= 1
+        self.total_len -= float(self.doc_len[idx])
+        self.doc_boost[idx] = 0.0
+
+    def _postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """단어의 전체 포스팅 (저장분 + delta)"""
+        doc_parts = []
+        tf_parts = []
+
+        row = self.vocab.get(term)
+        if row is not None:
+            start, end = self.offsets[row], self.offsets[row + 1]
+            doc_parts.append(np.asarray(self.doc_ids[start:end]))
+            tf_parts.append(np.asarray(self.tfs[start:end]))
+
+        if term in self.delta:
+            doc_list, tf_list = self.delta[term]
+            doc_parts.append(np.asarray(doc_list, dtype=np.int32))
+            tf_parts.append(np.asarray(tf_list, dtype=np.float32))
+
+        if not doc_parts:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        if len(doc_parts) == 1:
+            return doc_parts[0], tf_parts[0]
+        return np.concatenate(doc_parts), np.concatenate(tf_parts)
+
+    def search(self, query: str, k: int = 20,
+               bitmap: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """
+        BM25 점수 기준 상위 k개 문서 검색
+
+        Args:
+            query: 검색 쿼리
+            k: 반환할 결과 수
+            bitmap: 검색 대상 faiss_idx 비트맵 (None이면 전체)
+
+        Returns:
+            List[Tuple[int, float]]: (faiss_idx, 점수) 목록 (점수 내림차순)
+        """
+        if self.n_docs <= 0:
+            return []
+
+        avg_len = max(self.total_len / self.n_docs, 1.0)
+        doc_parts = []
+        score_parts = []
+
+        for term in set(tokenize(query)):
+            docs, tfs = self._postings(term)
+            # 삭제된 문서(가중치 0)는 문서 빈도에서 제외
+            live = self.doc_boost[docs] > 0
+            if not live.all():
+                docs = docs[live]
+                tfs = tfs[live]
+            if len(docs) == 0:
+                continue
+
+            df = len(docs)
+            idf = np.log(1.0 + (self.n_docs - df + 0.5) / (df + 0.5))
+            lengths = self.doc_len[docs]
+            denom = tfs + self.k1 * (1.0 - self.b + self.b * lengths / avg_len)
+            doc_parts.append(docs)
+            score_parts.append(idf * tfs * (self.k1 + 1.0) / denom)
+
+        if not doc_parts:
+            return []
+
+        docs = np.concatenate(doc_parts)
+        scores = np.concatenate(score_parts)
+
+        # 같은 문서의 단어별 점수 합산
+        unique_docs, inverse = np.unique(docs, return_inverse=True)
+        totals = np.bincount(inverse, weights=scores) * self.doc_boost[unique_docs]
+
+        keep = totals > 0
+        if bitmap is not None:
+            keep &= bitmap[unique_docs]
+        unique_docs = unique_docs[keep]
+        totals = totals[keep]
+
+        return [
+            (int(idx), float(score))
+            for score, idx in heapq.nlargest(k, zip(totals.tolist(), unique_docs.tolist()))
+        ]
+
+    def _live_postings(self) -> Tuple[Dict[str, int], List[np.ndarray], List[np.ndarray]]:
+        """삭제되지 않은 문서의 단어별 포스팅 (저장분 + delta, 빈 단어 제외)"""
+        terms = list(self.vocab)
+        terms.extend(term for term in self.delta if term not in self.vocab)
+
+        vocab: Dict[str, int] = {}
+        doc_parts = []
+        tf_parts = []
+        for term in terms:
+            docs, tfs = self._postings(term)
+            live = self.doc_boost[docs] > 0
+            if not live.any():
+                continue
+            vocab[term] = len(vocab)
+            doc_parts.append(docs[live])
+            tf_parts.append(tfs[live])
+        return vocab, doc_parts, tf_parts
+
+    def _set_postings(self, vocab: Dict[str, int], doc_parts: List[np.ndarray], tf_parts: List[np.ndarray]):
+        """단어별 포스팅을 CSR 배열로 교체"""
+        lengths = np.fromiter((len(part) for part in doc_parts), dtype=np.int64, count=len(vocab))
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        self.vocab = vocab
+        self.offsets = offsets
+        self.doc_ids = np.concatenate(doc_parts).astype(np.int32) if doc_parts else np.zeros(0, dtype=np.int32)
+        self.tfs = np.concatenate(tf_parts).astype(np.float32) if tf_parts else np.zeros(0, dtype=np.float32)
+        self.delta = {}
+
+    def _merge_delta(self):
+        """delta 포스팅을 CSR 포스팅에 병합 (삭제된 문서의 포스팅과 빈 단어는 제거)"""
+        has_dead = len(self.doc_ids) > 0 and not (self.doc_boost[self.doc_ids] > 0).all()
+        if not self.delta and not has_dead:
+            return
+        self._set_postings(*self._live_postings())
+
+    def compacted(self, live_rows: np.ndarray, mapping: np.ndarray) -> 'BM25KeywordIndex':
+        """
+        삭제된 문서를 뺀 새 역색인 (faiss_idx 재배치, 저장소 압축용)
+
+        Args:
+            live_rows: 남길 기존 faiss_idx (오름차순)
+            mapping: 기존 faiss_idx -> 새 faiss_idx 배열 (삭제된 문서는 -1)
+
+        Returns:
+            BM25KeywordIndex: 새 역색인 (기존 역색인은 그대로)
+        """
+        index = BM25KeywordIndex(k1=self.k1, b=self.b)
+        vocab, doc_parts, tf_parts = self._live_postings()
+        # 재배치는 순서를 보존하므로 포스팅의 문서 순서도 유지됨
+        index._set_postings(vocab, [mapping[docs] for docs in doc_parts], tf_parts)
+        index.doc_len = np.array(self.doc_len[live_rows], dtype=np.float32)
+        index.doc_boost = np.array(self.doc_boost[live_rows], dtype=np.float32)
+        index.size = len(live_rows)
+        index.n_docs = self.n_docs
+        index.total_len = self.total_len
+        return index
+
+    def save(self, index_dir: str):
+        """
+        역색인 저장 (CSR numpy 배열 + 어휘 JSON)
+
+        Args:
+            index_dir: 저장 디렉토리
+        """
+        self._merge_delta()
+        os.makedirs(index_dir, exist_ok=True)
+
+        np.save(os.path.join(index_dir, 'offsets.npy'), self.offsets)
+        np.save(os.path.join(index_dir, 'doc_ids.npy'), self.doc_ids)
+        np.save(os.path.join(index_dir, 'tfs.npy'), self.tfs)
+        np.save(os.path.join(index_dir, 'doc_len.npy'), self.doc_len[:self.size])
+        np.save(os.path.join(index_dir, 'doc_boost.npy'), self.doc_boost[:self.size])
+
+        with open(os.path.join(index_dir, 'vocab.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.vocab, f, ensure_ascii=False)
+
+        with open(os.path.join(index_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'size': self.size,
+                'n_docs': self.n_docs,
+                'total_len': self.total_len,
+                'k1': self.k1,
+                'b': self.b
+            }, f)
+
+    @classmethod
+    def load(cls, index_dir: str, mmap: bool = False) -> 'BM25KeywordIndex':
+        """
+        저장된 역색인 로드
+
+        Args:
+            index_dir: 저장 디렉토리
+            mmap: True이면 배열을 메모리 맵으로 로드 (여러 프로세스가 OS 페이지 캐시 공유).
+                  CSR 포스팅은 읽기 전용, 문서 길이/가중치는 삭제 시 수정되므로 copy-on-write.
+        """
+        with open(os.path.join(index_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        index = cls(k1=meta['k1'], b=meta['b'])
+        index.size = meta['size']
+        index.n_docs = meta['n_docs']
+        index.total_len = meta['total_len']
+
+        with open(os.path.join(index_dir, 'vocab.json'), 'r', encoding='utf-8') as f:
+            index.vocab = json.load(f)
+
+        postings_mode = 'r' if mmap else None
+        docs_mode = 'c' if mmap else None
+        index.offsets = np.load(os.path.join(index_dir, 'offsets.npy'), mmap_mode=postings_mode)
+        index.doc_ids = np.load(os.path.join(index_dir, 'doc_ids.npy'), mmap_mode=postings_mode)
+        index.tfs = np.load(os.path.join(index_dir, 'tfs.npy'), mmap_mode=postings_mode)
+        index.doc_len = np.load(os.path.join(index_dir, 'doc_len.npy'), mmap_mode=docs_mode)
+        index.doc_boost = np.load(os.path.join(index_dir, 'doc_boost.npy'), mmap_mode=docs_mode)
+        return index
@@ -0,0 +1,201 @@
+"""
+파편 kNN 그래프 모듈
+
+faiss_idx별 상위 M개 이웃(유사도 내림차순)을 (행 수, M) numpy 배열로 보관하여
+"관련 코드" 조회를 O(M) 배열 읽기로 처리하고, 검색 결과의 그래프 확장에 사용한다.
+이웃 계산(Faiss 검색)은 저장소가 수행하고 이 모듈은 배열 갱신과 저장만 담당한다.
+"""
+
+import os
+import json
+import numpy as np
+from typing import List, Optional, Tuple
+
+# 기본 이웃 수
+DEFAULT_NEIGHBORS = 16
+
+
+class KNNGraph:
+    """
+    faiss_idx 기준 kNN 그래프
+
+    - neighbors[idx]: 이웃 faiss_idx (유사도 내림차순, 빈 자리는 -1)
+    - scores[idx]: 이웃 유사도 (내적 또는 -L2 거리, 클수록 유사)
+
+    삭제된 파편을 가리키는 간선은 저장소가 해당 행을 다시 계산하며,
+    조회 시에도 live 비트맵으로 한 번 더 거른다.
+    """
+
+    def __init__(self, n_neighbors: int = DEFAULT_NEIGHBORS, capacity: int = 1024):
+        """
+        Args:
+            n_neighbors: 파편별 보관할 이웃 수 (M)
+            capacity: 초기 행 수
+        """
+        self.n_neighbors = n_neighbors
+        self.size = 0  # faiss_idx 상한 (ntotal)
+        self.neighbors = np.full((max(capacity, 1), n_neighbors), -1, dtype=np.int32)
+        self.scores = np.zeros((max(capacity, 1), n_neighbors), dtype=np.float32)
+
+    def reserve(self, size: int):
+        """
+        행 수를 size까지 확장 (새 행은 이웃 없음)
+
+        Args:
+            size: 새 faiss_idx 상한
+        """
+        if size > len(self.neighbors):
+            capacity = max(size, len(self.neighbors) * 2)
+            neighbors = np.full((capacity, self.n_neighbors), -1, dtype=np.int32)
+            scores = np.zeros((capacity, self.n_neighbors), dtype=np.float32)
+            neighbors[:self.size] = self.neighbors[:self.size]
+            scores[:self.size] = self.scores[:self.size]
+            self.neighbors, self.scores = neighbors, scores
+        self.size = max(self.size, size)
+
+    def set_rows(self, rows: np.ndarray, hit_ids: np.ndarray, hit_scores: np.ndarray):
+        """
+        검색 결과로 행 전체를 교체 (자기 자신과 빈 결과 제외)
+
+        Args:
+            rows: 갱신할 faiss_idx 배열
+            hit_ids: (행 수, M + 1) 검색 결과 faiss_idx (유사도 내림차순, -1은 결과 없음)
+            hit_scores: (행 수, M + 1) 검색 결과 유사도
+        """
+        for row, ids, scores in zip(rows.tolist(), hit_ids, hit_scores):
+            keep = (ids != -1) & (ids != row)
+            ids = ids[keep][:self.n_neighbors]
+            self.neighbors[row] = -1
+            self.scores[row] = 0.0
+            self.neighbors[row, :len(ids)] = ids
+            self.scores[row, :len(ids)] = scores[keep][:self.n_neighbors]
+
+    def insert(self, row: int, neighbor: int, score: float) -> bool:
+        """
+        기존 행에 이웃 하나를 순위에 맞게 삽입 (행이 가득 차면 최하위 이웃보다 유사할 때만)
+
+        Args:
+            row: 갱신할 faiss_idx
+            neighbor: 삽입할 이웃 faiss_idx
+            score: 유사도
+
+        Returns:
+            bool: 삽입 여부
+        """
+        ids = self.neighbors[row]
+        scores = self.scores[row]
+        filled = int(np.count_nonzero(ids != -1))
+        if neighbor == row or (ids[:filled] == neighbor).any():
+            return False
+        if filled == self.n_neighbors and score <= scores[-1]:
+            return False
+
+        position = int(np.searchsorted(-scores[:filled], -score, side='right'))
+        end = min(filled, self.n_neighbors - 1)
+        ids[position + 1:end + 1] = ids[position:end].copy()
+        scores[position + 1:end + 1] = scores[position:end].copy()
+        ids[position] = neighbor
+        scores[position] = score
+        return True
+
+    def clear_rows(self, rows: List[int]):
+        """삭제된 파편의 행 비우기"""
+        rows = [row for row in rows if row < self.size]
+        if rows:
+            self.neighbors[rows] = -1
+            self.scores[rows] = 0.0
+
+    def rows_referencing(self, ids: List[int]) -> np.ndarray:
+        """
+        주어진 faiss_idx를 이웃으로 가진 행 목록
+
+        Args:
+            ids: 찾을 이웃 faiss_idx 목록
+
+        Returns:
+            np.ndarray: 해당 행의 faiss_idx 배열
+        """
+        if not ids or self.size == 0:
+            return np.zeros(0, dtype=np.int64)
+        mask = np.isin(self.neighbors[:self.size], np.asarray(ids, dtype=np.int32)).any(axis=1)
+        return np.flatnonzero(mask)
+
+    def neighbors_of(self, idx: int, live: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        파편의 이웃 조회 (O(M))
+
+        Args:
+            idx: 기준 faiss_idx
+            live: 삭제되지 않은 파편 비트맵 (있으면 삭제된 이웃 제외)
+
+        Returns:
+            Tuple: (이웃 faiss_idx 배열, 유사도 배열) - 유사도 내림차순
+        """
+        if idx >= self.size:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        ids = self.neighbors[idx]
+        keep = ids != -1
+        if live is not None:
+            keep &= live[np.maximum(ids, 0)]
+        return ids[keep], self.scores[idx][keep]
+
+    def compacted(self, live_rows: np.ndarray, mapping: np.ndarray) -> 'KNNGraph':
+        """
+        삭제된 파편의 행을 뺀 새 그래프 (faiss_idx 재배치, 저장소 압축용)
+
+        Args:
+            live_rows: 남길 기존 faiss_idx (오름차순)
+            mapping: 기존 faiss_idx -> 새 faiss_idx 배열 (삭제된 파편은 -1)
+
+        Returns:
+            KNNGraph: 새 그래프 (기존 그래프는 그대로)
+        """
+        graph = KNNGraph(self.n_neighbors, capacity=len(live_rows))
+        neighbors = np.asarray(self.neighbors[live_rows])
+        scores = np.array(self.scores[live_rows], dtype=np.float32)
+        neighbors = np.where(neighbors >= 0, mapping[np.maximum(neighbors, 0)], -1).astype(np.int32)
+
+        # 삭제된 이웃이 남아 있던 자리는 행 끝으로 (유사도 순서 유지)
+        order = np.argsort(neighbors == -1, axis=1, kind='stable')
+        graph.neighbors[:len(live_rows)] = np.take_along_axis(neighbors, order, axis=1)
+        graph.scores[:len(live_rows)] = np.where(
+            graph.neighbors[:len(live_rows)] == -1, 0.0, np.take_along_axis(scores, order, axis=1)
+        )
+        graph.size = len(live_rows)
+        return graph
+
+    def nbytes(self) -> int:
+        """배열이 차지하는 바이트 수"""
+        return self.neighbors.nbytes + self.scores.nbytes
+
+    def save(self, graph_dir: str):
+        """
+        그래프 저장 (numpy 배열 + 메타 JSON)
+
+        Args:
+            graph_dir: 저장 디렉토리
+        """
+        os.makedirs(graph_dir, exist_ok=True)
+        np.save(os.path.join(graph_dir, 'neighbors.npy'), self.neighbors[:self.size])
+        np.save(os.path.join(graph_dir, 'scores.npy'), self.scores[:self.size])
+        with open(os.path.join(graph_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'size': self.size, 'n_neighbors': self.n_neighbors}, f)
+
+    @classmethod
+    def load(cls, graph_dir: str, mmap: bool = False) -> 'KNNGraph':
+        """
+        저장된 그래프 로드
+
+        Args:
+            graph_dir: 저장 디렉토리
+            mmap: True이면 copy-on-write 메모리 맵으로 로드 (증분 갱신은 프로세스 안에서만 반영)
+        """
+        with open(os.path.join(graph_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        graph = cls(n_neighbors=meta['n_neighbors'], capacity=1)
+        mode = 'c' if mmap else None
+        graph.neighbors = np.load(os.path.join(graph_dir, 'neighbors.npy'), mmap_mode=mode)
+        graph.scores = np.load(os.path.join(graph_dir, 'scores.npy'), mmap_mode=mode)
+        graph.size = meta['size']
+        return graph
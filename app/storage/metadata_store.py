@@ -0,0 +1,470 @@
+"""
+SQLite 기반 컬럼형 메타데이터 저장소 모듈
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from urllib.parse import quote
+from collections.abc import Mapping
+from typing import List, Dict, Any, Optional, Iterator, Iterable, Tuple
+
+# 검색 결과에 사용되는 작은 필드 (full_content 제외)
+SMALL_FIELDS = [
+    'type',
+    'name',
+    'file_path',
+    'file_name',
+    'content_preview',
+    'component_name',
+    'props',
+    'components'
+]
+
+# JSON으로 직렬화하여 저장하는 리스트형 필드
+LIST_FIELDS = ('props', 'components')
+
+
+class SQLiteMetadataStore(Mapping):
+    """
+    파편 메타데이터를 SQLite 컬럼으로 저장하는 저장소
+
+    작은 필드는 fragments 테이블에, 전체 코드 내용은 contents 테이블에
+    분리 저장하여 검색 결과 조회 시 full_content를 읽지 않도록 한다.
+    fragment_id -> 메타데이터(작은 필드) 매핑처럼 사용할 수 있다.
+    """
+
+    def __init__(self, db_path: str, mmap_size: int = 0, read_only: bool = False):
+        """
+        Args:
+            db_path: SQLite 데이터베이스 파일 경로
+            mmap_size: SQLite 메모리 맵 크기(바이트). 0이면 일반 read() 사용,
+                       양수이면 여러 프로세스가 OS 페이지 캐시를 공유
+            read_only: 읽기 전용으로 열기. 스냅샷 DB(롤백 저널 모드)는 불변 파일로 잠금 없이 읽고,
+                       다른 프로세스가 쓰는 중일 수 있는 WAL 모드 DB는 mode=ro로 WAL까지 읽는다.
+        """
+        self.db_path = db_path
+        self.mmap_size = mmap_size
+        self.read_only = read_only
+        self.immutable = read_only and not self._is_wal_database(db_path)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []  # 모든 스레드의 연결 (close_all용)
+        self._connections_lock = threading.Lock()
+
+        if not read_only:
+            self._init_schema()
+
+    @staticmethod
+    def _is_wal_database(db_path: str) -> bool:
+        """DB 헤더의 파일 형식 번호(18~19번째 바이트)로 WAL 모드 여부 확인 (스냅샷 백업은 롤백 저널 모드)"""
+        try:
+            with open(db_path, 'rb') as f:
+                header = f.read(20)
+        except OSError:
+            return False
+        return len(header) == 20 and header[18] == 2
+
+    def _connect(self) -> sqlite3.Connection:
+        """스레드별 연결 반환 (읽기는 스레드마다 독립 연결 사용)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if self.read_only:
+                # immutable=1은 WAL 파일을 무시하므로 쓰기 중인 DB에는 mode=ro 사용
+                option = 'immutable=1' if self.immutable else 'mode=ro'
+                uri = f"file:{quote(os.path.abspath(self.db_path))}?{option}"
+                conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            else:
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            if self.mmap_size:
+                conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _init_schema(self):
+        """테이블 생성"""
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fragments (
+                    idx INTEGER PRIMARY KEY,
+                    id TEXT NOT NULL UNIQUE,
+                    type TEXT NOT NULL DEFAULT '',
+                    name TEXT NOT NULL DEFAULT '',
+                    file_path TEXT NOT NULL DEFAULT '',
+                    file_name TEXT NOT NULL DEFAULT '',
+                    content_preview TEXT NOT NULL DEFAULT '',
+                    component_name TEXT,
+                    props TEXT,
+                    components TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS contents (
+                    idx INTEGER PRIMARY KEY,
+                    full_content TEXT NOT NULL DEFAULT ''
+                )
+            """)
+            # 추가/삭제 변경 로그 (체크포인트 이후 변경분을 인덱스에 재적용하기 위한 write-ahead log)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS change_log (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    op TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    id TEXT NOT NULL,
+                    metadata TEXT NOT NULL,
+                    vector BLOB,
+                    semantic_vector BLOB
+                )
+            """)
+
+    def _row_to_metadata(self, row: Tuple) -> Dict[str, Any]:
+        """fragments 테이블 행(idx, id 제외)을 메타데이터 딕셔너리로 변환"""
+        metadata = {}
+        for field, value in zip(SMALL_FIELDS, row):
+            if value is None:
+                # 컴포넌트 전용 필드는 값이 없으면 키 자체를 생략
+                continue
+            if field in LIST_FIELDS:
+                value = json.loads(value)
+            metadata[field] = value
+        return metadata
+
+    def _metadata_to_row(self, metadata: Dict[str, Any]) -> List[Any]:
+        """메타데이터 딕셔너리를 fragments 테이블 컬럼 값으로 변환"""
+        row = []
+        for field in SMALL_FIELDS:
+            value = metadata.get(field)
+            if value is not None and field in LIST_FIELDS:
+                value = json.dumps(value, ensure_ascii=False)
+            elif value is None and field not in ('component_name',) + LIST_FIELDS:
+                value = ''
+            row.append(value)
+        return row
+
+    # Mapping 인터페이스
+    def __getitem__(self, fragment_id: str) -> Dict[str, Any]:
+        columns = ', '.join(SMALL_FIELDS)
+        row = self._connect().execute(
+            f"SELECT {columns} FROM fragments WHERE id = ?", (fragment_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(fragment_id)
+        return self._row_to_metadata(row)
+
+    def __contains__(self, fragment_id: object) -> bool:
+        row = self._connect().execute(
+            "SELECT 1 FROM fragments WHERE id = ?", (fragment_id,)
+        ).fetchone()
+        return row is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for (fragment_id,) in self._connect().execute("SELECT id FROM fragments ORDER BY idx"):
+            yield fragment_id
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM fragments").fetchone()[0]
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """전체 (fragment_id, 메타데이터) 순회 (단일 쿼리)"""
+        columns = ', '.join(SMALL_FIELDS)
+        cursor = self._connect().execute(f"SELECT id, {columns} FROM fragments ORDER BY idx")
+        for row in cursor:
+            yield row[0], self._row_to_metadata(row[1:])
+
+    def iter_rows(self) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+        """전체 (faiss_idx, fragment_id, 메타데이터) 순회 (보조 인덱스 재구성용)"""
+        columns = ', '.join(SMALL_FIELDS)
+        cursor = self._connect().execute(f"SELECT idx, id, {columns} FROM fragments ORDER BY idx")
+        for row in cursor:
+            yield row[0], row[1], self._row_to_metadata(row[2:])
+
+    def iter_documents(self) -> Iterator[Tuple[int, str, str, str]]:
+        """전체 (faiss_idx, type, name, full_content) 순회 (키워드 색인 재구성용)"""
+        cursor = self._connect().execute(
+            "SELECT f.idx, f.type, f.name, c.full_content FROM fragments f "
+            "JOIN contents c ON c.idx = f.idx ORDER BY f.idx"
+        )
+        yield from cursor
+
+    def get_many(self, fragment_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        여러 파편의 메타데이터(작은 필드)를 한 번에 조회
+
+        Args:
+            fragment_ids: 조회할 파편 ID 목록
+
+        Returns:
+            Dict[str, Dict]: fragment_id -> 메타데이터
+        """
+        fragment_ids = list(fragment_ids)
+        if not fragment_ids:
+            return {}
+
+        columns = ', '.join(SMALL_FIELDS)
+        placeholders = ', '.join('?' * len(fragment_ids))
+        cursor = self._connect().execute(
+            f"SELECT id, {columns} FROM fragments WHERE id IN ({placeholders})", fragment_ids
+        )
+        return {row[0]: self._row_to_metadata(row[1:]) for row in cursor}
+
+    def get_content(self, fragment_id: str) -> Optional[str]:
+        """
+        파편의 전체 코드 내용 조회 (요청 시에만 로드)
+
+        Args:
+            fragment_id: 파편 ID
+
+        Returns:
+            Optional[str]: 전체 내용 또는 None
+        """
+        row = self._connect().execute(
+            "SELECT c.full_content FROM fragments f JOIN contents c ON c.idx = f.idx WHERE f.id = ?",
+            (fragment_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get_contents(self, fragment_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        여러 파편의 전체 코드 내용을 한 번에 조회 (top-k 결과용)
+
+        Args:
+            fragment_ids: 조회할 파편 ID 목록
+
+        Returns:
+            Dict[str, str]: fragment_id -> 전체 내용
+        """
+        fragment_ids = list(fragment_ids)
+        if not fragment_ids:
+            return {}
+
+        placeholders = ', '.join('?' * len(fragment_ids))
+        cursor = self._connect().execute(
+            "SELECT f.id, c.full_content FROM fragments f JOIN contents c ON c.idx = f.idx "
+            f"WHERE f.id IN ({placeholders})",
+            fragment_ids
+        )
+        return {fragment_id: content for fragment_id, content in cursor}
+
+    def put_many(self, entries: List[Tuple[int, str, Dict[str, Any]]]):
+        """
+        메타데이터 일괄 저장 (단일 트랜잭션)
+
+        Args:
+            entries: (faiss_idx, fragment_id, metadata) 목록.
+                     metadata의 full_content는 contents 테이블에 저장된다.
+        """
+        if not entries:
+            return
+
+        columns = ', '.join(['idx', 'id'] + SMALL_FIELDS)
+        placeholders = ', '.join('?' * (len(SMALL_FIELDS) + 2))
+        fragment_rows = []
+        content_rows = []
+        for idx, fragment_id, metadata in entries:
+            fragment_rows.append([idx, fragment_id] + self._metadata_to_row(metadata))
+            content_rows.append((idx, metadata.get('full_content', '')))
+
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO fragments ({columns}) VALUES ({placeholders})", fragment_rows
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO contents (idx, full_content) VALUES (?, ?)", content_rows
+            )
+
+    def remove_many(self, fragment_ids: Iterable[str]):
+        """
+        메타데이터 일괄 삭제 (단일 트랜잭션)
+
+        Args:
+            fragment_ids: 삭제할 파편 ID 목록
+        """
+        fragment_ids = [(fragment_id,) for fragment_id in fragment_ids]
+        if not fragment_ids:
+            return
+
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.executemany(
+                "DELETE FROM contents WHERE idx IN (SELECT idx FROM fragments WHERE id = ?)", fragment_ids
+            )
+            conn.executemany("DELETE FROM fragments WHERE id = ?", fragment_ids)
+
+    def commit_changes(self, records: List[Tuple[str, int, str, Dict[str, Any], Optional[bytes], Optional[bytes]]]) -> int:
+        """
+        메타데이터 변경과 변경 로그를 하나의 트랜잭션으로 기록
+        
+        인덱스 파일은 이 로그를 재적용하여 복구되므로, 트랜잭션이 커밋되지 않으면
+        메타데이터와 인덱스 어느 쪽에도 변경이 남지 않는다.
+
+        Args:
+            records: (op, faiss_idx, fragment_id, metadata, vector, semantic_vector) 목록.
+                     op는 'add' 또는 'remove', 벡터는 float32 바이트 (삭제는 None)
+
+        Returns:
+            int: 마지막 변경 로그 번호
+        """
+        if not records:
+            return self.last_change_seq()
+
+        columns = ', '.join(['idx', 'id'] + SMALL_FIELDS)
+        placeholders = ', '.join('?' * (len(SMALL_FIELDS) + 2))
+
+        conn = self._connect()
+        with self._write_lock, conn:
+            for op, idx, fragment_id, metadata, vector, semantic_vector in records:
+                if op == 'add':
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO fragments ({columns}) VALUES ({placeholders})",
+                        [idx, fragment_id] + self._metadata_to_row(metadata)
+                    )
+                    conn.execute(
+                        "INSERT OR REPLACE INTO contents (idx, full_content) VALUES (?, ?)",
+                        (idx, metadata.get('full_content', ''))
+                    )
+                else:
+                    conn.execute("DELETE FROM contents WHERE idx = ?", (idx,))
+                    conn.execute("DELETE FROM fragments WHERE idx = ?", (idx,))
+
+                conn.execute(
+                    "INSERT INTO change_log (op, idx, id, metadata, vector, semantic_vector) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (op, idx, fragment_id, json.dumps(metadata, ensure_ascii=False), vector, semantic_vector)
+                )
+            seq = conn.execute("SELECT MAX(seq) FROM change_log").fetchone()[0]
+        return seq
+
+    def iter_changes(self, after_seq: int = 0) -> Iterator[Tuple[int, str, int, str, Dict[str, Any], Optional[bytes], Optional[bytes]]]:
+        """
+        체크포인트 이후의 변경 로그 순회
+
+        Args:
+            after_seq: 이 번호 이후의 로그만 반환
+
+        Returns:
+            Iterator: (seq, op, faiss_idx, fragment_id, metadata, vector, semantic_vector)
+        """
+        cursor = self._connect().execute(
+            "SELECT seq, op, idx, id, metadata, vector, semantic_vector FROM change_log "
+            "WHERE seq > ? ORDER BY seq",
+            (after_seq,)
+        )
+        for seq, op, idx, fragment_id, metadata, vector, semantic_vector in cursor:
+            yield seq, op, idx, fragment_id, json.loads(metadata), vector, semantic_vector
+
+    def last_change_seq(self) -> int:
+        """마지막으로 기록된 변경 로그 번호 (로그를 정리한 뒤에도 단조 증가)"""
+        row = self._connect().execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'change_log'"
+        ).fetchone()
+        return row[0] if row else 0
+
+    def truncate_changes(self, upto_seq: int):
+        """
+        체크포인트에 반영된 변경 로그 삭제
+
+        Args:
+            upto_seq: 이 번호 이하의 로그 삭제
+        """
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.execute("DELETE FROM change_log WHERE seq <= ?", (upto_seq,))
+
+    def renumber(self, id_to_idx: Dict[str, int]) -> int:
+        """
+        저장소 압축 후 파편의 faiss_idx 재배치 (이미 맞는 행은 건너뛰므로 다시 호출해도 안전)
+
+        압축은 순서를 보존하므로(새 번호 <= 기존 번호) 기존 번호 오름차순으로 옮기면
+        옮길 자리의 행은 이미 옮겨진 상태다.
+
+        Args:
+            id_to_idx: fragment_id -> 새 faiss_idx (압축된 체크포인트의 ID 매핑)
+
+        Returns:
+            int: 옮긴 파편 수
+        """
+        conn = self._connect()
+        moves = [
+            (id_to_idx[fragment_id], idx)
+            for idx, fragment_id in conn.execute("SELECT idx, id FROM fragments ORDER BY idx")
+            if fragment_id in id_to_idx and id_to_idx[fragment_id] != idx
+        ]
+        if not moves:
+            return 0
+
+        with self._write_lock, conn:
+            conn.executemany("UPDATE contents SET idx = ? WHERE idx = ?", moves)
+            conn.executemany("UPDATE fragments SET idx = ? WHERE idx = ?", moves)
+        return len(moves)
+
+    def clear(self):
+        """모든 메타데이터 및 변경 로그 삭제"""
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.execute("DELETE FROM fragments")
+            conn.execute("DELETE FROM contents")
+            conn.execute("DELETE FROM change_log")
+
+    def import_legacy_json(self, json_path: str, id_to_idx: Dict[str, int]) -> int:
+        """
+        기존 단일 JSON 메타데이터 파일을 SQLite로 이관
+
+        Args:
+            json_path: 기존 메타데이터 JSON 파일 경로
+            id_to_idx: fragment_id -> faiss_idx 매핑
+
+        Returns:
+            int: 이관된 파편 수
+        """
+        with open(json_path, 'r', encoding='utf-8') as f:
+            legacy_metadata = json.load(f)
+
+        entries = [
+            (id_to_idx[fragment_id], fragment_id, metadata)
+            for fragment_id, metadata in legacy_metadata.items()
+            if fragment_id in id_to_idx
+        ]
+        self.put_many(entries)
+        return len(entries)
+
+    def backup(self, dest_path: str):
+        """
+        현재 DB의 일관된 복사본 생성 (SQLite 온라인 백업, 스냅샷용)
+
+        복사본은 단일 파일로 읽을 수 있도록 롤백 저널 모드로 전환한다.
+
+        Args:
+            dest_path: 복사본 파일 경로
+        """
+        dest = sqlite3.connect(dest_path)
+        try:
+            self._connect().backup(dest)
+            dest.execute("PRAGMA journal_mode=DELETE")
+            dest.commit()
+        finally:
+            dest.close()
+
+    def close(self):
+        """현재 스레드의 연결 종료"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            with self._connections_lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+            conn.close()
+            self._local.conn = None
+
+    def close_all(self):
+        """모든 스레드의 연결 종료 (저장소를 닫을 때, 이후 호출은 새 연결을 엶)"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
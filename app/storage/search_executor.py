@@ -0,0 +1,64 @@
+"""
+1차 검색기 동시 실행 모듈
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+
+class SearchExecutor:
+    """
+    벡터 / 키워드 / 의미 기반 검색기를 스레드 풀에서 동시에 실행
+
+    Faiss 검색과 torch 추론은 GIL을 해제하므로 스레드로도 병렬 실행된다.
+    검색기별 제한 시간을 넘긴 결과는 기다리지 않고 도착한 결과만 반환한다.
+    """
+
+    def __init__(self, max_workers: int = 3, default_timeout: Optional[float] = None):
+        """
+        Args:
+            max_workers: 동시에 실행할 최대 검색기 수
+            default_timeout: 검색기별 기본 제한 시간(초), None이면 무제한
+        """
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='retriever')
+
+    def run(self, tasks: Dict[str, Callable[[], Any]],
+            timeouts: Optional[Dict[str, float]] = None) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        검색기들을 동시에 실행하고 제한 시간 안에 도착한 결과 수집
+
+        Args:
+            tasks: 검색기 이름 -> 인자 없는 실행 함수
+            timeouts: 검색기 이름 -> 제한 시간(초). 모든 제한 시간은 실행 시작 시점 기준.
+
+        Returns:
+            Tuple: (검색기 이름 -> 결과, 제한 시간 초과 또는 오류로 결과가 없는 검색기 이름 목록)
+        """
+        timeouts = timeouts or {}
+        start = time.monotonic()
+        futures = {name: self._pool.submit(task) for name, task in tasks.items()}
+
+        results = {}
+        missed = []
+        for name, future in futures.items():
+            timeout = timeouts.get(name, self.default_timeout)
+            remaining = None if timeout is None else max(0.0, start + timeout - time.monotonic())
+            try:
+                results[name] = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                # 이미 실행 중인 작업은 중단할 수 없으므로 결과만 버림
+                future.cancel()
+                missed.append(name)
+                print(f"검색기 제한 시간 초과 ({name}, {timeout}초) - 도착한 결과로 계속 진행")
+            except Exception as e:
+                missed.append(name)
+                print(f"검색기 실행 오류 ({name}): {str(e)}")
+
+        return results, missed
+
+    def shutdown(self, wait: bool = False):
+        """스레드 풀 종료"""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,274 @@
+"""
+파편 메타데이터 보조 인덱스 모듈 (file_path / type / component_name)
+"""
+
+import pickle
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple, Set, Iterable
+
+# 보조 인덱스로 처리할 수 있는 필터 키 (directory는 file_path 접두사 매칭)
+INDEXED_FILTER_KEYS = ('type', 'file_path', 'component_name', 'directory')
+
+# 필터링 대상이 아닌 검색 옵션 키
+NON_FILTER_KEYS = ('rerank', 'ensemble_weight', 'ensemble_weights', 'query_text', 'fusion')
+
+
+class SecondaryIndex:
+    """
+    faiss_idx 기준 보조 인덱스 및 집계 통계
+
+    - file_path -> faiss_idx 집합
+    - type -> faiss_idx 비트맵 (np.bool_ 배열)
+    - component_name -> faiss_idx 집합
+    - 타입별 개수, 파일 수, 컴포넌트 수를 추가/삭제 시점에 갱신
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Args:
+            capacity: 비트맵 초기 크기
+        """
+        self.capacity = max(capacity, 1)
+        self.size = 0  # 지금까지 할당된 faiss_idx 상한 (ntotal)
+
+        self.by_file: Dict[str, Set[int]] = {}
+        self.by_component: Dict[str, Set[int]] = {}
+        self.type_bitmaps: Dict[str, np.ndarray] = {}
+        self.live = np.zeros(self.capacity, dtype=bool)  # 삭제되지 않은 파편 비트맵
+
+        # 집계 통계
+        self.type_counts: Dict[str, int] = {}
+        self.component_fragment_counts: Dict[str, int] = {}  # component 타입 파편의 이름별 개수
+        self.live_count = 0
+
+    def _ensure_capacity(self, idx: int):
+        """비트맵 크기를 idx가 들어갈 만큼 확장 (2배씩 증가)"""
+        if idx < self.capacity:
+            return
+
+        new_capacity = self.capacity
+        while new_capacity <= idx:
+            new_capacity *= 2
+
+        self.live = self._grow(self.live, new_capacity)
+        for frag_type in self.type_bitmaps:
+            self.type_bitmaps[frag_type] = self._grow(self.type_bitmaps[frag_type], new_capacity)
+        self.capacity = new_capacity
+
+    @staticmethod
+    def _grow(bitmap: np.ndarray, capacity: int) -> np.ndarray:
+        grown = np.zeros(capacity, dtype=bool)
+        grown[:len(bitmap)] = bitmap
+        return grown
+
+    def add(self, idx: int, metadata: Dict[str, Any]):
+        """
+        파편 추가 시 인덱스 갱신
+
+        Args:
+            idx: faiss_idx
+            metadata: 파편 메타데이터
+        """
+        self._ensure_capacity(idx)
+        self.size = max(self.size, idx + 1)
+        if self.live[idx]:
+            return
+
+        frag_type = metadata.get('type', 'unknown') or 'unknown'
+        file_path = metadata.get('file_path', '')
+        component_name = metadata.get('component_name', '')
+
+        self.live[idx] = True
+        self.live_count += 1
+
+        if frag_type not in self.type_bitmaps:
+            self.type_bitmaps[frag_type] = np.zeros(self.capacity, dtype=bool)
+        self.type_bitmaps[frag_type][idx] = True
+        self.type_counts[frag_type] = self.type_counts.get(frag_type, 0) + 1
+
+        if file_path:
+            self.by_file.setdefault(file_path, set()).add(idx)
+
+        if component_name:
+            self.by_component.setdefault(component_name, set()).add(idx)
+            if frag_type == 'component':
+                self.component_fragment_counts[component_name] = \
+                    self.component_fragment_counts.get(component_name, 0) + 1
+
+    def remove(self, idx: int, metadata: Dict[str, Any]):
+        """
+        파편 삭제 시 인덱스 갱신
+
+        Args:
+            idx: faiss_idx
+            metadata: 삭제되는 파편의 메타데이터
+        """
+        if idx >= self.capacity or not self.live[idx]:
+            return
+
+        frag_type = metadata.get('type', 'unknown') or 'unknown'
+        file_path = metadata.get('file_path', '')
+        component_name = metadata.get('component_name', '')
+
+        self.live[idx] = False
+        self.live_count -= 1
+
+        if frag_type in self.type_bitmaps:
+            self.type_bitmaps[frag_type][idx] = False
+            self.type_counts[frag_type] -= 1
+            if self.type_counts[frag_type] <= 0:
+                del self.type_counts[frag_type]
+                del self.type_bitmaps[frag_type]
+
+        self._discard(self.by_file, file_path, idx)
+        self._discard(self.by_component, component_name, idx)
+
+        if component_name and frag_type == 'component':
+            self.component_fragment_counts[component_name] -= 1
+            if self.component_fragment_counts[component_name] <= 0:
+                del self.component_fragment_counts[component_name]
+
+    @staticmethod
+    def _discard(mapping: Dict[str, Set[int]], key: str, idx: int):
+        ids = mapping.get(key)
+        if ids is None:
+            return
+        ids.discard(idx)
+        if not ids:
+            del mapping[key]
+
+    def ids_for_file(self, file_path: str) -> List[int]:
+        """특정 파일의 faiss_idx 목록 (정렬됨)"""
+        return sorted(self.by_file.get(file_path, ()))
+
+    def ids_for_component(self, component_name: str) -> List[int]:
+        """특정 컴포넌트의 faiss_idx 목록 (정렬됨)"""
+        return sorted(self.by_component.get(component_name, ()))
+
+    def type_bitmap(self, frag_type: str) -> np.ndarray:
+        """특정 타입의 faiss_idx 비트맵 (길이: size)"""
+        bitmap = self.type_bitmaps.get(frag_type)
+        if bitmap is None:
+            return np.zeros(self.size, dtype=bool)
+        return bitmap[:self.size]
+
+    def live_bitmap(self) -> np.ndarray:
+        """삭제되지 않은 파편 비트맵 (길이: size)"""
+        return self.live[:self.size]
+
+    def _ids_bitmap(self, ids: Iterable[int]) -> np.ndarray:
+        bitmap = np.zeros(self.size, dtype=bool)
+        ids = np.fromiter(ids, dtype=np.int64)
+        if len(ids):
+            bitmap[ids] = True
+        return bitmap
+
+    def _key_bitmap(self, key: str, value: Any) -> np.ndarray:
+        """단일 필터 키/값에 해당하는 비트맵"""
+        if key == 'type':
+            return self.type_bitmap(value).copy()
+        if key == 'file_path':
+            return self._ids_bitmap(self.by_file.get(value, ()))
+        if key == 'directory':
+            return self._ids_bitmap(self._directory_ids(value))
+        return self._ids_bitmap(self.by_component.get(value, ()))
+
+    def _directory_ids(self, directory: str) -> Iterable[int]:
+        """디렉토리 하위 파일들의 faiss_idx (파일 수에 비례)"""
+        prefix = directory.rstrip('/\\')
+        for file_path, ids in self.by_file.items():
+            if file_path.startswith(prefix) and file_path[len(prefix):len(prefix) + 1] in ('/', '\\'):
+                yield from ids
+
+    def match(self, filters: Optional[Dict[str, Any]]) -> Tuple[Optional[np.ndarray], Dict[str, Any]]:
+        """
+        필터를 보조 인덱스로 처리할 수 있는 부분과 나머지로 분리
+
+        Args:
+            filters: 필터 조건 (값이 리스트면 하나라도 일치하면 통과)
+
+        Returns:
+            Tuple: (통과 파편 비트맵 또는 None, 보조 인덱스로 처리하지 못한 나머지 필터)
+        """
+        if not filters:
+            return None, {}
+
+        bitmap = None
+        residual = {}
+        for key, value in filters.items():
+            if key in NON_FILTER_KEYS:
+                continue
+            if key not in INDEXED_FILTER_KEYS:
+                residual[key] = value
+                continue
+
+            values = value if isinstance(value, list) else [value]
+            key_bitmap = np.zeros(self.size, dtype=bool)
+            for v in values:
+                key_bitmap |= self._key_bitmap(key, v)
+
+            bitmap = key_bitmap if bitmap is None else (bitmap & key_bitmap)
+
+        if bitmap is not None:
+            bitmap &= self.live_bitmap()
+
+        return bitmap, residual
+
+    def stats(self) -> Dict[str, Any]:
+        """O(1) 집계 통계"""
+        return {
+            'fragment_count': self.live_count,
+            'fragment_types': dict(self.type_counts),
+            'file_counts': len(self.by_file),
+            'component_count': len(self.component_fragment_counts)
+        }
+
+    def save(self, path: str):
+        """보조 인덱스 저장"""
+        with open(path, 'wb') as f:
+            pickle.dump({
+                'size': self.size,
+                'by_file': self.by_file,
+                'by_component': self.by_component,
+                'type_bitmaps': {t: np.packbits(b[:self.size]) for t, b in self.type_bitmaps.items()},
+                'live': np.packbits(self.live[:self.size]),
+                'type_counts': self.type_counts,
+                'component_fragment_counts': self.component_fragment_counts,
+                'live_count': self.live_count
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'SecondaryIndex':
+        """저장된 보조 인덱스 로드"""
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+
+        size = data['size']
+        index = cls(capacity=max(size, 1024))
+        index.size = size
+        index.by_file = data['by_file']
+        index.by_component = data['by_component']
+        index.live[:size] = np.unpackbits(data['live'], count=size).astype(bool)
+        for frag_type, packed in data['type_bitmaps'].items():
+            bitmap = np.zeros(index.capacity, dtype=bool)
+            bitmap[:size] = np.unpackbits(packed, count=size).astype(bool)
+            index.type_bitmaps[frag_type] = bitmap
+        index.type_counts = data['type_counts']
+        index.component_fragment_counts = data['component_fragment_counts']
+        index.live_count = data['live_count']
+        return index
+
+    @classmethod
+    def build(cls, rows: Iterable[Tuple[int, str, Dict[str, Any]]], size: int) -> 'SecondaryIndex':
+        """
+        메타데이터 전체로부터 보조 인덱스 재구성
+
+        Args:
+            rows: (faiss_idx, fragment_id, metadata) 목록
+            size: faiss 인덱스의 ntotal
+        """
+        index = cls(capacity=max(size, 1024))
+        for idx, _, metadata in rows:
+            index.add(idx, metadata)
+        index.size = size
+        return index
@@ -0,0 +1,765 @@
+"""
+샤드 벡터 저장소 모듈
+
+파편을 N개의 샤드(로컬 워커 프로세스 또는 소켓으로 연결된 샤드 노드)에 나누어 저장하고,
+코디네이터가 각 샤드의 1차 검색을 동시에 실행(scatter)한 뒤 결과를 모아(gather)
+전역 결합과 재랭킹을 한 번만 수행한다.
+
+샤드 노드 연결은 pickle로 주고받으므로 항상 인증 키를 사용한다. 키는 SHARD_AUTHKEY 환경 변수,
+없으면 키 파일(기본 {data-dir}/shard.key, 없으면 0600으로 생성)에서 읽고, 코디네이터에도 같은 키를 넘긴다.
+유닉스 소켓 주소는 소유자 전용(0700) 디렉토리에 만든다.
+
+샤드 노드 단독 실행:
+    python -m app.storage.sharded_store --address 127.0.0.1:7101 --data-dir ./data/shards/shard_00 --dimension 1024
+"""
+
+import os
+import time
+import zlib
+import argparse
+import itertools
+import threading
+import multiprocessing
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing.connection import Listener, Client
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.embedding.inference_client import check_private, load_or_create_key_file, prepare_private_dir
+from app.storage.faiss_store import FaissVectorStore
+from app.storage.fusion import fuse_results, parse_search_options
+
+# 샤드 워커가 코디네이터 요청으로 실행하는 저장소 메서드
+SHARD_METHODS = (
+    'add_fragments',
+    'remove_fragments',
+    'retrieve_batch',
+    'get_stats',
+    'get_fragments_by_file',
+    'get_fragment_contents',
+    'get_metadata',
+    'commit',
+    'save'
+)
+
+# 파편 분배 방식
+# - hash: fragment_id 해시 (샤드 간 크기가 고르게 분배됨)
+# - file: file_path 해시 (한 파일의 파편이 같은 샤드에 모임)
+PARTITION_METHODS = ('hash', 'file')
+
+# 샤드 노드 기본 인증 키 파일 이름 (샤드 data_dir 안)
+SHARD_AUTHKEY_FILE = 'shard.key'
+
+# 연결 하나에서 동시에 처리할 조회 요청 수 (변경 요청은 연결 읽기 루프에서 순서대로 처리)
+SHARD_READ_WORKERS = 4
+
+
+def parse_address(address: str):
+    """'host:port'는 TCP 주소 튜플로, 그 외는 유닉스 소켓 경로로 변환"""
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit():
+        return (host or '127.0.0.1', int(port))
+    return address
+
+
+def _dispatch(store: FaissVectorStore, method: str, args: tuple, kwargs: dict):
+    """코디네이터 요청을 샤드 저장소 메서드로 실행"""
+    if method not in SHARD_METHODS:
+        raise ValueError(f"지원하지 않는 샤드 요청: {method}")
+    if method == 'get_metadata':
+        return store.fragment_metadata.get_many(*args, **kwargs)
+    return getattr(store, method)(*args, **kwargs)
+
+
+def _serve_connection(conn, store: FaissVectorStore, write_lock: threading.Lock):
+    """
+    연결 하나의 요청 처리 루프
+
+    메시지 형식: 요청 (request_id, method, args, kwargs) -> 응답 (request_id, 성공 여부, 결과 또는 오류 메시지)
+    연결 직후 request_id 0으로 준비 완료를 알린다.
+
+    조회 요청은 스레드 풀에서 동시에 처리하므로 응답은 요청 순서와 다르게 도착할 수 있다
+    (코디네이터가 request_id로 응답을 맞춤). 변경 요청은 읽기 루프에서 순서대로 처리한다.
+
+    Args:
+        conn: multiprocessing Connection
+        store: 샤드 저장소
+        write_lock: 저장소 변경 요청 직렬화용 잠금 (여러 연결이 같은 저장소를 공유)
+    """
+    send_lock = threading.Lock()
+
+    def reply(request_id: int, method: str, args: tuple, kwargs: dict):
+        try:
+            response = (request_id, True, _dispatch(store, method, args, kwargs))
+        except Exception as e:
+            response = (request_id, False, f"{type(e).__name__}: {str(e)}")
+        with send_lock:
+            conn.send(response)
+
+    conn.send((0, True, store.index.ntotal))
+    with ThreadPoolExecutor(max_workers=SHARD_READ_WORKERS, thread_name_prefix='shard-read') as readers:
+        while True:
+            try:
+                request_id, method, args, kwargs = conn.recv()
+            except (EOFError, OSError):
+                break
+
+            if method == 'close':
+                readers.shutdown(wait=True)
+                with send_lock:
+                    conn.send((request_id, True, None))
+                break
+
+            if method == 'retrieve_batch' or method.startswith('get_'):
+                readers.submit(reply, request_id, method, args, kwargs)
+            else:
+                with write_lock:
+                    reply(request_id, method, args, kwargs)
+    conn.close()
+
+
+def _run_local_shard(conn, store_kwargs: Dict[str, Any]):
+    """로컬 워커 프로세스 진입점 (파이프 하나로 코디네이터와 통신)"""
+    try:
+        store = FaissVectorStore(**store_kwargs)
+    except Exception as e:
+        conn.send((0, False, f"{type(e).__name__}: {str(e)}"))
+        return
+    _serve_connection(conn, store, threading.Lock())
+    store.search_executor.shutdown()
+
+
+def serve_shard(address: str, store_kwargs: Dict[str, Any], authkey: bytes):
+    """
+    샤드 노드 실행: 저장소를 열고 소켓에서 코디네이터 연결을 받음 (연결마다 스레드 하나)
+
+    Args:
+        address: 'host:port' 또는 유닉스 소켓 경로 (디렉토리는 소유자 전용으로 준비)
+        store_kwargs: FaissVectorStore 생성 인자
+        authkey: 연결 인증 키 (코디네이터와 같아야 함, 서로 인증한 뒤에만 메시지를 주고받음)
+
+    Raises:
+        ValueError: 인증 키가 없음
+    """
+    if not authkey:
+        raise ValueError("샤드 노드는 인증 키 없이 시작할 수 없습니다 (SHARD_AUTHKEY 또는 키 파일).")
+
+    listen_address = parse_address(address)
+    if isinstance(listen_address, str):
+        prepare_private_dir(os.path.dirname(os.path.abspath(listen_address)))
+
+    store = FaissVectorStore(**store_kwargs)
+    write_lock = threading.Lock()
+
+    # 유닉스 소켓 파일이 만들어지는 순간부터 소유자만 접속 가능하도록 umask 적용
+    previous_umask = os.umask(0o177)
+    try:
+        listener = Listener(listen_address, authkey=authkey)
+    finally:
+        os.umask(previous_umask)
+    with listener:
+        print(f"샤드 노드 시작: {address} (벡터 수: {store.index.ntotal})")
+        while True:
+            try:
+                conn = listener.accept()
+            except KeyboardInterrupt:
+                break
+            except Exception as e:
+                print(f"샤드 연결 수락 실패: {str(e)}")
+                continue
+            threading.Thread(
+                target=_serve_connection, args=(conn, store, write_lock), daemon=True
+            ).start()
+
+
+class ShardClient:
+    """
+    샤드 하나와의 연결 (여러 스레드가 동시에 사용 가능)
+
+    요청마다 ID를 붙여 보내고, 수신 스레드 하나가 응답을 ID로 해당 요청에 전달한다.
+    여러 요청이 한 연결에서 동시에 진행되고, 제한 시간 초과로 버린 요청의 응답이
+    늦게 도착해도 다른 요청의 응답과 섞이지 않는다.
+    """
+
+    def __init__(self, name: str, conn, process: Optional[multiprocessing.Process] = None):
+        """
+        Args:
+            name: 샤드 이름 (로그용)
+            conn: multiprocessing Connection
+            process: 로컬 워커 프로세스 (원격 샤드 노드이면 None)
+        """
+        self.name = name
+        self.conn = conn
+        self.process = process
+        self._request_ids = itertools.count(1)
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, Future] = {0: Future()}  # request_id 0: 준비 완료 메시지
+        self._error: Optional[str] = None
+        self._reader = threading.Thread(target=self._read_loop, name=f"{name}-reader", daemon=True)
+        self._reader.start()
+
+    def _read_loop(self):
+        """응답을 받아 request_id로 대기 중인 요청에 전달 (연결이 끊기면 대기 중인 요청 모두 실패)"""
+        while True:
+            try:
+                response_id, ok, payload = self.conn.recv()
+            except (EOFError, OSError) as e:
+                with self._send_lock:
+                    self._error = f"샤드 연결이 끊어졌습니다 ({self.name}): {str(e) or type(e).__name__}"
+                    pending = list(self._pending.values())
+                for future in pending:
+                    if not future.done():
+                        future.set_exception(RuntimeError(self._error))
+                return
+
+            with self._send_lock:
+                future = self._pending.get(response_id)
+            if future is None:
+                continue  # 제한 시간을 넘겨 버린 요청의 응답
+            if ok:
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(f"샤드 요청 실패 ({self.name}): {payload}"))
+
+    def send(self, method: str, *args, **kwargs) -> int:
+        """요청 전송 후 요청 ID 반환"""
+        with self._send_lock:
+            if self._error is not None:
+                raise RuntimeError(self._error)
+            request_id = next(self._request_ids)
+            self._pending[request_id] = Future()
+            try:
+                self.conn.send((request_id, method, args, kwargs))
+            except Exception:
+                del self._pending[request_id]
+                raise
+        return request_id
+
+    def receive(self, request_id: int, timeout: Optional[float] = None):
+        """
+        요청 ID에 해당하는 응답 수신
+
+        Args:
+            request_id: send()가 반환한 요청 ID
+            timeout: 제한 시간(초), None이면 무제한
+
+        Returns:
+            샤드 메서드 실행 결과
+        """
+        with self._send_lock:
+            future = self._pending[request_id]
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            raise TimeoutError(f"샤드 응답 제한 시간 초과 ({self.name}, {timeout}초)")
+        finally:
+            with self._send_lock:
+                self._pending.pop(request_id, None)
+
+    def close(self, timeout: float = 10.0):
+        """샤드 연결 종료 (로컬 워커 프로세스도 종료)"""
+        try:
+            self.receive(self.send('close'), timeout=timeout)
+        except Exception:
+            pass
+        self.conn.close()
+        self._reader.join(timeout)
+        if self.process is not None:
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+
+
+class _ShardedMetadata:
+    """FaissVectorStore.fragment_metadata와 같은 조회 인터페이스 (모든 샤드에서 모아 반환)"""
+
+    def __init__(self, store: 'ShardedVectorStore'):
+        self._store = store
+
+    def get_many(self, fragment_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        merged = {}
+        for result in self._store._call_all('get_metadata', list(fragment_ids)):
+            merged.update(result)
+        return merged
+
+    def get(self, fragment_id: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([fragment_id]).get(fragment_id)
+
+
+class ShardedVectorStore:
+    """
+    여러 샤드에 나누어 저장하는 벡터 저장소 (scatter-gather 검색)
+
+    각 샤드는 독립된 FaissVectorStore(별도 프로세스)이므로 코퍼스 크기는 프로세스 하나의
+    메모리를, 검색 처리량은 GIL 하나를 넘어 확장된다. 코디네이터는 쿼리 의미 임베딩을
+    한 번만 계산해 샤드에 전달하고, 샤드별 검색기 결과를 전역으로 병합한 뒤
+    결과 결합과 Cross-Encoder 재랭킹을 한 번만 수행한다.
+
+    키워드(BM25) 점수의 IDF는 샤드별 통계로 계산되므로 단일 저장소와 점수가 약간 다를 수 있다.
+
+        {data_dir}/shards/shard_00/   # 샤드 0의 FaissVectorStore data_dir
+        {data_dir}/shards/shard_01/
+        ...
+    """
+
+    def __init__(self,
+                 dimension: int,
+                 num_shards: int = 2,
+                 index_type: str = 'Cosine',
+                 data_dir: str = './data',
+                 index_name: str = 'vue_todo_fragments',
+                 cross_encoder=None,
+                 semantic_encoder=None,
+                 fusion_method: str = 'max',
+                 partition: str = 'hash',
+                 shard_addresses: Optional[List[str]] = None,
+                 authkey: Optional[bytes] = None,
+                 shard_timeout: Optional[float] = None,
+                 retriever_timeouts: Optional[Dict[str, float]] = None,
+                 use_mmap: bool = False,
+                 read_only: bool = False):
+        """
+        Args:
+            dimension: 벡터 차원 수
+            num_shards: 로컬 워커 프로세스 수 (shard_addresses가 있으면 무시)
+            index_type: 인덱스 타입 ('L2', 'IP', 'Cosine')
+            data_dir: 데이터 저장 디렉토리 (로컬 샤드는 {data_dir}/shards/shard_{번호})
+            index_name: 인덱스 이름
+            cross_encoder: CrossEncoder 인스턴스 (코디네이터에서 한 번만 재랭킹)
+            semantic_encoder: SemanticEncoder 인스턴스 (코디네이터에서만 사용, 없으면 처음 필요할 때 로드)
+            fusion_method: 기본 결과 결합 방식 ('max', 'minmax', 'zscore', 'rrf')
+            partition: 파편 분배 방식 (PARTITION_METHODS 중 하나)
+            shard_addresses: 이미 실행 중인 샤드 노드 주소 목록 ('host:port' 또는 유닉스 소켓 경로)
+            authkey: 샤드 노드 연결 인증 키 (shard_addresses를 쓰면 필수, 샤드 노드와 같은 키)
+            shard_timeout: 검색 시 샤드 응답 제한 시간(초). 넘긴 샤드는 제외하고 결합한다.
+            retriever_timeouts: 샤드 내부 검색기별 제한 시간(초)
+            use_mmap: 로컬 샤드의 인덱스를 메모리 맵으로 로드
+            read_only: 로컬 샤드를 읽기 전용으로 열기
+
+        Raises:
+            ValueError: 지원하지 않는 분배 방식 또는 shard_addresses에 인증 키가 없음
+            PermissionError: 유닉스 소켓 디렉토리가 소유자 전용이 아님
+        """
+        if partition not in PARTITION_METHODS:
+            raise ValueError(f"지원하지 않는 분배 방식: {partition} (지원: {', '.join(PARTITION_METHODS)})")
+        if shard_addresses and not authkey:
+            raise ValueError("샤드 노드에 연결하려면 인증 키(authkey)가 필요합니다.")
+
+        self.dimension = dimension
+        self.index_type = index_type
+        self.data_dir = data_dir
+        self.index_name = index_name
+        self.cross_encoder = cross_encoder
+        self.semantic_encoder = semantic_encoder
+        self.fusion_method = fusion_method
+        self.partition = partition
+        self.shard_timeout = shard_timeout
+        self.fragment_metadata = _ShardedMetadata(self)
+
+        if shard_addresses:
+            self.shards = [self._connect_shard(address, authkey) for address in shard_addresses]
+        else:
+            self.shards = self._start_local_shards(num_shards, {
+                'dimension': dimension,
+                'index_type': index_type,
+                'index_name': index_name,
+                'fusion_method': fusion_method,
+                'retriever_timeouts': retriever_timeouts,
+                'use_mmap': use_mmap,
+                'read_only': read_only
+            })
+
+        # 모든 샤드의 준비 완료 대기 (로컬 샤드는 병렬로 로드됨)
+        try:
+            counts = [shard.receive(0) for shard in self.shards]
+        except Exception:
+            self.close()
+            raise
+        print(f"샤드 저장소 준비 완료 (샤드 수: {len(self.shards)}, 샤드별 벡터 수: {counts})")
+
+    @staticmethod
+    def _connect_shard(address: str, authkey: bytes) -> ShardClient:
+        """샤드 노드 연결 (유닉스 소켓은 소유자 전용 디렉토리에 있을 때만)"""
+        connect_address = parse_address(address)
+        if isinstance(connect_address, str):
+            check_private(os.path.dirname(os.path.abspath(connect_address)), directory=True)
+        return ShardClient(address, Client(connect_address, authkey=authkey))
+
+    def _start_local_shards(self, num_shards: int, store_kwargs: Dict[str, Any]) -> List[ShardClient]:
+        """로컬 워커 프로세스로 샤드 시작 (torch/Faiss 스레드와 fork가 섞이지 않도록 spawn 사용)"""
+        context = multiprocessing.get_context('spawn')
+        shards = []
+        for i in range(num_shards):
+            parent_conn, child_conn = context.Pipe()
+            kwargs = dict(store_kwargs, data_dir=os.path.join(self.data_dir, 'shards', f"shard_{i:02d}"))
+            process = context.Process(
+                target=_run_local_shard,
+                args=(child_conn, kwargs),
+                name=f"shard-{i:02d}",
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            shards.append(ShardClient(f"shard-{i:02d}", parent_conn, process))
+        return shards
+
+    def _call_all(self, method: str, *args, timeout: Optional[float] = None,
+                  shard_args: Optional[List[Tuple[tuple, dict]]] = None,
+                  **kwargs) -> List[Any]:
+        """
+        모든 샤드에 요청을 보내고(scatter) 응답을 모음(gather)
+
+        샤드 연결은 여러 요청을 동시에 주고받으므로 여러 스레드가 동시에 호출할 수 있다.
+
+        Args:
+            method: 샤드 메서드 이름 (SHARD_METHODS)
+            timeout: 전체 제한 시간(초). None이면 모든 응답을 기다리고,
+                     값이 있으면 넘긴 샤드는 결과에서 제외한다.
+            shard_args: 샤드별 (args, kwargs) 목록 (있으면 공통 args/kwargs 대신 사용)
+
+        Returns:
+            List: 샤드 순서대로 응답 (제한 시간을 넘긴 샤드는 None)
+        """
+        request_ids = []
+        for i, shard in enumerate(self.shards):
+            call_args, call_kwargs = shard_args[i] if shard_args else (args, kwargs)
+            request_ids.append(shard.send(method, *call_args, **call_kwargs))
+
+        start = time.monotonic()
+        results = []
+        for shard, request_id in zip(self.shards, request_ids):
+            remaining = None if timeout is None else max(0.0, start + timeout - time.monotonic())
+            try:
+                results.append(shard.receive(request_id, timeout=remaining))
+            except TimeoutError as e:
+                print(f"{str(e)} - 도착한 샤드 결과로 계속 진행")
+                results.append(None)
+        return results
+
+    def shard_for(self, fragment: Dict[str, Any]) -> int:
+        """파편이 저장될 샤드 번호 (프로세스와 실행에 관계없이 같은 값)"""
+        if self.partition == 'file':
+            key = fragment.get('metadata', {}).get('file_path', '') or fragment['id']
+        else:
+            key = fragment['id']
+        return zlib.crc32(key.encode('utf-8')) % len(self.shards)
+
+    def _get_semantic_encoder(self):
+        """의미 임베딩 인코더 반환 (없으면 처음 사용할 때 로드)"""
+        if self.semantic_encoder is None:
+            from app.embedding.semantic_encoder import SemanticEncoder
+            self.semantic_encoder = SemanticEncoder()
+        return self.semantic_encoder
+
+    def add_fragments(self, fragments: List[Dict[str, Any]], embeddings: Dict[str, np.ndarray],
+                      semantic_embeddings: Optional[Dict[str, np.ndarray]] = None):
+        """
+        코드 파편 및 임베딩을 샤드에 나누어 추가
+
+        의미 임베딩은 코디네이터에서 한 번에 계산해 전달하므로 샤드 워커는 인코더를 로드하지 않는다.
+
+        Args:
+            fragments: 코드 파편 목록
+            embeddings: fragment_id를 키로 하는 임베딩 딕셔너리
+            semantic_embeddings: fragment_id를 키로 하는 의미 임베딩 딕셔너리 (없으면 일괄 생성)
+        """
+        fragments = [fragment for fragment in fragments if fragment['id'] in embeddings]
+        if not fragments:
+            print("추가할 새 벡터가 없습니다.")
+            return
+
+        semantic_embeddings = dict(semantic_embeddings or {})
+        missing = [fragment for fragment in fragments if fragment['id'] not in semantic_embeddings]
+        if missing:
+            vectors = self._get_semantic_encoder().encode([
+                FaissVectorStore._semantic_text(FaissVectorStore._extract_metadata(fragment))
+                for fragment in missing
+            ])
+            semantic_embeddings.update(zip((fragment['id'] for fragment in missing), vectors))
+
+        groups = [[] for _ in self.shards]
+        for fragment in fragments:
+            groups[self.shard_for(fragment)].append(fragment)
+
+        shard_args = []
+        for group in groups:
+            ids = [fragment['id'] for fragment in group]
+            shard_args.append(((
+                group,
+                {fid: embeddings[fid] for fid in ids},
+                {fid: semantic_embeddings[fid] for fid in ids}
+            ), {}))
+        self._call_all('add_fragments', shard_args=shard_args)
+        print(f"샤드별 추가 파편 수: {[len(group) for group in groups]}")
+
+    def remove_fragments(self, fragment_ids: List[str]):
+        """
+        파편 삭제 (분배 방식과 관계없이 모든 샤드에 전달, 없는 ID는 샤드에서 무시)
+
+        Args:
+            fragment_ids: 삭제할 fragment_id 목록
+        """
+        self._call_all('remove_fragments', list(fragment_ids))
+
+    def commit(self):
+        """모든 샤드의 대기 중인 변경 커밋"""
+        self._call_all('commit')
+
+    def save(self):
+        """모든 샤드의 변경을 커밋하고 체크포인트 저장"""
+        self._call_all('save')
+
+    def search(self, query_vector: np.ndarray, k: int = 5,
+               filters: Optional[Dict[str, Any]] = None,
+               rerank: bool = False) -> List[Dict[str, Any]]:
+        """
+        쿼리 벡터와 유사한 코드 파편 검색 (FaissVectorStore.search와 같은 인터페이스)
+
+        Args:
+            query_vector: 쿼리 벡터
+            k: 반환할 결과 수
+            filters: 필터링 조건 및 검색 옵션 (query_text, ensemble_weight, ensemble_weights, fusion)
+            rerank: Cross-Encoder로 재랭킹 수행 여부
+
+        Returns:
+            List[Dict]: 검색 결과 목록
+        """
+        filters, options = parse_search_options(filters)
+        return self._search_many(
+            query_vectors=np.asarray(query_vector).reshape(1, -1),
+            query_texts=[options['query_text']],
+            k=k,
+            filters=filters,
+            options=options,
+            rerank=rerank
+        )[0]
+
+    def search_batch(self, query_vectors: np.ndarray, query_texts: Optional[List[str]] = None,
+                     k: int = 5, filters: Optional[Dict[str, Any]] = None,
+                     rerank: bool = False) -> List[List[Dict[str, Any]]]:
+        """
+        여러 쿼리를 한 번에 검색 (FaissVectorStore.search_batch와 같은 인터페이스)
+
+        Args:
+            query_vectors: (쿼리 수, 차원) 쿼리 벡터 배열
+            query_texts: 쿼리 문자열 목록 (키워드/의미 기반 검색 및 재랭킹용)
+            k: 쿼리별 반환할 결과 수
+            filters: 필터링 조건 및 앙상블 옵션 (모든 쿼리 공통)
+            rerank: Cross-Encoder로 재랭킹 수행 여부
+
+        Returns:
+            List[List[Dict]]: 쿼리별 검색 결과 목록
+        """
+        query_vectors = np.asarray(query_vectors).reshape(-1, self.dimension)
+        if query_texts is not None and len(query_texts) != len(query_vectors):
+            raise ValueError("query_texts와 query_vectors의 개수가 다릅니다.")
+
+        filters, options = parse_search_options(filters)
+        return self._search_many(
+            query_vectors=query_vectors,
+            query_texts=query_texts or [None] * len(query_vectors),
+            k=k,
+            filters=filters,
+            options=options,
+            rerank=rerank
+        )
+
+    def _search_many(self, query_vectors: np.ndarray, query_texts: List[Optional[str]], k: int,
+                     filters: Dict[str, Any], options: Dict[str, Any],
+                     rerank: bool) -> List[List[Dict[str, Any]]]:
+        """
+        scatter-gather 검색: 샤드별 1차 검색 -> 검색기별 전역 병합 -> 결과 결합 -> 재랭킹
+
+        Args:
+            query_vectors: (쿼리 수, 차원) 쿼리 벡터 배열
+            query_texts: 쿼리 문자열 목록
+            k: 쿼리별 반환할 결과 수
+            filters: 필터링 조건 (검색 옵션 제거됨)
+            options: parse_search_options에서 분리한 검색 옵션
+            rerank: Cross-Encoder로 재랭킹 수행 여부
+
+        Returns:
+            List[List[Dict]]: 쿼리별 검색 결과 목록
+
+        Raises:
+            ValueError: 지원하지 않는 검색 옵션 (graph_expand, dependency_expand)
+        """
+        # kNN 그래프는 샤드 안의 이웃만 가지므로 전역 그래프 확장과 결과가 다르고,
+        # 의존성 그래프는 샤드에 전달되지 않으므로 확장 옵션은 무시하지 않고 거부
+        if options['graph_expand']:
+            raise ValueError("샤드 저장소는 graph_expand 옵션을 지원하지 않습니다.")
+        if options['dependency_expand']:
+            raise ValueError("샤드 저장소는 dependency_expand 옵션을 지원하지 않습니다.")
+
+        candidate_k = k * 4 if rerank else k  # 재랭킹 시 더 많은 후보 검색
+
+        # 쿼리 의미 임베딩은 코디네이터에서 한 번만 계산
+        texts = [text for text in query_texts if text]
+        semantic = options.get('semantic', True)
+        semantic_query_vectors = self._get_semantic_encoder().encode(texts) if texts and semantic else None
+
+        shard_results = self._call_all(
+            'retrieve_batch', query_vectors, query_texts,
+            k=candidate_k, filters=filters, semantic_query_vectors=semantic_query_vectors,
+            semantic=semantic, timeout=self.shard_timeout
+        )
+        shard_results = [result for result in shard_results if result is not None]
+
+        combined_per_query = []
+        for i, query_text in enumerate(query_texts):
+            # 검색기별로 모든 샤드의 후보를 점수 순으로 병합
+            lists = {}
+            for name in ('vector', 'keyword', 'semantic'):
+                merged = [hit for result in shard_results for hit in result[i][name]]
+                merged.sort(key=lambda hit: hit['score'], reverse=True)
+                lists[name] = merged[:candidate_k]
+
+            if query_text and (lists['keyword'] or lists['semantic']):
+                combined_per_query.append(fuse_results(
+                    lists,
+                    weights=options['weights'],
+                    k=candidate_k,
+                    method=options['fusion'] or self.fusion_method
+                ))
+            else:
+                combined_per_query.append(lists['vector'])
+
+        # Cross-Encoder 재랭킹 (모든 샤드의 후보를 합친 뒤 한 번만)
+        text_positions = [i for i, text in enumerate(query_texts) if text]
+        if rerank and self.cross_encoder and text_positions:
+            try:
+                reranked = self.cross_encoder.rerank_batch(
+                    queries=[query_texts[i] for i in text_positions],
+                    passages_list=[combined_per_query[i] for i in text_positions],
+                    top_k=k
+                )
+                for position, results in zip(text_positions, reranked):
+                    combined_per_query[position] = results
+            except Exception as e:
+                print(f"재랭킹 중 오류 발생: {str(e)}")
+
+        return [results[:k] for results in combined_per_query]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        벡터 저장소 통계 정보 (모든 샤드 합계)
+
+        파일/컴포넌트 수는 샤드별 값의 합이므로 partition='file'일 때만 정확하고,
+        'hash'이면 여러 샤드에 걸친 파일이 중복 집계된다.
+
+        Returns:
+            Dict: 통계 정보
+        """
+        shard_stats = self._call_all('get_stats')
+
+        fragment_types = {}
+        for stats in shard_stats:
+            for name, count in stats['fragment_types'].items():
+                fragment_types[name] = fragment_types.get(name, 0) + count
+
+        stats = {
+            'vector_count': sum(stats['vector_count'] for stats in shard_stats),
+            'dimension': self.dimension,
+            'index_type': self.index_type,
+            'fragment_types': fragment_types,
+            'file_counts': sum(stats['file_counts'] for stats in shard_stats),
+            'component_count': sum(stats['component_count'] for stats in shard_stats),
+            'shards': [
+                {'name': shard.name, 'vector_count': stats['vector_count']}
+                for shard, stats in zip(self.shards, shard_stats)
+            ]
+        }
+
+        if self.cross_encoder:
+            stats['cross_encoder'] = {
+                'model_name': self.cross_encoder.model_name,
+                'enabled': True
+            }
+        else:
+            stats['cross_encoder'] = {
+                'enabled': False
+            }
+
+        return stats
+
+    def get_fragments_by_file(self, file_path: str) -> List[Dict[str, Any]]:
+        """
+        특정 파일의 모든 파편 검색
+
+        Args:
+            file_path: 파일 경로
+
+        Returns:
+            List[Dict]: 파편 목록
+        """
+        return [fragment for result in self._call_all('get_fragments_by_file', file_path) for fragment in result]
+
+    def get_fragment_content(self, fragment_id: str) -> str:
+        """
+        파편의 전체 코드 내용 조회
+
+        Args:
+            fragment_id: 파편 ID
+
+        Returns:
+            str: 전체 내용 (없으면 빈 문자열)
+        """
+        return self.get_fragment_contents([fragment_id]).get(fragment_id, '')
+
+    def get_fragment_contents(self, fragment_ids: List[str]) -> Dict[str, str]:
+        """
+        여러 파편의 전체 코드 내용을 한 번에 조회
+
+        Args:
+            fragment_ids: 파편 ID 목록
+
+        Returns:
+            Dict[str, str]: fragment_id -> 전체 내용
+        """
+        merged = {}
+        for result in self._call_all('get_fragment_contents', list(fragment_ids)):
+            merged.update(result)
+        return merged
+
+    def close(self):
+        """모든 샤드 연결 종료 (로컬 워커 프로세스 종료)"""
+        for shard in self.shards:
+            shard.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='샤드 노드 실행')
+    parser.add_argument('--address', type=str, required=True, help="수신 주소 ('host:port' 또는 유닉스 소켓 경로)")
+    parser.add_argument('--data-dir', type=str, required=True, help='샤드 데이터 디렉토리')
+    parser.add_argument('--dimension', type=int, required=True, help='벡터 차원 수')
+    parser.add_argument('--index-name', type=str, default='vue_todo_fragments', help='인덱스 이름')
+    parser.add_argument('--index-type', type=str, default='Cosine', help="인덱스 타입 ('L2', 'IP', 'Cosine')")
+    parser.add_argument('--mmap', action='store_true', help='인덱스를 메모리 맵으로 로드')
+    parser.add_argument('--authkey-file', type=str, default=None,
+                        help=f'인증 키 파일 (SHARD_AUTHKEY가 없을 때 사용, 기본 {{data-dir}}/{SHARD_AUTHKEY_FILE}, 없으면 0600으로 생성)')
+    parser.add_argument('--read-only', action='store_true',
+                        help='읽기 전용으로 열기 (스냅샷 디렉토리 또는 다른 프로세스가 쓰는 중인 샤드 디렉토리)')
+    args = parser.parse_args()
+
+    authkey = os.environ.get('SHARD_AUTHKEY', '').encode('utf-8')
+    if not authkey:
+        key_path = args.authkey_file or os.path.join(args.data_dir, SHARD_AUTHKEY_FILE)
+        os.makedirs(os.path.dirname(os.path.abspath(key_path)), exist_ok=True)
+        authkey = load_or_create_key_file(key_path)
+
+    serve_shard(
+        args.address,
+        {
+            'dimension': args.dimension,
+            'index_type': args.index_type,
+            'data_dir': args.data_dir,
+            'index_name': args.index_name,
+            'use_mmap': args.mmap,
+            'read_only': args.read_only
+        },
+        authkey=authkey
+    )
+
+
+if __name__ == "__main__":
+    main()
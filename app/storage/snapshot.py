@@ -0,0 +1,157 @@
+"""
+버전별 인덱스 스냅샷 모듈
+
+인덱서가 만든 체크포인트와 메타데이터 DB를 불변 스냅샷 디렉토리로 게시하고,
+API 서버는 LATEST가 가리키는 스냅샷을 읽기 전용으로 로드한다.
+"""
+
+import os
+import time
+import shutil
+from typing import List, Optional
+
+# 보관할 스냅샷 수
+KEEP_SNAPSHOTS = 3
+
+
+def _link_or_copy(src: str, dst: str):
+    """하드 링크로 복사 (체크포인트 파일은 불변이므로 공유 가능), 실패 시 일반 복사"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class SnapshotManager:
+    """
+    스냅샷 디렉토리 관리
+
+    스냅샷 하나는 FaissVectorStore의 data_dir 레이아웃과 같으므로
+    FaissVectorStore(data_dir=스냅샷 경로, read_only=True)로 바로 열 수 있다.
+
+        {snapshot_root}/
+            LATEST                              # 최신 스냅샷 버전 (v{번호}-{게시 시각})
+            {version}/faiss/{index_name}_checkpoints/{checkpoint}/...
+            {version}/faiss/{index_name}_checkpoints/CURRENT
+            {version}/metadata/{index_name}_metadata.db
+    """
+
+    def __init__(self, snapshot_root: str, index_name: str = 'vue_todo_fragments'):
+        """
+        Args:
+            snapshot_root: 스냅샷 루트 디렉토리
+            index_name: 인덱스 이름
+        """
+        self.snapshot_root = snapshot_root
+        self.index_name = index_name
+        self.latest_path = os.path.join(snapshot_root, 'LATEST')
+
+    def path(self, version: str) -> str:
+        """스냅샷 버전의 디렉토리 경로"""
+        return os.path.join(self.snapshot_root, version)
+
+    def versions(self) -> List[str]:
+        """게시가 완료된 스냅샷 버전 목록 (오래된 순)"""
+        if not os.path.isdir(self.snapshot_root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.snapshot_root)
+            if not name.startswith('.') and os.path.isdir(self.path(name))
+        )
+
+    def _next_number(self) -> int:
+        """다음 스냅샷 번호 (LATEST는 정리되지 않으므로 번호가 재사용되지 않음)"""
+        numbers = [0]
+        for version in self.versions():
+            try:
+                numbers.append(int(version.split('-', 1)[0].lstrip('v')))
+            except ValueError:
+                continue
+        return max(numbers) + 1
+
+    def latest(self) -> Optional[str]:
+        """LATEST가 가리키는 스냅샷 버전 (없으면 None)"""
+        if not os.path.exists(self.latest_path):
+            return None
+        with open(self.latest_path, 'r', encoding='utf-8') as f:
+            version = f.read().strip()
+        return version if version and os.path.isdir(self.path(version)) else None
+
+    def publish(self, vector_store, keep: int = KEEP_SNAPSHOTS) -> str:
+        """
+        저장소의 현재 상태를 새 스냅샷으로 게시
+
+        대기 중인 변경을 커밋하고 체크포인트를 만든 뒤, 체크포인트 파일은 하드 링크로,
+        메타데이터 DB는 SQLite 백업으로 임시 디렉토리에 모은다. 디렉토리 이름 변경 후
+        LATEST를 원자적으로 교체하므로 서버는 완성된 스냅샷만 보게 된다.
+
+        Args:
+            vector_store: FaissVectorStore 인스턴스 (쓰기 가능)
+            keep: 보관할 스냅샷 수
+
+        Returns:
+            str: 게시된 스냅샷 버전
+        """
+        vector_store.commit()
+        checkpoint_path = vector_store.checkpoint()
+        if checkpoint_path is None:
+            raise RuntimeError("체크포인트 저장에 실패하여 스냅샷을 게시할 수 없습니다.")
+
+        os.makedirs(self.snapshot_root, exist_ok=True)
+        version = f"v{self._next_number():06d}-{time.strftime('%Y%m%d-%H%M%S')}"
+
+        tmp_path = os.path.join(self.snapshot_root, f".{version}.tmp")
+        checkpoint_name = os.path.basename(checkpoint_path)
+        checkpoints_dir = os.path.join(tmp_path, 'faiss', f"{self.index_name}_checkpoints")
+        metadata_dir = os.path.join(tmp_path, 'metadata')
+        os.makedirs(checkpoints_dir)
+        os.makedirs(metadata_dir)
+
+        # 체크포인트 파일 공유 + CURRENT
+        shutil.copytree(
+            checkpoint_path,
+            os.path.join(checkpoints_dir, checkpoint_name),
+            copy_function=_link_or_copy
+        )
+        with open(os.path.join(checkpoints_dir, 'CURRENT'), 'w', encoding='utf-8') as f:
+            f.write(checkpoint_name)
+
+        # 메타데이터 DB 일관된 복사본
+        vector_store.fragment_metadata.backup(
+            os.path.join(metadata_dir, f"{self.index_name}_metadata.db")
+        )
+
+        # 스냅샷 반영 (디렉토리 이름 변경 후 LATEST 교체)
+        os.rename(tmp_path, self.path(version))
+        tmp_latest = f"{self.latest_path}.tmp"
+        with open(tmp_latest, 'w', encoding='utf-8') as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_latest, self.latest_path)
+
+        self.cleanup(keep)
+        print(f"스냅샷 게시 완료 (버전: {version}, 벡터 수: {vector_store.index.ntotal})")
+        return version
+
+    def cleanup(self, keep: int = KEEP_SNAPSHOTS):
+        """
+        최근 스냅샷만 남기고 정리 (LATEST와 중단된 임시 디렉토리 포함)
+
+        이미 로드된 스냅샷을 지워도 열린 파일과 메모리 맵은 유효하므로
+        서버는 교체 전까지 기존 스냅샷으로 계속 응답할 수 있다.
+
+        Args:
+            keep: 보관할 스냅샷 수
+        """
+        latest = self.latest()
+        versions = self.versions()
+        retained = set(versions[-keep:]) if keep > 0 else set()
+        if latest:
+            retained.add(latest)
+
+        for name in os.listdir(self.snapshot_root):
+            path = self.path(name)
+            if not os.path.isdir(path) or name in retained:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,444 @@
+"""
+프로젝트별 벡터 저장소 레지스트리 모듈
+
+배포 하나에서 여러 저장소(프로젝트)를 서비스하기 위해 프로젝트 이름으로 FaissVectorStore를
+처음 요청될 때 열고, 메모리 예산을 넘으면 가장 오래 사용하지 않은 프로젝트부터 내린다.
+임베딩 모델과 Cross-Encoder는 opener가 모든 프로젝트에 같은 인스턴스를 넘겨 공유한다.
+
+    {projects_dir}/
+        {project}/project.json      # {'index_name', 'source_root'} (인덱서가 기록)
+        {project}/faiss/...         # FaissVectorStore data_dir 레이아웃
+        {project}/metadata/...
+        {project}/snapshots/...     # SnapshotManager 스냅샷 (있으면 최신 스냅샷을 읽기 전용으로 로드)
+"""
+
+import os
+import re
+import json
+import time
+import itertools
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable
+
+from app.storage.faiss_store import FaissVectorStore
+from app.storage.snapshot import SnapshotManager
+
+# 프로젝트 정보 파일
+PROJECT_FILE = 'project.json'
+
+# project.json이 없을 때의 인덱스 이름
+DEFAULT_INDEX_NAME = 'vue_todo_fragments'
+
+# 프로젝트 이름 규칙 (디렉토리 이름으로 사용되므로 경로 구분자 불가)
+PROJECT_NAME_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]{0,127}$')
+
+# 핸들 로드 번호 (같은 스냅샷/디렉토리를 다시 열어도 구분)
+_LOAD_IDS = itertools.count(1)
+
+
+def read_project_info(data_dir: str) -> Dict[str, Any]:
+    """
+    프로젝트 정보 로드
+
+    Args:
+        data_dir: 프로젝트 데이터 디렉토리
+
+    Returns:
+        Dict: {'index_name', 'source_root'} (파일이 없으면 기본값)
+    """
+    info = {'index_name': DEFAULT_INDEX_NAME, 'source_root': None}
+    path = os.path.join(data_dir, PROJECT_FILE)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            info.update(json.load(f))
+    return info
+
+
+def write_project_info(data_dir: str, source_root: str, index_name: str = DEFAULT_INDEX_NAME):
+    """
+    프로젝트 정보 기록 (인덱서에서 호출)
+
+    Args:
+        data_dir: 프로젝트 데이터 디렉토리
+        source_root: 원본 소스 루트 디렉토리 (응답의 상대 경로 기준)
+        index_name: 인덱스 이름
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, PROJECT_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'index_name': index_name, 'source_root': os.path.abspath(source_root)}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class ProjectHandle:
+    """
+    메모리에 올라온 프로젝트 하나 (저장소 + 로드 정보)
+
+    요청은 acquire()로 참조를 잡고 끝나면 release()로 반납한다. 레지스트리에서 빠진(retire)
+    핸들의 저장소는 사용 중인 참조가 모두 반납될 때 한 번만 닫힌다.
+    """
+
+    def __init__(self, name: str, data_dir: str, store: FaissVectorStore,
+                 version: Optional[str], info: Dict[str, Any]):
+        """
+        Args:
+            name: 프로젝트 이름
+            data_dir: 프로젝트 데이터 디렉토리
+            store: 열린 벡터 저장소
+            version: 로드한 스냅샷 버전 (None이면 데이터 디렉토리를 직접 로드)
+            info: 프로젝트 정보 (read_project_info)
+        """
+        self.name = name
+        self.data_dir = data_dir
+        self.store = store
+        self.version = version
+        self.index_name = info['index_name']
+        self.source_root = info.get('source_root')
+        self.memory_bytes = store.memory_usage()
+        self.loaded_at = time.time()
+        self.load_id = next(_LOAD_IDS)
+
+        self._refs = 0
+        self._retired = False
+        self._ref_lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """
+        요청 처리용 참조 잡기
+
+        Returns:
+            bool: 성공 여부 (이미 레지스트리에서 빠진 핸들이면 False)
+        """
+        with self._ref_lock:
+            if self._retired:
+                return False
+            self._refs += 1
+            return True
+
+    def release(self):
+        """acquire로 잡은 참조 반납 (레지스트리에서 빠진 뒤 마지막 참조이면 저장소 닫기)"""
+        with self._ref_lock:
+            self._refs -= 1
+            close = self._retired and self._refs == 0
+        if close:
+            self._close()
+
+    def retire(self):
+        """레지스트리에서 빠질 때 호출 (사용 중인 참조가 없으면 바로, 있으면 마지막 반납 시 저장소 닫기)"""
+        with self._ref_lock:
+            if self._retired:
+                return
+            self._retired = True
+            close = self._refs == 0
+        if close:
+            self._close()
+
+    def _close(self):
+        """저장소 닫기 (DB 연결 / 전용 검색 실행기)"""
+        try:
+            self.store.close()
+        except Exception as e:
+            print(f"프로젝트 저장소 닫기 실패 (프로젝트: {self.name}): {str(e)}")
+
+    @property
+    def cache_version(self) -> str:
+        """
+        검색 결과 캐시 키에 쓰는 인덱스 버전
+
+        스냅샷 교체나 다시 열기(load_id), 같은 프로세스 안의 색인 변경(store.generation)이
+        있으면 값이 바뀌므로 이전 결과는 더 이상 조회되지 않는다.
+        """
+        return f"{self.version or 'local'}/{self.load_id}/{self.store.generation}"
+
+    def relative_path(self, file_path: str) -> str:
+        """
+        응답용 상대 경로 (소스 루트 디렉토리 이름부터 시작, 예: todo-web/src/App.vue)
+
+        Args:
+            file_path: 파편의 절대 파일 경로
+
+        Returns:
+            str: 상대 경로 (소스 루트 밖이거나 루트를 모르면 원래 경로)
+        """
+        if not self.source_root:
+            return file_path
+        root = self.source_root.rstrip(os.sep)
+        if file_path != root and not file_path.startswith(root + os.sep):
+            return file_path
+        return os.path.join(os.path.basename(root), os.path.relpath(file_path, root))
+
+    def info(self) -> Dict[str, Any]:
+        """상태 조회용 정보"""
+        return {
+            'project': self.name,
+            'index_version': self.version,
+            'vector_count': self.store.index.ntotal,
+            'memory_bytes': self.memory_bytes,
+            'loaded_at': self.loaded_at
+        }
+
+
+class StoreRegistry:
+    """
+    프로젝트 이름 -> 벡터 저장소 (지연 로드 + 메모리 예산 기반 LRU 제거)
+
+    제거된 저장소를 사용 중인 요청은 자신이 가진 참조로 끝까지 처리되므로
+    (스냅샷 교체와 같은 방식) 제거 시 별도의 대기가 필요 없다. 요청은 acquire()로 받은 핸들을
+    끝나면 release()로 반납하며, 제거되거나 교체된 저장소는 마지막 반납 때 닫힌다.
+    """
+
+    def __init__(self,
+                 projects_dir: str,
+                 opener: Callable[[str, str, bool], FaissVectorStore],
+                 memory_budget: int = 0,
+                 default_project: str = 'default',
+                 default_data_dir: Optional[str] = None):
+        """
+        Args:
+            projects_dir: 프로젝트 데이터 디렉토리들의 루트
+            opener: (data_dir, index_name, read_only) -> FaissVectorStore (공유 모델 주입)
+            memory_budget: 상주 저장소 메모리 예산(바이트), 0이면 무제한
+            default_project: 요청에 프로젝트가 없을 때 사용할 프로젝트 이름
+            default_data_dir: 기본 프로젝트의 데이터 디렉토리
+                              (projects_dir 아래에 없을 때 사용, 기존 단일 프로젝트 배포 호환)
+        """
+        self.projects_dir = projects_dir
+        self.opener = opener
+        self.memory_budget = memory_budget
+        self.default_project = default_project
+        self.default_data_dir = default_data_dir
+
+        self._resident: 'OrderedDict[str, ProjectHandle]' = OrderedDict()  # 오래 사용하지 않은 순
+        self._lock = threading.Lock()
+        self._open_locks: Dict[str, threading.Lock] = {}
+
+    def project_dir(self, project: Optional[str] = None) -> str:
+        """
+        프로젝트 데이터 디렉토리
+
+        Args:
+            project: 프로젝트 이름 (None이면 기본 프로젝트)
+
+        Returns:
+            str: 데이터 디렉토리 경로
+        """
+        project = project or self.default_project
+        if not PROJECT_NAME_PATTERN.match(project):
+            raise ValueError(f"잘못된 프로젝트 이름: {project}")
+
+        path = os.path.join(self.projects_dir, project)
+        if project == self.default_project and self.default_data_dir and not os.path.isdir(path):
+            return self.default_data_dir
+        return path
+
+    def projects(self) -> List[str]:
+        """서비스 가능한 프로젝트 이름 목록 (인덱스가 있는 디렉토리)"""
+        names = set()
+        if os.path.isdir(self.projects_dir):
+            for name in os.listdir(self.projects_dir):
+                if PROJECT_NAME_PATTERN.match(name) and self._exists(name):
+                    names.add(name)
+        if self._exists(self.default_project):
+            names.add(self.default_project)
+        return sorted(names)
+
+    def _exists(self, project: str) -> bool:
+        """프로젝트에 로드할 인덱스(데이터 디렉토리 또는 스냅샷)가 있는지 확인"""
+        data_dir = self.project_dir(project)
+        info = read_project_info(data_dir)
+        snapshots = SnapshotManager(os.path.join(data_dir, 'snapshots'), index_name=info['index_name'])
+        return snapshots.latest() is not None or FaissVectorStore.index_exists(data_dir, info['index_name'])
+
+    def peek(self, project: Optional[str] = None) -> Optional[ProjectHandle]:
+        """
+        이미 메모리에 있는 프로젝트만 반환 (사용 순서 갱신, 로드하지 않음)
+
+        Args:
+            project: 프로젝트 이름 (None이면 기본 프로젝트)
+
+        Returns:
+            ProjectHandle 또는 None
+        """
+        project = project or self.default_project
+        with self._lock:
+            handle = self._resident.get(project)
+            if handle is not None:
+                self._resident.move_to_end(project)
+            return handle
+
+    def get(self, project: Optional[str] = None) -> ProjectHandle:
+        """
+        프로젝트 저장소 반환 (메모리에 없으면 로드 후 예산을 넘는 프로젝트 제거)
+
+        같은 프로젝트를 동시에 요청해도 한 번만 로드한다.
+
+        Args:
+            project: 프로젝트 이름 (None이면 기본 프로젝트)
+
+        Returns:
+            ProjectHandle: 프로젝트 핸들
+        """
+        project = project or self.default_project
+        handle = self.peek(project)
+        if handle is not None:
+            return handle
+
+        with self._open_lock(project):
+            handle = self.peek(project)
+            if handle is not None:
+                return handle
+            if not self._exists(project):
+                raise FileNotFoundError(f"프로젝트를 찾을 수 없습니다: {project}")
+            return self._install(self._open(project))
+
+    def acquire(self, project: Optional[str] = None) -> ProjectHandle:
+        """
+        get()과 같지만 참조를 잡은 핸들 반환 (사용 후 handle.release() 필요)
+
+        참조를 잡기 직전에 제거/교체된 핸들이면 현재 핸들로 다시 시도한다.
+
+        Args:
+            project: 프로젝트 이름 (None이면 기본 프로젝트)
+
+        Returns:
+            ProjectHandle: 참조를 잡은 프로젝트 핸들
+        """
+        while True:
+            handle = self.get(project)
+            if handle.acquire():
+                return handle
+
+    def reload(self, project: Optional[str] = None, version: Optional[str] = None) -> Dict[str, Any]:
+        """
+        프로젝트를 스냅샷으로 다시 로드한 뒤 교체 (진행 중인 요청은 이전 저장소로 처리)
+
+        Args:
+            project: 프로젝트 이름 (None이면 기본 프로젝트)
+            version: 로드할 스냅샷 버전 (None이면 LATEST)
+
+        Returns:
+            Dict: 교체 결과
+        """
+        project = project or self.default_project
+        with self._open_lock(project):
+            snapshots = self.snapshot_manager(project)
+            version = version or snapshots.latest()
+            if version is None:
+                raise FileNotFoundError(f"게시된 스냅샷이 없습니다: {project}")
+            if version not in snapshots.versions():
+                raise FileNotFoundError(f"스냅샷을 찾을 수 없음: {version}")
+
+            current = self.peek(project)
+            if current is not None and current.version == version:
+                return {"reloaded": False, "project": project, "version": version,
+                        "vector_count": current.store.index.ntotal}
+
+            start_time = time.time()
+            handle = self._install(self._open(project, version))
+            elapsed_time = time.time() - start_time
+            print(f"스냅샷 교체 완료 (프로젝트: {project}, 버전: {version}, "
+                  f"벡터 수: {handle.store.index.ntotal}, {elapsed_time:.2f}초)")
+            return {
+                "reloaded": True,
+                "project": project,
+                "version": version,
+                "vector_count": handle.store.index.ntotal,
+                "elapsed_time": elapsed_time
+            }
+
+    def snapshot_manager(self, project: Optional[str] = None) -> SnapshotManager:
+        """프로젝트의 스냅샷 관리자"""
+        data_dir = self.project_dir(project)
+        info = read_project_info(data_dir)
+        return SnapshotManager(os.path.join(data_dir, 'snapshots'), index_name=info['index_name'])
+
+    def evict(self, project: str) -> bool:
+        """
+        프로젝트를 메모리에서 내림
+
+        Args:
+            project: 프로젝트 이름
+
+        Returns:
+            bool: 메모리에 있었는지 여부
+        """
+        with self._lock:
+            handle = self._resident.pop(project, None)
+        if handle is None:
+            return False
+        handle.retire()
+        return True
+
+    def close(self):
+        """모든 프로젝트를 내림 (사용 중인 저장소는 마지막 반납 때 닫힘)"""
+        with self._lock:
+            handles = list(self._resident.values())
+            self._resident.clear()
+        for handle in handles:
+            handle.retire()
+
+    def resident(self) -> List[Dict[str, Any]]:
+        """메모리에 있는 프로젝트 정보 (최근 사용 순)"""
+        with self._lock:
+            handles = list(self._resident.values())
+        return [handle.info() for handle in reversed(handles)]
+
+    def memory_usage(self) -> int:
+        """상주 저장소 메모리 추정치 합계 (바이트)"""
+        with self._lock:
+            return sum(handle.memory_bytes for handle in self._resident.values())
+
+    def _open_lock(self, project: str) -> threading.Lock:
+        """프로젝트별 로드 잠금"""
+        with self._lock:
+            return self._open_locks.setdefault(project, threading.Lock())
+
+    def _open(self, project: str, version: Optional[str] = None) -> ProjectHandle:
+        """
+        프로젝트 저장소 열기 (스냅샷이 있으면 읽기 전용 스냅샷, 없으면 데이터 디렉토리)
+
+        Args:
+            project: 프로젝트 이름
+            version: 스냅샷 버전 (None이면 LATEST)
+        """
+        data_dir = self.project_dir(project)
+        info = read_project_info(data_dir)
+        snapshots = SnapshotManager(os.path.join(data_dir, 'snapshots'), index_name=info['index_name'])
+        version = version or snapshots.latest()
+
+        if version:
+            store = self.opener(snapshots.path(version), info['index_name'], True)
+        else:
+            store = self.opener(data_dir, info['index_name'], False)
+        return ProjectHandle(project, data_dir, store, version, info)
+
+    def _install(self, handle: ProjectHandle) -> ProjectHandle:
+        """
+        핸들을 등록하고 메모리 예산을 넘으면 가장 오래 사용하지 않은 프로젝트부터 제거
+        (방금 등록한 프로젝트는 예산보다 커도 유지)
+        """
+        evicted = []
+        with self._lock:
+            replaced = self._resident.get(handle.name)
+            self._resident[handle.name] = handle
+            self._resident.move_to_end(handle.name)
+            if self.memory_budget > 0:
+                total = sum(h.memory_bytes for h in self._resident.values())
+                while total > self.memory_budget and len(self._resident) > 1:
+                    name, old = self._resident.popitem(last=False)
+                    total -= old.memory_bytes
+                    evicted.append(old)
+
+        # 교체/제거된 핸들은 진행 중인 요청이 모두 반납하면 닫힘
+        if replaced is not None and replaced is not handle:
+            replaced.retire()
+        for old in evicted:
+            old.retire()
+
+        print(f"프로젝트 로드 완료 (프로젝트: {handle.name}, 벡터 수: {handle.store.index.ntotal}, "
+              f"메모리: {handle.memory_bytes / (1 << 20):.1f}MB, 스냅샷: {handle.version or '없음'})")
+        if evicted:
+            print(f"메모리 예산 초과로 프로젝트 제거: {', '.join(old.name for old in evicted)}")
+        return handle
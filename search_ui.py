@@ -43,7 +43,8 @@ class CodeSearchShell(cmd.Cmd):
         """검색 쿼리를 입력하여 코드 파편 검색. 
         예: search 할일 목록 컴포넌트
         필터링: search 로그인 처리 --type=component
-        재랭킹: search 할일 추가 --rerank (Cross-Encoder 사용)"""
+        재랭킹: search 할일 추가 --rerank (Cross-Encoder 사용)
+        결합 방식: search 할일 추가 --fusion=rrf (max, minmax, zscore, rrf)"""
         
         if not arg:
             print(f"{Fore.YELLOW}검색어를 입력하세요.{Style.RESET_ALL}")
@@ -0,0 +1,60 @@
+"""
+테스트용 파편 / 임베딩 생성기와 의미 임베딩 인코더 대역
+
+모델을 내려받지 않고 저장소 동작만 검증하도록 결정적인 벡터를 만든다.
+"""
+
+import hashlib
+import numpy as np
+from typing import Any, Dict, List, Union
+
+FRAGMENT_TYPES = ('component', 'template', 'script', 'style', 'javascript', 'css')
+
+
+class StubSemanticEncoder:
+    """SemanticEncoder 대역 (텍스트 해시로 만든 정규화 벡터)"""
+
+    vector_dim = 8
+    model_name = 'stub-semantic'
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32) -> np.ndarray:
+        if isinstance(texts, str):
+            texts = [texts]
+        vectors = []
+        for text in texts:
+            digest = hashlib.md5(text.encode('utf-8')).digest()
+            vector = np.frombuffer(digest[:self.vector_dim], dtype=np.uint8).astype('float32') + 1.0
+            vectors.append(vector / np.linalg.norm(vector))
+        return np.array(vectors, dtype='float32').reshape(-1, self.vector_dim)
+
+
+def make_fragments(n: int, prefix: str = 'f') -> List[Dict[str, Any]]:
+    """
+    Vue 컴포넌트 파편 목록 생성 (파일 하나에 타입별 파편 6개)
+
+    Args:
+        n: 파편 수
+        prefix: fragment_id 접두사
+    """
+    fragments = []
+    for i in range(n):
+        fragment_type = FRAGMENT_TYPES[i % len(FRAGMENT_TYPES)]
+        component = f"Comp{i // len(FRAGMENT_TYPES)}"
+        file_path = f"/src/components/{component}.vue"
+        metadata = {'file_path': file_path, 'file_name': f"{component}.vue", 'component_name': component}
+        if fragment_type == 'component':
+            metadata.update(props=['todoItem', 'index'], components=[f"Comp{i // len(FRAGMENT_TYPES) + 1}"])
+        fragments.append({
+            'id': f"{prefix}{i}",
+            'type': fragment_type,
+            'name': f"{component}_{fragment_type}",
+            'content': f"export default {{ name: '{component}', methods: {{ addTodoItem{i}() {{}} }} }} 할일 목록 {i}",
+            'metadata': metadata
+        })
+    return fragments
+
+
+def make_embeddings(fragments: List[Dict[str, Any]], dimension: int = 16, seed: int = 0) -> Dict[str, np.ndarray]:
+    """fragment_id -> 무작위 코드 임베딩 (seed가 같으면 같은 값)"""
+    rng = np.random.default_rng(seed)
+    return {fragment['id']: rng.normal(size=dimension).astype('float32') for fragment in fragments}
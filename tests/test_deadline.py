@@ -0,0 +1,43 @@
+"""LatencyEstimator 테스트"""
+
+import pytest
+
+from app.storage import deadline
+from app.storage.deadline import LatencyEstimator
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(deadline.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_unobserved_estimate_decays(clock):
+    """건너뛰어 측정되지 않는 단계의 예상 시간은 half_life마다 절반으로 준다"""
+    estimator = LatencyEstimator(alpha=0.2, half_life=10.0)
+    estimator.observe('semantic', 2.0)
+    assert estimator.estimate('semantic') == pytest.approx(2.0)
+
+    clock[0] += 10.0
+    assert estimator.estimate('semantic') == pytest.approx(1.0)
+    clock[0] += 20.0
+    assert estimator.estimate('semantic') == pytest.approx(0.25)
+    assert estimator.stats()['semantic'] == pytest.approx(250.0)
+
+
+def test_observe_blends_with_decayed_estimate(clock):
+    """다시 측정되면 줄어든 예상 시간에 새 측정값을 반영한다"""
+    estimator = LatencyEstimator(alpha=0.5, half_life=10.0)
+    estimator.observe('rerank_pair', 4.0)
+    clock[0] += 10.0
+    estimator.observe('rerank_pair', 1.0)
+    assert estimator.estimate('rerank_pair') == pytest.approx(1.5)
+
+
+def test_zero_half_life_keeps_estimate(clock):
+    estimator = LatencyEstimator(half_life=0)
+    estimator.observe('semantic', 2.0)
+    clock[0] += 1000.0
+    assert estimator.estimate('semantic') == pytest.approx(2.0)
+    assert estimator.estimate('keyword') is None
@@ -0,0 +1,229 @@
+"""
+FaissVectorStore 변경 로그 / 체크포인트 / 트랜잭션 / 압축 테스트
+
+재시작은 같은 data_dir로 저장소를 다시 열어 확인한다 (이전 인스턴스는 닫지 않고 버려 중단을 흉내 냄).
+"""
+
+import os
+
+import pytest
+
+from app.storage.faiss_store import FaissVectorStore
+from tests.stubs import StubSemanticEncoder, make_embeddings, make_fragments
+
+DIMENSION = 16
+
+
+@pytest.fixture
+def open_store(tmp_path):
+    """같은 data_dir의 저장소를 여는 함수 (테스트 종료 시 검색 스레드 정리)"""
+    stores = []
+
+    def _open(**kwargs):
+        kwargs.setdefault('knn_neighbors', 4)
+        store = FaissVectorStore(
+            DIMENSION,
+            data_dir=str(tmp_path),
+            semantic_encoder=StubSemanticEncoder(),
+            **kwargs
+        )
+        stores.append(store)
+        return store
+
+    yield _open
+    for store in stores:
+        store.search_executor.shutdown()
+
+
+def search_signature(store, query_vector, **filters):
+    """비교용 검색 결과 (fragment_id, 점수)"""
+    filters.setdefault('query_text', 'addTodoItem 할일 목록')
+    return [
+        (result['id'], round(result['score'], 5))
+        for result in store.search(query_vector, k=5, filters=filters)
+    ]
+
+
+def assert_same_state(store, reopened):
+    assert reopened.id_to_idx == store.id_to_idx
+    assert reopened.index.ntotal == store.index.ntotal
+    assert reopened.secondary_index.stats() == store.secondary_index.stats()
+    rows = {fragment_id: idx for idx, fragment_id, _ in reopened.fragment_metadata.iter_rows()}
+    assert rows == reopened.id_to_idx
+
+
+def test_replay_after_checkpoint(open_store):
+    fragments = make_fragments(12)
+    embeddings = make_embeddings(fragments)
+    store = open_store()
+    store.add_fragments(fragments, embeddings)
+    store.remove_fragments(['f0', 'f5', 'f7'])
+    assert store.checkpoint() is not None
+
+    extra = make_fragments(6, prefix='g')
+    extra_embeddings = make_embeddings(extra, seed=1)
+    store.add_fragments(extra, extra_embeddings)
+
+    reopened = open_store()
+    assert_same_state(store, reopened)
+    # 체크포인트 이후 커밋된 추가 6건만 재적용
+    assert reopened._changes_since_checkpoint == 6
+    query = extra_embeddings['g2']
+    assert search_signature(reopened, query) == search_signature(store, query)
+    assert reopened.get_fragment_content('g2') == extra[2]['content']
+    assert 'f5' not in reopened.id_to_idx
+
+
+def test_transaction_commits_once(open_store):
+    fragments = make_fragments(6)
+    store = open_store()
+    store.add_fragments(fragments, make_embeddings(fragments))
+    seq = store.fragment_metadata.last_change_seq()
+
+    replacement = make_fragments(2, prefix='r')
+    with store.transaction():
+        store.remove_fragments(['f0', 'f1'])
+        store.add_fragments(replacement, make_embeddings(replacement, seed=1))
+        # 커밋 전에는 검색 대상에 반영되지 않음
+        assert 'f0' in store.id_to_idx and 'r0' not in store.id_to_idx
+
+    assert 'f0' not in store.id_to_idx and 'r0' in store.id_to_idx
+    assert store.fragment_metadata.last_change_seq() == seq + 4
+
+
+def test_rollback_discards_pending_changes(open_store):
+    fragments = make_fragments(6)
+    store = open_store()
+    store.add_fragments(fragments, make_embeddings(fragments))
+    seq = store.fragment_metadata.last_change_seq()
+    generation = store.generation
+
+    extra = make_fragments(3, prefix='g')
+    with pytest.raises(RuntimeError):
+        with store.transaction():
+            store.remove_fragments(['f0'])
+            store.add_fragments(extra, make_embeddings(extra, seed=1))
+            raise RuntimeError("인덱싱 중단")
+
+    assert 'f0' in store.id_to_idx and 'g0' not in store.id_to_idx
+    assert store.index.ntotal == 6
+    assert store.generation == generation
+    assert store.fragment_metadata.last_change_seq() == seq
+    assert 'g0' not in store.fragment_metadata
+
+    # 명시적 rollback()
+    with store.transaction():
+        store.remove_fragments(['f1'])
+        store.rollback()
+    assert 'f1' in store.id_to_idx
+
+    assert_same_state(store, open_store())
+
+
+def test_reopen_before_first_checkpoint(open_store):
+    fragments = make_fragments(8)
+    store = open_store()
+    store.add_fragments(fragments, make_embeddings(fragments))
+    store.remove_fragments(['f3'])
+    assert not FaissVectorStore.index_exists(store.data_dir)
+
+    # 체크포인트 없이 중단되어도 변경 로그 전체를 재적용
+    reopened = open_store()
+    assert_same_state(store, reopened)
+    assert reopened._changes_since_checkpoint == 9
+
+
+def test_reopen_after_crash_during_checkpoint(open_store, monkeypatch):
+    fragments = make_fragments(12)
+    embeddings = make_embeddings(fragments)
+    store = open_store()
+    store.add_fragments(fragments, embeddings)
+    first_checkpoint = store.checkpoint()
+
+    extra = make_fragments(4, prefix='g')
+    store.add_fragments(extra, make_embeddings(extra, seed=1))
+    store.remove_fragments(['f1', 'g0'])
+
+    # CURRENT 교체 직전에 중단: 새 체크포인트 디렉토리는 있지만 CURRENT와 변경 로그는 그대로
+    def crash(path, text):
+        raise OSError("디스크 오류")
+    monkeypatch.setattr(store, '_atomic_write_text', crash)
+    assert store.checkpoint() is None
+    assert len(list(store.fragment_metadata.iter_changes(store._checkpoint_seq))) == 6
+
+    reopened = open_store()
+    assert store._current_checkpoint() == first_checkpoint
+    assert_same_state(store, reopened)
+    assert reopened._changes_since_checkpoint == 6
+    query = embeddings['f4']
+    assert search_signature(reopened, query) == search_signature(store, query)
+
+
+def test_checkpoint_compacts_dead_rows(open_store):
+    fragments = make_fragments(30)
+    embeddings = make_embeddings(fragments)
+    store = open_store()
+    store.add_fragments(fragments, embeddings)
+    store.remove_fragments([f"f{i}" for i in range(0, 30, 3)] + [f"f{i}" for i in range(1, 30, 3)])
+
+    query = embeddings['f5']
+    before = search_signature(store, query)
+    before_filtered = search_signature(store, query, type='script')
+    similar = [result['id'] for result in store.get_similar_fragments('f5', k=3)]
+
+    # 살아 있는 파편 10 / 행 30 < compact_live_ratio(0.5)
+    assert store.checkpoint() is not None
+    assert store.index.ntotal == store.semantic_index.ntotal == 10
+    assert store.keyword_index.size == store.knn_graph.size == 10
+    assert sorted(store.id_to_idx.values()) == list(range(10))
+    assert search_signature(store, query) == before
+    assert search_signature(store, query, type='script') == before_filtered
+    assert [result['id'] for result in store.get_similar_fragments('f5', k=3)] == similar
+    assert store.get_fragment_content('f5') == fragments[5]['content']
+
+    # 압축 후 추가된 파편은 새 faiss_idx로 이어서 기록되고 재시작 시 재적용
+    extra = make_fragments(2, prefix='g')
+    store.add_fragments(extra, make_embeddings(extra, seed=1))
+    reopened = open_store()
+    assert_same_state(store, reopened)
+    assert search_signature(reopened, query) == search_signature(store, query)
+
+
+def test_reopen_after_crash_before_renumber(open_store, monkeypatch):
+    fragments = make_fragments(20)
+    embeddings = make_embeddings(fragments)
+    store = open_store()
+    store.add_fragments(fragments, embeddings)
+    store.remove_fragments([f"f{i}" for i in range(15)])
+
+    # 압축 체크포인트의 CURRENT 교체 후, 메타데이터 DB 재배치 전에 중단
+    def crash(id_to_idx):
+        raise OSError("디스크 오류")
+    monkeypatch.setattr(store.fragment_metadata, 'renumber', crash)
+    assert store.checkpoint() is not None
+    assert store._renumber_pending
+
+    reopened = open_store()
+    assert reopened.index.ntotal == 5
+    assert_same_state(store, reopened)
+    assert all(reopened.get_fragment_content(fid) for fid in reopened.id_to_idx)
+    query = embeddings['f17']
+    assert search_signature(reopened, query) == search_signature(store, query)
+
+
+def test_keyword_postings_drop_removed_documents(open_store):
+    fragments = make_fragments(6)
+    store = open_store()
+    store.add_fragments(fragments, make_embeddings(fragments))
+    for round_ in range(3):
+        replacement = make_fragments(6, prefix=f"r{round_}_")
+        with store.transaction():
+            store.remove_fragments(list(store.id_to_idx))
+            store.add_fragments(replacement, make_embeddings(replacement, seed=round_ + 1))
+        store.checkpoint(compact=False)
+
+    keyword_index = store.keyword_index
+    assert len(keyword_index.doc_ids) > 0
+    assert (keyword_index.doc_boost[keyword_index.doc_ids] > 0).all()
+    assert os.path.isdir(store._current_checkpoint())
+    assert keyword_index.n_docs == 6
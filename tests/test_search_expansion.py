@@ -0,0 +1,69 @@
+"""
+그래프 / 의존성 확장 검색 테스트
+
+확장 후보 점수는 시드 점수의 부호와 관계없이 시드보다 높아지면 안 된다 (L2 점수는 항상 음수).
+"""
+
+import numpy as np
+import pytest
+
+from app.storage.faiss_store import FaissVectorStore
+from tests.stubs import StubSemanticEncoder, make_embeddings, make_fragments
+
+DIMENSION = 16
+
+
+@pytest.fixture
+def l2_store(tmp_path):
+    store = FaissVectorStore(
+        DIMENSION,
+        index_type='L2',
+        data_dir=str(tmp_path),
+        semantic_encoder=StubSemanticEncoder(),
+        knn_neighbors=4
+    )
+    fragments = make_fragments(24)
+    embeddings = make_embeddings(fragments, dimension=DIMENSION)
+    store.add_fragments(fragments, embeddings)
+    yield store, embeddings
+    store.search_executor.shutdown()
+
+
+def query_near(embeddings, fragment_id):
+    rng = np.random.default_rng(1)
+    return embeddings[fragment_id] + rng.normal(scale=0.3, size=DIMENSION).astype('float32')
+
+
+def assert_expansion_below_seeds(plain, expanded):
+    assert all(result['score'] < 0 for result in plain)
+    assert expanded[0]['id'] == plain[0]['id']
+    plain_ids = {result['id'] for result in plain}
+    added = [result for result in expanded if result['id'] not in plain_ids]
+    assert added
+    assert all(result['score'] <= plain[0]['score'] for result in added)
+
+
+@pytest.mark.parametrize('score, weight', [(-4.0, 0.5), (4.0, 0.5), (-1.0, 0.0), (2.0, 1.5), (-2.0, -1.0)])
+def test_downweight_never_exceeds_seed(score, weight):
+    assert FaissVectorStore._downweight(score, weight) <= score
+
+
+def test_graph_expansion_on_l2_store_stays_below_seed(l2_store):
+    store, embeddings = l2_store
+    query = query_near(embeddings, 'f3')
+    plain = store.search_candidates(query, k=3)
+    expanded = store.search_candidates(query, k=3, filters={'graph_expand': 3})
+    assert_expansion_below_seeds(plain, expanded)
+
+
+def test_dependency_expansion_on_l2_store_stays_below_seed(l2_store):
+    store, embeddings = l2_store
+    files = [f"/src/components/Comp{i}.vue" for i in range(4)]
+    store.set_dependency_graph({
+        'nodes': files,
+        'edges': [[i, j, 'component'] for i in range(4) for j in range(4) if i != j]
+    })
+    query = query_near(embeddings, 'f3')
+    plain = store.search_candidates(query, k=3)
+    expanded = store.search_candidates(query, k=3, filters={'dependency_expand': 'both'})
+    assert_expansion_below_seeds(plain, expanded)
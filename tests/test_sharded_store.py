@@ -0,0 +1,201 @@
+"""
+ShardedVectorStore 테스트 (로컬 spawn 워커 2개와 단일 FaissVectorStore 결과 비교)
+
+키워드 점수는 샤드별 IDF로 계산되어 단일 저장소와 다를 수 있으므로 벡터 검색 결과만 비교한다.
+"""
+
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import AuthenticationError
+
+import numpy as np
+import pytest
+
+from app.storage.faiss_store import FaissVectorStore
+from app.storage.sharded_store import ShardClient, ShardedVectorStore, serve_shard
+from tests.stubs import StubSemanticEncoder, make_embeddings, make_fragments
+
+DIMENSION = 16
+
+
+@pytest.fixture(scope='module')
+def stores(tmp_path_factory):
+    """(샤드 저장소, 단일 저장소) - 같은 파편을 추가한 상태"""
+    fragments = make_fragments(36)
+    embeddings = make_embeddings(fragments, dimension=DIMENSION)
+
+    sharded = ShardedVectorStore(
+        DIMENSION,
+        num_shards=2,
+        data_dir=str(tmp_path_factory.mktemp('sharded')),
+        semantic_encoder=StubSemanticEncoder()
+    )
+    single = FaissVectorStore(
+        DIMENSION,
+        data_dir=str(tmp_path_factory.mktemp('single')),
+        semantic_encoder=StubSemanticEncoder()
+    )
+    sharded.add_fragments(fragments, embeddings)
+    single.add_fragments(fragments, embeddings)
+
+    yield sharded, single, embeddings
+    sharded.close()
+    single.search_executor.shutdown()
+
+
+def signature(results_per_query):
+    return [[(result['id'], round(result['score'], 5)) for result in results] for results in results_per_query]
+
+
+def test_local_shards_run_in_worker_processes(stores):
+    sharded, _, _ = stores
+    assert len(sharded.shards) == 2
+    pids = {shard.process.pid for shard in sharded.shards}
+    assert len(pids) == 2 and os.getpid() not in pids
+    assert all(shard.process.is_alive() for shard in sharded.shards)
+
+
+def test_add_and_stats_match_single_store(stores):
+    sharded, single, _ = stores
+    sharded_stats = sharded.get_stats()
+    single_stats = single.get_stats()
+    assert sharded_stats['vector_count'] == single_stats['vector_count'] == 36
+    assert sharded_stats['fragment_types'] == single_stats['fragment_types']
+    # hash 분배이므로 두 샤드 모두 파편을 가짐
+    assert all(shard['vector_count'] > 0 for shard in sharded_stats['shards'])
+    assert sum(shard['vector_count'] for shard in sharded_stats['shards']) == 36
+
+
+def test_search_batch_matches_single_store(stores):
+    sharded, single, embeddings = stores
+    queries = np.array([embeddings['f3'], embeddings['f17'], embeddings['f30']])
+
+    assert signature(sharded.search_batch(queries, k=5)) == signature(single.search_batch(queries, k=5))
+    filters = {'type': ['script', 'template']}
+    assert signature(sharded.search_batch(queries, k=5, filters=filters)) == \
+        signature(single.search_batch(queries, k=5, filters=filters))
+
+    fragment_ids = ['f3', 'f17']
+    assert sharded.get_fragment_contents(fragment_ids) == single.get_fragment_contents(fragment_ids)
+    file_path = '/src/components/Comp2.vue'
+    assert sorted(fragment['id'] for fragment in sharded.get_fragments_by_file(file_path)) == \
+        sorted(fragment['id'] for fragment in single.get_fragments_by_file(file_path))
+
+
+def test_search_with_query_text_returns_k_results(stores):
+    sharded, _, embeddings = stores
+    results = sharded.search_batch(
+        np.array([embeddings['f3']]), query_texts=['addTodoItem3 할일 목록'], k=5
+    )
+    assert len(results) == 1 and len(results[0]) == 5
+
+
+def test_concurrent_searches_match_sequential(stores):
+    """두 스레드가 같은 샤드 연결로 동시에 검색해도 각자의 응답을 받는다"""
+    sharded, _, embeddings = stores
+    batches = [
+        np.array([embeddings[f"f{i}"], embeddings[f"f{i + 1}"]]) for i in range(0, 30, 2)
+    ]
+    expected = [signature(sharded.search_batch(queries, k=5)) for queries in batches]
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        for _ in range(3):
+            results = list(pool.map(lambda queries: signature(sharded.search_batch(queries, k=5)), batches))
+            assert results == expected
+
+
+def test_shard_client_routes_out_of_order_replies():
+    """응답이 요청 순서와 다르게 도착해도 request_id로 맞춘다"""
+    coordinator_conn, shard_conn = multiprocessing.Pipe()
+
+    def reversed_server():
+        shard_conn.send((0, True, 0))
+        requests = [shard_conn.recv(), shard_conn.recv()]
+        for request_id, method, args, _ in reversed(requests):
+            shard_conn.send((request_id, True, (method, args)))
+
+    server = threading.Thread(target=reversed_server)
+    server.start()
+    client = ShardClient('stub', coordinator_conn)
+    assert client.receive(0, timeout=5) == 0
+
+    results = {}
+    first = client.send('get_stats', 1)
+    second = client.send('get_stats', 2)
+    threads = [
+        threading.Thread(target=lambda rid=rid: results.__setitem__(rid, client.receive(rid, timeout=5)))
+        for rid in (first, second)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    server.join()
+    assert results == {first: ('get_stats', (1,)), second: ('get_stats', (2,))}
+    shard_conn.close()
+    coordinator_conn.close()
+
+
+def test_remove_matches_single_store(stores):
+    sharded, single, embeddings = stores
+    removed = ['f3', 'f4', 'f17', 'f30']
+    sharded.remove_fragments(removed)
+    single.remove_fragments(removed)
+
+    assert sharded.get_stats()['vector_count'] == single.get_stats()['vector_count'] == 32
+    assert sharded.get_stats()['fragment_types'] == single.get_stats()['fragment_types']
+    queries = np.array([embeddings['f3'], embeddings['f18']])
+    results = sharded.search_batch(queries, k=5)
+    assert signature(results) == signature(single.search_batch(queries, k=5))
+    assert not {result['id'] for query_results in results for result in query_results} & set(removed)
+
+
+@pytest.mark.parametrize('option', [{'graph_expand': 3}, {'dependency_expand': 'both'}])
+def test_expansion_options_are_rejected(stores, option):
+    sharded, _, embeddings = stores
+    with pytest.raises(ValueError):
+        sharded.search(embeddings['f5'], k=5, filters=option)
+
+
+def test_shard_node_requires_authkey(tmp_path):
+    with pytest.raises(ValueError):
+        serve_shard(str(tmp_path / 'run' / 'shard.sock'), {'dimension': DIMENSION}, authkey=b'')
+    with pytest.raises(ValueError):
+        ShardedVectorStore(DIMENSION, shard_addresses=[str(tmp_path / 'run' / 'shard.sock')])
+
+
+def test_unix_shard_node_is_private_and_authenticated(tmp_path):
+    socket_path = str(tmp_path / 'run' / 'shard.sock')
+    authkey = b'test-shard-key'
+    context = multiprocessing.get_context('spawn')
+    node = context.Process(
+        target=serve_shard,
+        args=(socket_path, {'dimension': DIMENSION, 'data_dir': str(tmp_path / 'shard')}, authkey),
+        daemon=True
+    )
+    node.start()
+    try:
+        for _ in range(300):
+            if os.path.exists(socket_path):
+                break
+            time.sleep(0.05)
+        assert os.stat(os.path.dirname(socket_path)).st_mode & 0o777 == 0o700
+        assert os.stat(socket_path).st_mode & 0o777 == 0o600
+
+        with pytest.raises(AuthenticationError):
+            ShardedVectorStore(DIMENSION, shard_addresses=[socket_path], authkey=b'wrong-key')
+
+        sharded = ShardedVectorStore(
+            DIMENSION, shard_addresses=[socket_path], authkey=authkey,
+            semantic_encoder=StubSemanticEncoder()
+        )
+        try:
+            assert sharded.get_stats()['vector_count'] == 0
+        finally:
+            sharded.close()
+    finally:
+        node.terminate()
+        node.join()
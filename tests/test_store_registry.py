@@ -0,0 +1,92 @@
+"""
+StoreRegistry 테스트 (제거 / 교체된 저장소 닫기)
+
+메모리 예산을 1바이트로 두어 다른 프로젝트를 열 때마다 이전 프로젝트가 제거되게 한다.
+"""
+
+import os
+
+import pytest
+
+from app.storage.faiss_store import FaissVectorStore
+from app.storage.store_registry import StoreRegistry
+from tests.stubs import StubSemanticEncoder, make_embeddings, make_fragments
+
+DIMENSION = 16
+PROJECTS = ('alpha', 'beta')
+
+
+@pytest.fixture
+def registry(tmp_path):
+    """(레지스트리, 연 저장소 목록, 저장소별 close 호출 수)"""
+    for project in PROJECTS:
+        store = FaissVectorStore(DIMENSION, data_dir=str(tmp_path / project), semantic_encoder=StubSemanticEncoder())
+        fragments = make_fragments(6)
+        store.add_fragments(fragments, make_embeddings(fragments, dimension=DIMENSION))
+        store.save()
+        store.close()
+
+    opened = []
+    closes = {}
+
+    def opener(data_dir, index_name, read_only):
+        store = FaissVectorStore(
+            DIMENSION, data_dir=data_dir, index_name=index_name,
+            semantic_encoder=StubSemanticEncoder(), read_only=read_only
+        )
+        close = store.close
+
+        def counting_close():
+            closes[id(store)] = closes.get(id(store), 0) + 1
+            close()
+
+        store.close = counting_close
+        opened.append(store)
+        return store
+
+    registry = StoreRegistry(str(tmp_path), opener, memory_budget=1, default_project='alpha')
+    yield registry, opened, closes
+    registry.close()
+
+
+def is_closed(store, closes):
+    return closes.get(id(store), 0) == 1 and not store.fragment_metadata._connections
+
+
+def test_idle_evicted_store_is_closed(registry):
+    registry, opened, closes = registry
+    alpha = registry.get('alpha')
+    alpha.store.get_fragment_contents(['f0'])
+    registry.get('beta')
+
+    assert [info['project'] for info in registry.resident()] == ['beta']
+    assert is_closed(alpha.store, closes)
+    assert alpha.store.search_executor._pool._shutdown
+
+
+def test_store_in_use_is_closed_on_last_release(registry):
+    registry, opened, closes = registry
+    alpha = registry.acquire('alpha')
+    registry.get('beta')
+
+    # 제거되었지만 사용 중이므로 아직 열려 있음
+    assert closes.get(id(alpha.store), 0) == 0
+    assert alpha.store.get_fragment_contents(['f0'])['f0']
+    assert not alpha.acquire()
+
+    alpha.release()
+    assert is_closed(alpha.store, closes)
+
+    # 다시 요청하면 새로 연 저장소
+    again = registry.acquire('alpha')
+    assert again is not alpha and again.store.get_fragment_contents(['f1'])['f1']
+    again.release()
+
+
+def test_explicit_evict_closes_once(registry):
+    registry, opened, closes = registry
+    beta = registry.get('beta')
+    assert registry.evict('beta')
+    assert not registry.evict('beta')
+    beta.retire()
+    assert closes[id(beta.store)] == 1
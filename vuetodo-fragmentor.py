@@ -17,6 +17,8 @@ from app.parser.vue_parser import parse_vue_project
 from app.fragmenter.fragmenter import VueFragmenter
 from app.embedding.embedder import CodeEmbedder
 from app.storage.faiss_store import FaissVectorStore
+from app.storage.snapshot import SnapshotManager
+from app.storage.store_registry import write_project_info
 
 def setup_directories(base_dir: str = './data'):
     """필요한 디렉토리 생성"""
@@ -58,6 +60,7 @@ def process_vue_todo(project_path: str, data_dir: str = './data'):
     print(f"  - 파싱된 파일: {parsed_files_count}개")
     print(f"  - 감지된 컴포넌트: {parsed_project['summary']['components_count']}개")
     print(f"  - 파일 확장자 분포: {parsed_project['summary']['file_extensions']}")
+    print(f"  - 의존성 간선 (import / 하위 컴포넌트): {parsed_project['summary']['dependency_edges']}개")
     
     # 3. 코드 파편화
     print("\n[2/4] 코드 파편화 중...")
@@ -93,6 +96,17 @@ def process_vue_todo(project_path: str, data_dir: str = './data'):
     
     vector_store.add_fragments(fragments, embeddings)
     
+    # 검색 시 부모/자식 컴포넌트 확장에 쓰는 의존성 그래프 저장
+    vector_store.set_dependency_graph(parsed_project['dependency_graph'])
+    
+    # API 서버가 응답의 상대 경로를 소스 루트 기준으로 만들 수 있도록 프로젝트 정보 기록
+    write_project_info(data_dir, source_root=project_path, index_name='vue_todo_fragments')
+    
+    # API 서버가 무중단으로 교체할 수 있도록 불변 스냅샷 게시 (/admin/reload 또는 자동 확인)
+    snapshot_manager = SnapshotManager(os.path.join(data_dir, 'snapshots'), index_name='vue_todo_fragments')
+    snapshot_version = snapshot_manager.publish(vector_store)
+    print(f"  - 스냅샷 버전: {snapshot_version}")
+    
     # 6. 처리 결과 및 통계
     elapsed_time = time.time() - start_time
     stats = vector_store.get_stats()
@@ -182,9 +196,8 @@ def load_preexisting_index(data_dir: str):
         tuple: (vector_store, embedder) 또는 None
     """
     try:
-        # Faiss 인덱스 파일 경로
-        index_path = os.path.join(data_dir, 'faiss', 'vue_todo_fragments.index')
-        if not os.path.exists(index_path):
+        # 저장된 인덱스(체크포인트)가 없으면 로드하지 않음
+        if not FaissVectorStore.index_exists(data_dir, 'vue_todo_fragments'):
             return None
             
         # 임베더 초기화
@@ -211,7 +224,7 @@ def main():
     """메인 함수"""
     parser = argparse.ArgumentParser(description='Vue Todo 코드 파편화 및 벡터화')
     parser.add_argument('--project', type=str, help='Vue Todo 프로젝트 디렉토리 경로')
-    parser.add_argument('--data-dir', type=str, default='./data', help='데이터 저장 디렉토리')
+    parser.add_argument('--data-dir', type=str, default='./data', help='데이터 저장 디렉토리 (API 서버 다중 프로젝트: {PROJECTS_DIR}/{프로젝트 이름})')
     parser.add_argument('--search', action='store_true', help='대화형 검색 모드 실행')
     parser.add_argument('--query', type=str, help='단일 검색 쿼리 실행')
     parser.add_argument('--reload', action='store_true', help='기존 인덱스 무시하고 다시 처리')